@@ -18,6 +18,7 @@ import sys
 sys.path.append('.')
 from fin_review.loaders.bulgarian_mapping_loader import BulgarianMappingLoader
 from fin_review.loaders.bulgarian_fagl_loader import BulgarianFAGLLoader
+from fin_review.loaders.cache import DEFAULT_CACHE_DIR
 
 # Setup logging
 structlog.configure(
@@ -49,7 +50,7 @@ def load_bulgarian_data(sample_size=None):
     mapping_file = Path('/Users/bilyana/Desktop/Chronology & Mapping/Mapping export.xlsx')
     print(f"📊 Loading mapping data from: {mapping_file}")
     
-    mapping_loader = BulgarianMappingLoader(mapping_file, None)
+    mapping_loader = BulgarianMappingLoader(mapping_file, None, cache_dir=DEFAULT_CACHE_DIR)
     mapping_df = mapping_loader.load()
     mapping_summary = mapping_loader.get_bulgarian_summary()
     
@@ -63,7 +64,7 @@ def load_bulgarian_data(sample_size=None):
     if sample_size:
         print(f"⚠️  Loading sample of {sample_size:,} rows for testing...")
     
-    movements_loader = BulgarianFAGLLoader(movements_file, None)
+    movements_loader = BulgarianFAGLLoader(movements_file, None, cache_dir=DEFAULT_CACHE_DIR)
     movements_df = movements_loader.load(sample_size=sample_size)
     movements_summary = movements_loader.get_summary()
     
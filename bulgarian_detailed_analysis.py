@@ -26,6 +26,7 @@ import sys
 sys.path.append('.')
 from fin_review.loaders.bulgarian_mapping_loader import BulgarianMappingLoader
 from fin_review.loaders.bulgarian_fagl_loader import BulgarianFAGLLoader
+from fin_review.loaders.cache import DEFAULT_CACHE_DIR
 
 # Setup logging
 structlog.configure(
@@ -57,7 +58,7 @@ def load_bulgarian_data():
     mapping_file = Path('/Users/bilyana/Desktop/Chronology & Mapping/Mapping export.xlsx')
     print(f"📊 Loading mapping data from: {mapping_file}")
     
-    mapping_loader = BulgarianMappingLoader(mapping_file, None)
+    mapping_loader = BulgarianMappingLoader(mapping_file, None, cache_dir=DEFAULT_CACHE_DIR)
     mapping_df = mapping_loader.load()
     mapping_summary = mapping_loader.get_bulgarian_summary()
     
@@ -69,7 +70,7 @@ def load_bulgarian_data():
     print(f"📋 Loading movements data from: {movements_file}")
     print("⚠️  Loading full dataset (610,333 rows) - this will take time...")
     
-    movements_loader = BulgarianFAGLLoader(movements_file, None)
+    movements_loader = BulgarianFAGLLoader(movements_file, None, cache_dir=DEFAULT_CACHE_DIR)
     movements_df = movements_loader.load()  # Full dataset
     movements_summary = movements_loader.get_summary()
     
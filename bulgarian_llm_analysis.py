@@ -13,6 +13,7 @@ import sys
 sys.path.append('.')
 from fin_review.loaders.bulgarian_mapping_loader import BulgarianMappingLoader
 from fin_review.loaders.bulgarian_fagl_loader import BulgarianFAGLLoader
+from fin_review.loaders.cache import DEFAULT_CACHE_DIR
 from fin_review.analytics.ratio_analyzer import analyze_financial_ratios
 from fin_review.llm.ollama_analyzer import OllamaFinancialAnalyzer, LLMAnalysis
 
@@ -40,7 +41,7 @@ def load_bulgarian_data():
     mapping_file = Path('/Users/bilyana/Desktop/Chronology & Mapping/Mapping export.xlsx')
     print(f"📊 Loading mapping data from: {mapping_file}")
     
-    mapping_loader = BulgarianMappingLoader(mapping_file, None)
+    mapping_loader = BulgarianMappingLoader(mapping_file, None, cache_dir=DEFAULT_CACHE_DIR)
     mapping_df = mapping_loader.load()
     mapping_summary = mapping_loader.get_bulgarian_summary()
     
@@ -50,7 +51,7 @@ def load_bulgarian_data():
     movements_file = Path('/Users/bilyana/Desktop/Chronology & Mapping/movements 2024.XLSX')
     print(f"📋 Loading movements data from: {movements_file}")
     
-    movements_loader = BulgarianFAGLLoader(movements_file, None)
+    movements_loader = BulgarianFAGLLoader(movements_file, None, cache_dir=DEFAULT_CACHE_DIR)
     movements_df = movements_loader.load()
     movements_summary = movements_loader.get_summary()
     
@@ -26,6 +26,7 @@ import sys
 sys.path.append('.')
 from fin_review.loaders.bulgarian_mapping_loader import BulgarianMappingLoader
 from fin_review.loaders.bulgarian_fagl_loader import BulgarianFAGLLoader
+from fin_review.loaders.cache import DEFAULT_CACHE_DIR
 from fin_review.analytics.ratio_analyzer import FinancialRatioAnalyzer, analyze_financial_ratios
 
 # Setup logging
@@ -58,7 +59,7 @@ def load_bulgarian_data():
     mapping_file = Path('/Users/bilyana/Desktop/Chronology & Mapping/Mapping export.xlsx')
     print(f"📊 Loading mapping data from: {mapping_file}")
     
-    mapping_loader = BulgarianMappingLoader(mapping_file, None)
+    mapping_loader = BulgarianMappingLoader(mapping_file, None, cache_dir=DEFAULT_CACHE_DIR)
     mapping_df = mapping_loader.load()
     mapping_summary = mapping_loader.get_bulgarian_summary()
     
@@ -69,7 +70,7 @@ def load_bulgarian_data():
     print(f"📋 Loading movements data from: {movements_file}")
     print("⚠️  Loading full dataset (610,333 rows) for comprehensive ratio analysis...")
     
-    movements_loader = BulgarianFAGLLoader(movements_file, None)
+    movements_loader = BulgarianFAGLLoader(movements_file, None, cache_dir=DEFAULT_CACHE_DIR)
     movements_df = movements_loader.load()  # Full dataset
     movements_summary = movements_loader.get_summary()
     
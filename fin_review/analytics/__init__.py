@@ -1,16 +1,28 @@
 """Analytics modules for KPIs, trends, aging, anomalies, and forecasting."""
 
+from .cube import LedgerCube
 from .kpis import KPICalculator, calculate_kpis
+from .working_capital import WorkingCapitalAnalyzer, calculate_working_capital
+from .parties import PartyAnalyzer, analyze_parties
 from .trends import TrendAnalyzer, analyze_trends
+from .change_points import ChangePointDetector, detect_change_points
+from .seasonality import SeasonalityDetector, detect_seasonality
 from .aging import AgingAnalyzer, calculate_aging
 from .anomalies import AnomalyDetector, detect_anomalies
+from .transaction_anomalies import TransactionAnomalyScorer, score_transactions
 from .forecasting import Forecaster, generate_forecasts
 
 __all__ = [
+    'LedgerCube',
     'KPICalculator', 'calculate_kpis',
+    'WorkingCapitalAnalyzer', 'calculate_working_capital',
+    'PartyAnalyzer', 'analyze_parties',
     'TrendAnalyzer', 'analyze_trends',
+    'ChangePointDetector', 'detect_change_points',
+    'SeasonalityDetector', 'detect_seasonality',
     'AgingAnalyzer', 'calculate_aging',
     'AnomalyDetector', 'detect_anomalies',
+    'TransactionAnomalyScorer', 'score_transactions',
     'Forecaster', 'generate_forecasts'
 ]
 
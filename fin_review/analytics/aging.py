@@ -3,12 +3,20 @@
 import pandas as pd
 import numpy as np
 import structlog
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
 
 logger = structlog.get_logger()
 
+DEFAULT_AGING_BUCKETS = [
+    [0, 0, "Current"],
+    [1, 30, "0-30 days"],
+    [31, 60, "31-60 days"],
+    [61, 90, "61-90 days"],
+    [91, 999999, ">90 days"],
+]
+
 
 @dataclass
 class AgingResult:
@@ -20,10 +28,11 @@ class AgingResult:
     overdue_items: pd.DataFrame
     top_overdue_customers: pd.DataFrame
     top_overdue_vendors: pd.DataFrame
+    aging_history: Optional[pd.DataFrame] = None
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        return {
+        result = {
             'ar_aging': self.ar_aging.to_dict('records'),
             'ap_aging': self.ap_aging.to_dict('records'),
             'ar_summary': self.ar_summary,
@@ -32,33 +41,119 @@ class AgingResult:
             'top_overdue_customers': self.top_overdue_customers.to_dict('records'),
             'top_overdue_vendors': self.top_overdue_vendors.to_dict('records'),
         }
+        if self.aging_history is not None and len(self.aging_history) > 0:
+            history = self.aging_history.copy()
+            history['snapshot_date'] = history['snapshot_date'].dt.strftime('%Y-%m-%d')
+            result['aging_history'] = history.to_dict('records')
+        return result
+    
+    @classmethod
+    def combine(cls, results: List["AgingResult"], config: Optional[Dict] = None) -> "AgingResult":
+        """
+        Consolidate the aging of separate ledgers (e.g. one per entity).
+        
+        Bucket tables are summed bucket by bucket and overdue items pooled,
+        with the top overdue parties re-ranked from the pooled items.
+        Histories are summed month by month; each month is labelled with
+        its latest snapshot date, since a part without an explicit as-of
+        date ends on its own latest posting date.
+        
+        Args:
+            results: Aging results of disjoint ledgers
+            config: Configuration dictionary (for the bucket order)
+        
+        Returns:
+            AgingResult for the combined ledger
+        """
+        config = config or {}
+        names = [b[2] for b in config.get('aging_buckets', DEFAULT_AGING_BUCKETS)] + ['Unknown']
+        
+        def combine_buckets(tables: List[pd.DataFrame]) -> pd.DataFrame:
+            tables = [table for table in tables if len(table) > 0]
+            if not tables:
+                return pd.DataFrame()
+            combined = pd.concat(tables, ignore_index=True)
+            combined['aging_bucket'] = pd.Categorical(combined['aging_bucket'], categories=names)
+            return combined.groupby('aging_bucket', observed=True)[
+                ['outstanding_amount', 'item_count']
+            ].sum().reset_index().astype({'aging_bucket': object})
+        
+        ar_aging, ar_summary = summarize_aging(combine_buckets([r.ar_aging for r in results]))
+        ap_aging, ap_summary = summarize_aging(combine_buckets([r.ap_aging for r in results]))
+        
+        overdue = [r.overdue_items for r in results if len(r.overdue_items) > 0]
+        overdue_items = pd.DataFrame()
+        if overdue:
+            overdue_items = pd.concat(overdue, ignore_index=True)
+            if 'days_overdue' in overdue_items.columns:
+                overdue_items = overdue_items.sort_values('days_overdue', ascending=False, kind='stable')
+        
+        aging_history = None
+        histories = [r.aging_history for r in results if r.aging_history is not None and len(r.aging_history) > 0]
+        if histories:
+            history = pd.concat(histories, ignore_index=True)
+            history['aging_bucket'] = pd.Categorical(history['aging_bucket'], categories=names)
+            history['ledger'] = pd.Categorical(history['ledger'], categories=['AR', 'AP'])
+            month = history['snapshot_date'].dt.to_period('M').rename('month')
+            aging_history = history.groupby(['ledger', 'aging_bucket', month], observed=True).agg(
+                snapshot_date=('snapshot_date', 'max'),
+                outstanding_amount=('outstanding_amount', 'sum'),
+                item_count=('item_count', 'sum'),
+            ).reset_index().drop(columns='month')
+            aging_history = aging_history[
+                ['snapshot_date', 'ledger', 'aging_bucket', 'outstanding_amount', 'item_count']
+            ].astype({'ledger': object, 'aging_bucket': object})
+        
+        return cls(
+            ar_aging=ar_aging,
+            ap_aging=ap_aging,
+            ar_summary=ar_summary,
+            ap_summary=ap_summary,
+            overdue_items=overdue_items,
+            top_overdue_customers=top_overdue_parties(overdue_items, 'Receivable'),
+            top_overdue_vendors=top_overdue_parties(overdue_items, 'Payable'),
+            aging_history=aging_history
+        )
 
 
 class AgingAnalyzer:
     """Analyzes aging for receivables and payables."""
     
-    def __init__(self, df: pd.DataFrame, config: Optional[Dict] = None):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        as_of_date: Optional[Union[str, datetime]] = None
+    ):
         """
         Initialize aging analyzer.
         
         Args:
             df: Normalized FAGL DataFrame
             config: Configuration dictionary
+            as_of_date: Snapshot date for aging (defaults to aging_as_of_date
+                from config, then the latest posting date)
         """
         self.df = df
         self.config = config or {}
         
         # Get aging buckets from config
-        self.aging_buckets = self.config.get('aging_buckets', [
-            [0, 0, "Current"],
-            [1, 30, "0-30 days"],
-            [31, 60, "31-60 days"],
-            [61, 90, "61-90 days"],
-            [91, 999999, ">90 days"],
-        ])
+        self.aging_buckets = self.config.get('aging_buckets', DEFAULT_AGING_BUCKETS)
         
-        # Use latest posting date as "current date" for aging
-        self.current_date = self.df['posting_date'].max()
+        # Use latest posting date as "current date" unless a snapshot date is given
+        as_of_date = as_of_date or self.config.get('aging_as_of_date')
+        self.as_of_date_explicit = as_of_date is not None
+        if self.as_of_date_explicit:
+            self.current_date = pd.Timestamp(as_of_date)
+        else:
+            self.current_date = self.df['posting_date'].max()
+        
+        # Bucket lookup: lower bounds sorted for searchsorted, names in config order
+        self.bucket_names = [b[2] for b in self.aging_buckets]
+        bounds = np.array([[b[0], b[1]] for b in self.aging_buckets], dtype=float).reshape(-1, 2)
+        self._bucket_sort = np.argsort(bounds[:, 0], kind='stable')
+        self._bucket_min = bounds[self._bucket_sort, 0]
+        self._bucket_max = bounds[self._bucket_sort, 1]
     
     def analyze_all(self) -> AgingResult:
         """
@@ -82,6 +177,11 @@ class AgingAnalyzer:
         top_overdue_customers = self._get_top_overdue('Receivable')
         top_overdue_vendors = self._get_top_overdue('Payable')
         
+        # Month-end aging profile history
+        aging_history = None
+        if self.config.get('aging_history_months', 24) > 0:
+            aging_history = self.aging_history()
+        
         logger.info(
             "Aging analysis complete",
             ar_buckets=len(ar_aging),
@@ -96,159 +196,166 @@ class AgingAnalyzer:
             ap_summary=ap_summary,
             overdue_items=overdue_items,
             top_overdue_customers=top_overdue_customers,
-            top_overdue_vendors=top_overdue_vendors
+            top_overdue_vendors=top_overdue_vendors,
+            aging_history=aging_history
         )
     
     def _analyze_ar(self) -> Tuple[pd.DataFrame, Dict]:
         """Analyze accounts receivable aging."""
-        # Filter receivables with open amounts
-        ar = self.df[self.df['is_receivable'] == True].copy()
-        
-        if len(ar) == 0:
-            logger.warning("No receivables data found")
-            return pd.DataFrame(), {'total_outstanding': 0, 'item_count': 0}
+        return self._analyze_open_items('is_receivable', 'AR')
+    
+    def _analyze_ap(self) -> Tuple[pd.DataFrame, Dict]:
+        """Analyze accounts payable aging."""
+        return self._analyze_open_items('is_payable', 'AP')
+    
+    def _analyze_open_items(self, flag_column: str, label: str) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Age the open items flagged by one column (receivables or payables).
         
-        # Filter only open items
-        if 'open_amount' in ar.columns:
-            ar = ar[ar['open_amount'].notna() & (ar['open_amount'] != 0)]
+        Works on column arrays of the selected rows; the ledger is not copied.
         
-        # Calculate aging
-        ar = self._assign_aging_buckets(ar)
+        Args:
+            flag_column: Boolean column selecting the items ('is_receivable' or 'is_payable')
+            label: Name used in log messages
         
-        # Aggregate by aging bucket
-        aging_summary = ar.groupby('aging_bucket').agg({
-            'open_amount': 'sum',
-            'doc_id': 'count'
-        }).reset_index()
+        Returns:
+            Tuple of (aging summary by bucket, summary dict)
+        """
+        df = self.df
+        selected = (df[flag_column] == True).to_numpy()
         
-        aging_summary.columns = ['aging_bucket', 'outstanding_amount', 'item_count']
+        if not selected.any():
+            logger.warning(f"No {'receivables' if label == 'AR' else 'payables'} data found")
+            return pd.DataFrame(), {'total_outstanding': 0, 'item_count': 0}
         
-        # Calculate percentages
-        total_outstanding = aging_summary['outstanding_amount'].sum()
-        if total_outstanding != 0:
-            aging_summary['pct_of_total'] = (
-                aging_summary['outstanding_amount'] / total_outstanding
-            ) * 100
+        # Filter only open items as of the snapshot date
+        if self.as_of_date_explicit:
+            open_amount = self._open_amount_at_snapshot(df)
+            selected &= open_amount != 0
+        elif 'open_amount' in df.columns:
+            open_amount = df['open_amount'].to_numpy(dtype=float)
+            selected &= ~np.isnan(open_amount) & (open_amount != 0)
         else:
-            aging_summary['pct_of_total'] = 0
-        
-        # Sort by bucket order
-        bucket_order = [b[2] for b in self.aging_buckets]
-        aging_summary['bucket_order'] = aging_summary['aging_bucket'].map(
-            {name: i for i, name in enumerate(bucket_order)}
-        )
-        aging_summary = aging_summary.sort_values('bucket_order').drop('bucket_order', axis=1)
-        
-        # Create summary dict
-        summary = {
-            'total_outstanding': float(total_outstanding),
-            'item_count': int(aging_summary['item_count'].sum()),
-            'overdue_amount': float(
-                aging_summary[~aging_summary['aging_bucket'].str.contains('Current', na=False)]
-                ['outstanding_amount'].sum()
-            ),
-            'overdue_pct': 0.0
-        }
-        
-        if total_outstanding != 0:
-            summary['overdue_pct'] = (summary['overdue_amount'] / total_outstanding) * 100
+            open_amount = np.full(len(df), np.nan)
+        
+        rows = np.flatnonzero(selected)
+        items = df.take(rows)
+        codes = self._assign_aging_buckets(items).cat.codes.to_numpy()
+        
+        # Aggregate by aging bucket (sum skips missing amounts, count skips missing doc ids)
+        n_codes = len(self.bucket_names) + 1
+        amounts = np.nan_to_num(open_amount[rows])
+        counted = items['doc_id'].notna().to_numpy() if 'doc_id' in items.columns else np.ones(len(rows), dtype=bool)
+        outstanding = np.bincount(codes, weights=amounts, minlength=n_codes)
+        item_count = np.bincount(codes, weights=counted, minlength=n_codes).astype(np.int64)
+        present = np.bincount(codes, minlength=n_codes) > 0
+        
+        aging_summary, summary = summarize_aging(pd.DataFrame({
+            'aging_bucket': np.array(self.bucket_names + ['Unknown'], dtype=object)[present],
+            'outstanding_amount': outstanding[present],
+            'item_count': item_count[present],
+        }))
         
         logger.info(
-            "AR aging analyzed",
-            total=total_outstanding,
+            f"{label} aging analyzed",
+            total=summary['total_outstanding'],
             overdue_pct=summary['overdue_pct']
         )
         
         return aging_summary, summary
     
-    def _analyze_ap(self) -> Tuple[pd.DataFrame, Dict]:
-        """Analyze accounts payable aging."""
-        # Filter payables with open amounts
-        ap = self.df[self.df['is_payable'] == True].copy()
-        
-        if len(ap) == 0:
-            logger.warning("No payables data found")
-            return pd.DataFrame(), {'total_outstanding': 0, 'item_count': 0}
-        
-        # Filter only open items
-        if 'open_amount' in ap.columns:
-            ap = ap[ap['open_amount'].notna() & (ap['open_amount'] != 0)]
+    def _open_amount_at_snapshot(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Amount of each row still open at the snapshot date (0 when not open).
         
-        # Calculate aging
-        ap = self._assign_aging_buckets(ap)
+        Matches aging_history: with a clearing_date column an item is open
+        from its posting date until the day it is cleared, at its original
+        amount if it has been cleared since; otherwise it is open at its
+        current open amount from its posting date on.
+        """
+        open_amount = np.zeros(len(df))
+        if 'open_amount' in df.columns:
+            open_amount = np.nan_to_num(df['open_amount'].to_numpy(dtype=float))
         
-        # Aggregate by aging bucket
-        aging_summary = ap.groupby('aging_bucket').agg({
-            'open_amount': 'sum',
-            'doc_id': 'count'
-        }).reset_index()
+        snapshot = self.current_date.normalize()
+        is_open = (df['posting_date'].dt.normalize() <= snapshot).to_numpy()
         
-        aging_summary.columns = ['aging_bucket', 'outstanding_amount', 'item_count']
+        if 'clearing_date' not in df.columns:
+            return np.where(is_open, open_amount, 0.0)
         
-        # Calculate percentages
-        total_outstanding = aging_summary['outstanding_amount'].sum()
-        if total_outstanding != 0:
-            aging_summary['pct_of_total'] = (
-                aging_summary['outstanding_amount'] / total_outstanding
-            ) * 100
+        cleared = df['clearing_date'].dt.normalize()
+        is_open &= np.where(cleared.isna().to_numpy(), open_amount != 0, (cleared > snapshot).to_numpy())
+        amount = np.where(open_amount != 0, open_amount, df['amount'].to_numpy(dtype=float))
+        return np.where(is_open, amount, 0.0)
+    
+    def _days_overdue(self, df: pd.DataFrame) -> pd.Series:
+        """Days overdue at the snapshot date (negative when not yet due)."""
+        # The normalizer's column is relative to the latest posting date
+        if 'days_overdue' in df.columns and not self.as_of_date_explicit:
+            return df['days_overdue']
+        
+        if 'due_date' in df.columns and df['due_date'].notna().any():
+            due_date = df['due_date']
         else:
-            aging_summary['pct_of_total'] = 0
+            # If no due date, use posting date + 30 days as default
+            logger.warning("No due_date available, using posting_date + 30 days")
+            due_date = df['posting_date'] + pd.Timedelta(days=30)
         
-        # Sort by bucket order
-        bucket_order = [b[2] for b in self.aging_buckets]
-        aging_summary['bucket_order'] = aging_summary['aging_bucket'].map(
-            {name: i for i, name in enumerate(bucket_order)}
-        )
-        aging_summary = aging_summary.sort_values('bucket_order').drop('bucket_order', axis=1)
-        
-        # Create summary dict
-        summary = {
-            'total_outstanding': float(total_outstanding),
-            'item_count': int(aging_summary['item_count'].sum()),
-            'overdue_amount': float(
-                aging_summary[~aging_summary['aging_bucket'].str.contains('Current', na=False)]
-                ['outstanding_amount'].sum()
-            ),
-            'overdue_pct': 0.0
-        }
+        return (self.current_date - due_date).dt.days
+    
+    def _assign_aging_buckets(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Assign aging buckets based on days overdue.
         
-        if total_outstanding != 0:
-            summary['overdue_pct'] = (summary['overdue_amount'] / total_outstanding) * 100
+        Args:
+            df: Items to age
         
-        logger.info(
-            "AP aging analyzed",
-            total=total_outstanding,
-            overdue_pct=summary['overdue_pct']
+        Returns:
+            Categorical Series aligned to df, categories in aging_buckets
+            order followed by 'Unknown' for days outside every range
+        """
+        days = self._days_overdue(df).to_numpy(dtype=float)
+        codes = self.bucket_codes(days)
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=self.bucket_names + ['Unknown']),
+            index=df.index,
+            name='aging_bucket'
         )
-        
-        return aging_summary, summary
     
-    def _assign_aging_buckets(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Assign aging buckets based on days overdue."""
-        df = df.copy()
-        
-        # Calculate days overdue
-        if 'days_overdue' not in df.columns:
-            if 'due_date' in df.columns and df['due_date'].notna().any():
-                df['days_overdue'] = (self.current_date - df['due_date']).dt.days
-            else:
-                # If no due date, use posting date + 30 days as default
-                logger.warning("No due_date available, using posting_date + 30 days")
-                default_due = df['posting_date'] + pd.Timedelta(days=30)
-                df['days_overdue'] = (self.current_date - default_due).dt.days
-        
-        # Assign to buckets
-        df['aging_bucket'] = 'Unknown'
+    def bucket_codes(self, days: np.ndarray) -> np.ndarray:
+        """
+        Map days overdue to aging bucket positions with one searchsorted.
         
-        for min_days, max_days, bucket_name in self.aging_buckets:
-            mask = (df['days_overdue'] >= min_days) & (df['days_overdue'] <= max_days)
-            df.loc[mask, 'aging_bucket'] = bucket_name
+        Args:
+            days: Days overdue (NaN for unknown)
         
-        return df
+        Returns:
+            Bucket index into aging_buckets per value, len(aging_buckets) for
+            values outside every range
+        """
+        position = np.searchsorted(self._bucket_min, days, side='right') - 1
+        clipped = np.clip(position, 0, len(self._bucket_min) - 1)
+        inside = (position >= 0) & (days <= self._bucket_max[clipped])
+        return np.where(inside, self._bucket_sort[clipped], len(self.bucket_names))
+    
+    def _overdue_items(self) -> pd.DataFrame:
+        """Rows overdue at the snapshot date, with days_overdue relative to it."""
+        if not self.as_of_date_explicit:
+            return self.df[self.df['is_overdue'] == True].copy()
+        
+        open_amount = self._open_amount_at_snapshot(self.df)
+        df = self.df[open_amount != 0]
+        days = self._days_overdue(df)
+        overdue = (days > self.config.get('overdue_threshold_days', 0)).to_numpy()
+        
+        result = df[overdue].copy()
+        result['days_overdue'] = days[overdue]
+        result['open_amount'] = open_amount[open_amount != 0][overdue]
+        return result
     
     def _get_overdue_items(self) -> pd.DataFrame:
         """Get all overdue items."""
-        overdue = self.df[self.df['is_overdue'] == True].copy()
+        overdue = self._overdue_items()
         
         if len(overdue) == 0:
             return pd.DataFrame()
@@ -277,69 +384,173 @@ class AgingAnalyzer:
         Returns:
             DataFrame with top overdue parties
         """
-        # Filter by type and overdue
-        data = self.df[
-            (self.df['type'] == item_type) &
-            (self.df['is_overdue'] == True)
-        ].copy()
+        return top_overdue_parties(self._overdue_items(), item_type, n)
+    
+    def aging_history(self, months: Optional[int] = None) -> pd.DataFrame:
+        """
+        Compute the AR and AP aging profile at every month-end.
         
-        if len(data) == 0 or 'customer_vendor' not in data.columns:
-            return pd.DataFrame()
+        Each item is open from its posting date until its clearing date
+        (items without a clearing_date column or value are taken as open
+        through the snapshot window at their current open amount). For
+        every bucket, the snapshot range in which an open item sits in that
+        bucket follows from searchsorted on the sorted snapshot dates, so
+        all snapshots are built from one difference array and a cumulative
+        sum instead of aging the ledger once per date.
         
-        # Group by customer/vendor
-        top = data.groupby('customer_vendor').agg({
-            'open_amount': 'sum',
-            'doc_id': 'count',
-            'days_overdue': 'max'
-        }).reset_index()
+        Args:
+            months: Number of month-end snapshots (defaults to
+                aging_history_months, 24); the last one is the as-of date
+        
+        Returns:
+            Long DataFrame with snapshot_date, ledger ('AR'/'AP'),
+            aging_bucket, outstanding_amount and item_count
+        """
+        months = months or self.config.get('aging_history_months', 24)
         
-        top.columns = ['party', 'overdue_amount', 'item_count', 'max_days_overdue']
+        month_ends = pd.period_range(
+            end=self.current_date.to_period('M'), periods=months, freq='M'
+        ).to_timestamp(how='end').normalize()
+        snapshots = month_ends.where(month_ends <= self.current_date, self.current_date.normalize())
         
-        # Sort by overdue amount
-        top = top.sort_values('overdue_amount', key=abs, ascending=False).head(n)
+        history = pd.concat([
+            self._open_item_history('is_receivable', 'AR', snapshots),
+            self._open_item_history('is_payable', 'AP', snapshots),
+        ], ignore_index=True)
         
-        # Calculate percentage of total overdue
-        total_overdue = data['open_amount'].sum()
-        if total_overdue != 0:
-            top['pct_of_total_overdue'] = (top['overdue_amount'] / total_overdue) * 100
+        logger.info("Aging history computed", snapshots=len(snapshots), rows=len(history))
+        
+        return history
+    
+    def _open_item_history(
+        self,
+        flag_column: str,
+        label: str,
+        snapshots: pd.DatetimeIndex
+    ) -> pd.DataFrame:
+        """Bucket totals of one ledger's open items at every snapshot date."""
+        columns = ['snapshot_date', 'ledger', 'aging_bucket', 'outstanding_amount', 'item_count']
+        df = self.df
+        if flag_column not in df.columns:
+            return pd.DataFrame(columns=columns)
+        
+        rows = np.flatnonzero((df[flag_column] == True).to_numpy())
+        
+        open_amount = np.zeros(len(rows))
+        if 'open_amount' in df.columns:
+            open_amount = np.nan_to_num(df['open_amount'].to_numpy(dtype=float)[rows])
+        
+        # Day numbers (NaT stays NaN) so bucket edges are plain day offsets
+        def days(column: str) -> np.ndarray:
+            values = df[column].to_numpy(dtype='datetime64[ns]')[rows]
+            day_numbers = values.astype('datetime64[D]').astype(np.int64).astype(float)
+            return np.where(np.isnat(values), np.nan, day_numbers)
+        
+        posted = days('posting_date')
+        if 'clearing_date' in df.columns:
+            cleared = days('clearing_date')
+            # Cleared items carry their original amount; uncleared ones must still be open
+            amount = np.where(open_amount != 0, open_amount, df['amount'].to_numpy(dtype=float)[rows])
+            keep = ~np.isnan(cleared) | (open_amount != 0)
+            cleared = np.where(np.isnan(cleared), np.inf, cleared)
         else:
-            top['pct_of_total_overdue'] = 0
+            amount = open_amount
+            keep = open_amount != 0
+            cleared = np.full(len(rows), np.inf)
         
-        return top
+        if 'due_date' in df.columns and df['due_date'].notna().any():
+            due = days('due_date')
+        else:
+            due = posted + 30
+        
+        keep &= ~np.isnan(posted)
+        posted, cleared, due, amount = posted[keep], cleared[keep], due[keep], amount[keep]
+        
+        snapshot_days = snapshots.to_numpy(dtype='datetime64[D]').astype(np.int64)
+        n_snapshots = len(snapshot_days)
+        
+        # Open at snapshot s when posted <= s < cleared
+        open_from = np.searchsorted(snapshot_days, posted, side='left')
+        open_to = np.searchsorted(snapshot_days, cleared, side='left')
+        
+        # Spans [start, stop) of snapshots per item; row k is aging bucket k, the last row all open items
+        n_rows = len(self.bucket_names) + 1
+        width = n_snapshots + 1
+        starts = []
+        stops = []
+        has_due = ~np.isnan(due)
+        for min_days, max_days, _ in self.aging_buckets:
+            # In the bucket at snapshot s when due + min_days <= s <= due + max_days
+            enters = np.searchsorted(snapshot_days, due + min_days, side='left')
+            leaves = np.searchsorted(snapshot_days, due + max_days, side='right')
+            starts.append(np.where(has_due, np.maximum(open_from, enters), 0))
+            stops.append(np.where(has_due, np.minimum(open_to, leaves), 0))
+        starts.append(open_from)
+        stops.append(open_to)
+        
+        start, stop = np.stack(starts), np.stack(stops)
+        row, item = np.nonzero(start < stop)
+        offset = row * width
+        index = np.concatenate([offset + start[row, item], offset + stop[row, item]])
+        sign = np.repeat([1.0, -1.0], len(row))
+        
+        # Difference arrays: +1 where a span starts, -1 after it ends
+        size = n_rows * width
+        amount_diff = np.bincount(index, weights=sign * np.tile(amount[item], 2), minlength=size)
+        count_diff = np.bincount(index, weights=sign, minlength=size)
+        
+        outstanding = np.cumsum(amount_diff.reshape(n_rows, width), axis=1)[:, :n_snapshots]
+        item_count = np.rint(np.cumsum(count_diff.reshape(n_rows, width), axis=1)[:, :n_snapshots])
+        
+        # Whatever is open but in no bucket (missing due date, gaps in ranges) is Unknown
+        outstanding[-1] -= outstanding[:-1].sum(axis=0)
+        item_count[-1] -= item_count[:-1].sum(axis=0)
+        outstanding[-1] = np.where(item_count[-1] == 0, 0.0, outstanding[-1])
+        
+        names = self.bucket_names + ['Unknown']
+        if not item_count[-1].any():
+            names = names[:-1]
+        n_buckets = len(names)
+        
+        return pd.DataFrame({
+            'snapshot_date': np.tile(snapshots, n_buckets),
+            'ledger': label,
+            'aging_bucket': np.repeat(names, n_snapshots),
+            'outstanding_amount': outstanding[:n_buckets].ravel(),
+            'item_count': item_count[:n_buckets].ravel().astype(np.int64),
+        }, columns=columns)
     
-    def calculate_aging_deterioration(self) -> Optional[Dict]:
+    def calculate_aging_deterioration(self, history: Optional[pd.DataFrame] = None) -> Optional[Dict]:
         """
-        Calculate how aging has deteriorated over time.
+        Calculate how AR aging has deteriorated over time.
+        
+        Compares the overdue share of AR at the latest month-end snapshot
+        with the snapshot three months earlier.
+        
+        Args:
+            history: Output of aging_history() (computed if not given)
         
         Returns:
             Dictionary with deterioration metrics
         """
-        # Compare current month to 3 months ago
-        three_months_ago = self.current_date - pd.Timedelta(days=90)
+        if history is None:
+            history = self.aging_history(max(self.config.get('aging_history_months', 24), 4))
         
-        # Current AR aging
-        current_ar = self.df[
-            (self.df['is_receivable'] == True) &
-            (self.df['posting_date'] >= three_months_ago)
-        ].copy()
-        
-        if len(current_ar) == 0:
+        ar = history[history['ledger'] == 'AR']
+        if len(ar) == 0:
             return None
         
-        # Historical AR aging (3-6 months ago)
-        six_months_ago = self.current_date - pd.Timedelta(days=180)
-        historical_ar = self.df[
-            (self.df['is_receivable'] == True) &
-            (self.df['posting_date'] >= six_months_ago) &
-            (self.df['posting_date'] < three_months_ago)
-        ].copy()
+        total = ar.groupby('snapshot_date')['outstanding_amount'].sum()
+        current = ar[ar['aging_bucket'].str.contains('Current', na=False)]
+        current = current.groupby('snapshot_date')['outstanding_amount'].sum().reindex(total.index, fill_value=0)
         
-        if len(historical_ar) == 0:
+        if len(total) < 4 or total.iloc[-1] == 0 or total.iloc[-4] == 0:
             return None
         
         # Calculate overdue percentages
-        current_overdue_pct = (current_ar['is_overdue'].sum() / len(current_ar)) * 100
-        hist_overdue_pct = (historical_ar['is_overdue'].sum() / len(historical_ar)) * 100
+        overdue_pct = (total - current) / total * 100
+        current_overdue_pct = overdue_pct.iloc[-1]
+        hist_overdue_pct = overdue_pct.iloc[-4]
         
         deterioration = current_overdue_pct - hist_overdue_pct
         
@@ -347,21 +558,109 @@ class AgingAnalyzer:
             'current_overdue_pct': float(current_overdue_pct),
             'historical_overdue_pct': float(hist_overdue_pct),
             'deterioration_pct': float(deterioration),
-            'is_deteriorating': deterioration > 5  # More than 5% increase
+            'is_deteriorating': bool(deterioration > 5)  # More than 5% increase
         }
 
 
-def calculate_aging(df: pd.DataFrame, config: Optional[Dict] = None) -> AgingResult:
+def summarize_aging(aging_summary: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Add bucket shares to an aging table and summarize it.
+    
+    Args:
+        aging_summary: Outstanding amount and item count per aging bucket
+    
+    Returns:
+        Tuple of (aging table with pct_of_total, summary dict)
+    """
+    if len(aging_summary) == 0:
+        return pd.DataFrame(), {'total_outstanding': 0, 'item_count': 0}
+    
+    # Calculate percentages
+    total_outstanding = aging_summary['outstanding_amount'].sum()
+    if total_outstanding != 0:
+        aging_summary['pct_of_total'] = (
+            aging_summary['outstanding_amount'] / total_outstanding
+        ) * 100
+    else:
+        aging_summary['pct_of_total'] = 0
+    
+    # Create summary dict
+    summary = {
+        'total_outstanding': float(total_outstanding),
+        'item_count': int(aging_summary['item_count'].sum()),
+        'overdue_amount': float(
+            aging_summary[~aging_summary['aging_bucket'].str.contains('Current', na=False)]
+            ['outstanding_amount'].sum()
+        ),
+        'overdue_pct': 0.0
+    }
+    
+    if total_outstanding != 0:
+        summary['overdue_pct'] = (summary['overdue_amount'] / total_outstanding) * 100
+    
+    return aging_summary, summary
+
+
+def top_overdue_parties(overdue: pd.DataFrame, item_type: str, n: int = 10) -> pd.DataFrame:
+    """
+    Rank customers or vendors by overdue amount.
+    
+    Args:
+        overdue: Overdue items with type, customer_vendor, open_amount,
+            doc_id and days_overdue columns
+        item_type: 'Receivable' or 'Payable'
+        n: Number of top parties
+    
+    Returns:
+        DataFrame with top overdue parties
+    """
+    if len(overdue) == 0 or 'type' not in overdue.columns:
+        return pd.DataFrame()
+    
+    # Filter by type
+    data = overdue[overdue['type'] == item_type]
+    
+    if len(data) == 0 or 'customer_vendor' not in data.columns:
+        return pd.DataFrame()
+    
+    # Group by customer/vendor
+    top = data.groupby('customer_vendor', observed=True).agg({
+        'open_amount': 'sum',
+        'doc_id': 'count',
+        'days_overdue': 'max'
+    }).reset_index()
+    
+    top.columns = ['party', 'overdue_amount', 'item_count', 'max_days_overdue']
+    
+    # Sort by overdue amount
+    top = top.sort_values('overdue_amount', key=abs, ascending=False).head(n)
+    
+    # Calculate percentage of total overdue
+    total_overdue = data['open_amount'].sum()
+    if total_overdue != 0:
+        top['pct_of_total_overdue'] = (top['overdue_amount'] / total_overdue) * 100
+    else:
+        top['pct_of_total_overdue'] = 0
+    
+    return top
+
+
+def calculate_aging(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    as_of_date: Optional[Union[str, datetime]] = None
+) -> AgingResult:
     """
     Convenience function to calculate aging.
     
     Args:
         df: Normalized FAGL DataFrame
         config: Configuration dictionary
+        as_of_date: Snapshot date for aging (defaults to the latest posting date)
     
     Returns:
         AgingResult object
     """
-    analyzer = AgingAnalyzer(df, config)
+    analyzer = AgingAnalyzer(df, config, as_of_date)
     return analyzer.analyze_all()
 
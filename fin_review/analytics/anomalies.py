@@ -3,11 +3,14 @@
 import pandas as pd
 import numpy as np
 import structlog
-from typing import Dict, Optional, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, List, Tuple
 from dataclasses import dataclass
 from scipy import stats
 from sklearn.ensemble import IsolationForest
 
+from .cube import LedgerCube
+
 logger = structlog.get_logger()
 
 
@@ -54,24 +57,60 @@ class AnomalyResult:
             ],
             'summary': self.summary
         }
+    
+    @classmethod
+    def merge(cls, *results: "AnomalyResult") -> "AnomalyResult":
+        """Combine results from several detectors into one, re-summarized."""
+        anomalies = [a for result in results for a in result.anomalies]
+        return cls(anomalies=anomalies, summary=summarize_anomalies(anomalies))
 
 
 class AnomalyDetector:
     """Detects anomalies in financial data."""
     
-    def __init__(self, df: pd.DataFrame, config: Optional[Dict] = None):
+    # (high, medium) score cut-offs per detection method
+    SEVERITY_THRESHOLDS = {
+        'zscore': (4.0, 3.5),
+        'mad': (5.0, 4.0),
+        'isolation_forest': (-0.3, -0.2),
+    }
+    
+    ISOLATION_FOREST_MODES = ['per_bucket', 'pooled']
+    ISOLATION_FOREST_MIN_POINTS = 10  # Need more data for ML
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        cube: Optional[LedgerCube] = None
+    ):
         """
         Initialize anomaly detector.
         
         Args:
             df: Normalized FAGL DataFrame
             config: Configuration dictionary
+            cube: Shared ledger aggregate (built from df if not given)
         """
         self.df = df
         self.config = config or {}
+        self.cube = cube if cube is not None else LedgerCube(df)
         self.zscore_threshold = self.config.get('anomaly_threshold_zscore', 3.0)
         self.mad_threshold = self.config.get('anomaly_threshold_mad', 3.5)
         self.use_isolation_forest = self.config.get('use_isolation_forest', True)
+        self.isolation_forest_mode = self.config.get('isolation_forest_mode', 'per_bucket')
+        self.max_workers = (
+            self.config.get('max_workers', 1) if self.config.get('parallel_processing', False) else 1
+        )
+        
+        if self.isolation_forest_mode not in self.ISOLATION_FOREST_MODES:
+            raise ValueError(
+                f"Unknown isolation_forest_mode: {self.isolation_forest_mode}. "
+                f"Available: {self.ISOLATION_FOREST_MODES}"
+            )
+        
+        self._bucket_scores: Optional[pd.DataFrame] = None
+        self._drilldown: Optional[Dict] = None
     
     def detect_all(self) -> AnomalyResult:
         """
@@ -101,8 +140,7 @@ class AnomalyDetector:
         anomalies = self._deduplicate_anomalies(anomalies)
         
         # Add explanations
-        for anomaly in anomalies:
-            self._explain_anomaly(anomaly)
+        self._explain_anomalies(anomalies)
         
         # Sort by severity and deviation
         severity_order = {'high': 0, 'medium': 1, 'low': 2}
@@ -124,172 +162,248 @@ class AnomalyDetector:
     
     def _detect_zscore_anomalies(self) -> List[Anomaly]:
         """Detect anomalies using Z-score method."""
-        anomalies = []
+        scores = self._score_buckets()
         
-        # Group by bucket and month
-        monthly = self.df.groupby(['year_month', 'bucket', 'type'])['amount'].sum().reset_index()
+        # Need sufficient history and some variation in the bucket
+        anomalous = scores[
+            (scores['n'] >= 6) &
+            (scores['std'] > 0) &
+            (scores['zscore'].abs() > self.zscore_threshold)
+        ]
         
-        # For each bucket, calculate Z-scores
-        for bucket in monthly['bucket'].unique():
-            bucket_data = monthly[monthly['bucket'] == bucket].copy()
-            
-            if len(bucket_data) < 6:  # Need sufficient history
-                continue
-            
-            # Calculate Z-scores
-            mean = bucket_data['amount'].mean()
-            std = bucket_data['amount'].std()
-            
-            if std == 0:
-                continue
-            
-            bucket_data['zscore'] = (bucket_data['amount'] - mean) / std
-            
-            # Identify anomalies
-            anomalous = bucket_data[abs(bucket_data['zscore']) > self.zscore_threshold]
-            
-            for _, row in anomalous.iterrows():
-                severity = self._determine_severity(abs(row['zscore']), 'zscore')
-                
-                anomalies.append(Anomaly(
-                    date=row['year_month'].strftime('%Y-%m'),
-                    bucket=row['bucket'],
-                    type=row['type'],
-                    amount=float(row['amount']),
-                    expected_amount=float(mean),
-                    deviation=float(row['amount'] - mean),
-                    deviation_pct=float(((row['amount'] - mean) / abs(mean)) * 100) if mean != 0 else 0,
-                    severity=severity,
-                    method='zscore'
-                ))
+        anomalies = self._build_anomalies(anomalous, 'mean', 'zscore', 'zscore')
         
         logger.info(f"Z-score method detected {len(anomalies)} anomalies")
         return anomalies
     
     def _detect_mad_anomalies(self) -> List[Anomaly]:
         """Detect anomalies using Median Absolute Deviation (more robust to outliers)."""
-        anomalies = []
+        scores = self._score_buckets()
         
-        # Group by bucket and month
-        monthly = self.df.groupby(['year_month', 'bucket', 'type'])['amount'].sum().reset_index()
+        anomalous = scores[
+            (scores['n'] >= 6) &
+            (scores['mad'] > 0) &
+            (scores['mad_score'].abs() > self.mad_threshold)
+        ]
         
-        # For each bucket, calculate MAD scores
-        for bucket in monthly['bucket'].unique():
-            bucket_data = monthly[monthly['bucket'] == bucket].copy()
-            
-            if len(bucket_data) < 6:
-                continue
-            
-            # Calculate MAD
-            median = bucket_data['amount'].median()
-            mad = np.median(np.abs(bucket_data['amount'] - median))
-            
-            if mad == 0:
-                continue
-            
-            # Modified Z-score using MAD
-            bucket_data['mad_score'] = 0.6745 * (bucket_data['amount'] - median) / mad
-            
-            # Identify anomalies
-            anomalous = bucket_data[abs(bucket_data['mad_score']) > self.mad_threshold]
-            
-            for _, row in anomalous.iterrows():
-                severity = self._determine_severity(abs(row['mad_score']), 'mad')
-                
-                anomalies.append(Anomaly(
-                    date=row['year_month'].strftime('%Y-%m'),
-                    bucket=row['bucket'],
-                    type=row['type'],
-                    amount=float(row['amount']),
-                    expected_amount=float(median),
-                    deviation=float(row['amount'] - median),
-                    deviation_pct=float(((row['amount'] - median) / abs(median)) * 100) if median != 0 else 0,
-                    severity=severity,
-                    method='mad'
-                ))
+        anomalies = self._build_anomalies(anomalous, 'median', 'mad_score', 'mad')
         
         logger.info(f"MAD method detected {len(anomalies)} anomalies")
         return anomalies
     
+    def _score_buckets(self) -> pd.DataFrame:
+        """
+        Score every monthly bucket total against its bucket's history.
+        
+        Per-bucket count, mean, std, median and MAD are broadcast back with
+        grouped transforms, so Z-scores and modified (MAD) Z-scores for all
+        buckets come out of one vectorized pass. The result is cached for
+        the Z-score and MAD detectors.
+        """
+        if self._bucket_scores is not None:
+            return self._bucket_scores
+        
+        scores = self.cube.rollup(['year_month', 'bucket', 'type']).reset_index()
+        
+        grouped = scores.groupby('bucket', observed=True, sort=False)['amount']
+        scores['n'] = grouped.transform('size')
+        scores['mean'] = grouped.transform('mean')
+        scores['std'] = grouped.transform('std')
+        scores['median'] = grouped.transform('median')
+        
+        abs_deviation = (scores['amount'] - scores['median']).abs()
+        scores['mad'] = abs_deviation.groupby(scores['bucket'], observed=True, sort=False).transform('median')
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores['zscore'] = (scores['amount'] - scores['mean']) / scores['std']
+            scores['mad_score'] = 0.6745 * (scores['amount'] - scores['median']) / scores['mad']
+        
+        # Report anomalies bucket by bucket, in order of first appearance
+        bucket_order = pd.factorize(scores['bucket'])[0]
+        scores = scores.iloc[np.argsort(bucket_order, kind='stable')]
+        
+        self._bucket_scores = scores
+        return scores
+    
+    def _build_anomalies(
+        self,
+        anomalous: pd.DataFrame,
+        expected_col: str,
+        score_col: str,
+        method: str
+    ) -> List[Anomaly]:
+        """Create Anomaly records from columnar arrays of flagged rows."""
+        if len(anomalous) == 0:
+            return []
+        
+        amounts = anomalous['amount'].to_numpy(dtype=float)
+        expected = anomalous[expected_col].to_numpy(dtype=float)
+        deviation = amounts - expected
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation_pct = np.where(expected != 0, (deviation / np.abs(expected)) * 100, 0.0)
+        severity = self._severity_levels(np.abs(anomalous[score_col].to_numpy(dtype=float)), method)
+        
+        return [
+            Anomaly(
+                date=date,
+                bucket=bucket,
+                type=type_,
+                amount=amount,
+                expected_amount=expected_amount,
+                deviation=dev,
+                deviation_pct=dev_pct,
+                severity=level,
+                method=method
+            )
+            for date, bucket, type_, amount, expected_amount, dev, dev_pct, level in zip(
+                anomalous['year_month'].dt.strftime('%Y-%m'),
+                anomalous['bucket'].tolist(),
+                anomalous['type'].tolist(),
+                amounts.tolist(),
+                expected.tolist(),
+                deviation.tolist(),
+                deviation_pct.tolist(),
+                severity.tolist()
+            )
+        ]
+    
     def _detect_isolation_forest_anomalies(self) -> List[Anomaly]:
         """Detect anomalies using Isolation Forest machine learning."""
-        anomalies = []
+        monthly = self.cube.rollup(['year_month', 'bucket', 'type']).reset_index()
         
-        # Group by bucket and month
-        monthly = self.df.groupby(['year_month', 'bucket', 'type'])['amount'].sum().reset_index()
+        # Work bucket by bucket, in order of first appearance
+        bucket_codes = pd.factorize(monthly['bucket'])[0]
+        monthly = monthly.iloc[np.argsort(bucket_codes, kind='stable')].reset_index(drop=True)
         
-        # For each bucket
-        for bucket in monthly['bucket'].unique():
-            bucket_data = monthly[monthly['bucket'] == bucket].copy()
-            
-            if len(bucket_data) < 10:  # Need more data for ML
-                continue
-            
-            # Prepare features
-            X = bucket_data[['amount']].values
-            
-            # Fit Isolation Forest
-            iso_forest = IsolationForest(
-                contamination=0.1,  # Expect 10% anomalies
-                random_state=42
-            )
-            predictions = iso_forest.fit_predict(X)
-            scores = iso_forest.score_samples(X)
-            
-            # -1 indicates anomaly
-            bucket_data['is_anomaly'] = predictions == -1
-            bucket_data['anomaly_score'] = scores
-            
-            anomalous = bucket_data[bucket_data['is_anomaly']]
-            
-            # Calculate expected value (median of normal points)
-            normal_amounts = bucket_data[~bucket_data['is_anomaly']]['amount']
-            expected = normal_amounts.median() if len(normal_amounts) > 0 else bucket_data['amount'].median()
-            
-            for _, row in anomalous.iterrows():
-                # Severity based on how negative the anomaly score is
-                severity = self._determine_severity(abs(row['anomaly_score']), 'isolation_forest')
-                
-                anomalies.append(Anomaly(
-                    date=row['year_month'].strftime('%Y-%m'),
-                    bucket=row['bucket'],
-                    type=row['type'],
-                    amount=float(row['amount']),
-                    expected_amount=float(expected),
-                    deviation=float(row['amount'] - expected),
-                    deviation_pct=float(((row['amount'] - expected) / abs(expected)) * 100) if expected != 0 else 0,
-                    severity=severity,
-                    method='isolation_forest'
-                ))
+        grouped = monthly.groupby('bucket', observed=True, sort=False)['amount']
+        eligible = (grouped.transform('size') >= self.ISOLATION_FOREST_MIN_POINTS).to_numpy()
+        
+        if self.isolation_forest_mode == 'pooled':
+            is_anomaly, scores = self._score_isolation_forest_pooled(monthly, eligible)
+        else:
+            is_anomaly, scores = self._score_isolation_forest_per_bucket(monthly, eligible)
+        
+        monthly['anomaly_score'] = scores
+        
+        # Expected value is the median of the bucket's normal points
+        normal_median = monthly['amount'].where(~is_anomaly).groupby(
+            monthly['bucket'], observed=True, sort=False
+        ).transform('median')
+        monthly['expected'] = normal_median.fillna(grouped.transform('median'))
+        
+        anomalies = self._build_anomalies(monthly[is_anomaly], 'expected', 'anomaly_score', 'isolation_forest')
         
         logger.info(f"Isolation Forest detected {len(anomalies)} anomalies")
         return anomalies
     
+    def _score_isolation_forest_per_bucket(
+        self,
+        monthly: pd.DataFrame,
+        eligible: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fit one Isolation Forest per bucket on its monthly amounts.
+        
+        Buckets are fitted in a process pool when parallel processing is
+        enabled, batched so each worker receives several buckets at a time.
+        """
+        is_anomaly = np.zeros(len(monthly), dtype=bool)
+        scores = np.full(len(monthly), np.nan)
+        
+        # monthly is ordered by bucket, so each bucket is a contiguous block
+        codes = pd.factorize(monthly['bucket'])[0]
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        blocks = [
+            block for block in np.split(np.arange(len(monthly)), boundaries)
+            if len(block) > 0 and eligible[block[0]]
+        ]
+        if not blocks:
+            return is_anomaly, scores
+        
+        amounts = monthly['amount'].to_numpy(dtype=float)
+        features = [amounts[block].reshape(-1, 1) for block in blocks]
+        
+        workers = min(self.max_workers, len(blocks))
+        if workers > 1:
+            logger.debug("Fitting Isolation Forests in parallel", buckets=len(blocks), workers=workers)
+            chunksize = max(1, len(blocks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_fit_isolation_forest, features, chunksize=chunksize))
+        else:
+            results = [_fit_isolation_forest(X) for X in features]
+        
+        for block, (block_anomaly, block_scores) in zip(blocks, results):
+            is_anomaly[block] = block_anomaly
+            scores[block] = block_scores
+        
+        return is_anomaly, scores
+    
+    def _score_isolation_forest_pooled(
+        self,
+        monthly: pd.DataFrame,
+        eligible: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fit a single Isolation Forest over all buckets.
+        
+        Amounts are made comparable across buckets with bucket-normalized
+        features: the amount's Z-score within its bucket, month of year, and
+        deviation from the trailing 3-month bucket mean in bucket standard
+        deviations. One model bounds the cost as buckets grow into the
+        thousands, and scoring runs over all rows at once.
+        """
+        is_anomaly = np.zeros(len(monthly), dtype=bool)
+        scores = np.full(len(monthly), np.nan)
+        
+        if not eligible.any():
+            return is_anomaly, scores
+        
+        amount = monthly['amount']
+        grouped = amount.groupby(monthly['bucket'], observed=True, sort=False)
+        std = grouped.transform('std').replace(0, np.nan)
+        zscore = (amount - grouped.transform('mean')) / std
+        
+        # Trailing mean of the previous three points from grouped cumulative sums
+        cumulative = grouped.cumsum().groupby(monthly['bucket'], observed=True, sort=False)
+        previous = np.minimum(grouped.cumcount(), 3)
+        trailing_sum = cumulative.shift(1) - cumulative.shift(4).fillna(0)
+        trailing_mean = trailing_sum / previous.replace(0, np.nan)
+        trailing_ratio = (amount - trailing_mean) / std
+        
+        X = np.column_stack([
+            zscore.fillna(0).to_numpy(dtype=float),
+            monthly['year_month'].dt.month.to_numpy(dtype=float),
+            trailing_ratio.fillna(0).to_numpy(dtype=float),
+        ])[eligible]
+        
+        iso_forest = IsolationForest(
+            contamination=0.1,  # Expect 10% anomalies
+            random_state=42,
+            n_jobs=self.max_workers
+        )
+        is_anomaly[eligible] = iso_forest.fit_predict(X) == -1
+        scores[eligible] = iso_forest.score_samples(X)
+        
+        return is_anomaly, scores
+    
     def _determine_severity(self, score: float, method: str) -> str:
         """Determine severity level based on score."""
-        if method == 'zscore':
-            if score > 4:
-                return 'high'
-            elif score > 3.5:
-                return 'medium'
-            else:
-                return 'low'
-        elif method == 'mad':
-            if score > 5:
-                return 'high'
-            elif score > 4:
-                return 'medium'
-            else:
-                return 'low'
-        elif method == 'isolation_forest':
-            if score < -0.3:
-                return 'high'
-            elif score < -0.2:
-                return 'medium'
-            else:
-                return 'low'
+        if method not in self.SEVERITY_THRESHOLDS:
+            return 'low'
+        
+        return str(self._severity_levels(np.array([score]), method)[0])
+    
+    def _severity_levels(self, scores: np.ndarray, method: str) -> np.ndarray:
+        """Determine severity levels for an array of scores."""
+        high, medium = self.SEVERITY_THRESHOLDS[method]
         
-        return 'low'
+        if method == 'isolation_forest':
+            # More negative scores are more anomalous
+            conditions = [scores < high, scores < medium]
+        else:
+            conditions = [scores > high, scores > medium]
+        
+        return np.select(conditions, ['high', 'medium'], default='low')
     
     def _deduplicate_anomalies(self, anomalies: List[Anomaly]) -> List[Anomaly]:
         """Remove duplicate anomalies (same date + bucket)."""
@@ -311,28 +425,118 @@ class AnomalyDetector:
         
         return unique
     
-    def _explain_anomaly(self, anomaly: Anomaly):
-        """Add explanation and top contributors to anomaly."""
-        # Get data for this anomaly
-        year_month = pd.to_datetime(anomaly.date).to_period('M')
+    def _drilldown_index(self) -> Dict:
+        """
+        Index ledger rows by (year_month, bucket) cell.
+        
+        Row positions are sorted by cell once and each cell is recorded as
+        a [start, end) range of that ordering, so a cell's rows are a slice
+        instead of a boolean scan over the ledger.
+        """
+        if self._drilldown is not None:
+            return self._drilldown
+        
+        cell_codes = []
+        distinct = []
+        for column in ['year_month', 'bucket']:
+            values = self.df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, uniques = pd.factorize(values)
+            cell_codes.append(codes.astype(np.int64))
+            distinct.append(pd.Index(uniques))
+        
+        ym_codes, bucket_codes = cell_codes
+        n_buckets = max(len(distinct[1]), 1)
+        keys = np.where(
+            (ym_codes >= 0) & (bucket_codes >= 0),
+            ym_codes * n_buckets + bucket_codes,
+            -1
+        )
+        
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        cells, starts = np.unique(sorted_keys, return_index=True)
+        ends = np.append(starts[1:], len(order))
+        
+        self._drilldown = {
+            'year_months': distinct[0],
+            'buckets': distinct[1],
+            'n_buckets': n_buckets,
+            'cells': cells,
+            'starts': starts,
+            'ends': ends,
+            'order': order,
+        }
+        return self._drilldown
+    
+    def _cell_rows(self, anomalies: List[Anomaly]) -> List[np.ndarray]:
+        """Get ledger row positions for each anomaly's (year_month, bucket) cell."""
+        index = self._drilldown_index()
+        
+        year_months = pd.to_datetime([a.date for a in anomalies]).to_period('M')
+        ym_codes = index['year_months'].get_indexer(year_months)
+        bucket_codes = index['buckets'].get_indexer([a.bucket for a in anomalies])
+        keys = np.where(
+            (ym_codes >= 0) & (bucket_codes >= 0),
+            ym_codes * index['n_buckets'] + bucket_codes,
+            -1
+        )
         
-        anomaly_data = self.df[
-            (self.df['year_month'] == year_month) &
-            (self.df['bucket'] == anomaly.bucket)
-        ].copy()
+        cells = index['cells']
+        found = np.searchsorted(cells, keys)
+        found = np.minimum(found, len(cells) - 1)
+        hit = (keys >= 0) & (len(cells) > 0) & (cells[found] == keys)
         
-        if len(anomaly_data) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        order, starts, ends = index['order'], index['starts'], index['ends']
+        return [
+            order[starts[pos]:ends[pos]] if matched else empty
+            for pos, matched in zip(found, hit)
+        ]
+    
+    def _explain_anomalies(self, anomalies: List[Anomaly]):
+        """Add explanations and top contributors to all anomalies in one grouped pass."""
+        if not anomalies:
             return
         
-        # Find top contributors
-        if 'customer_vendor' in anomaly_data.columns:
-            top_vendors = anomaly_data.groupby('customer_vendor')['amount'].sum().abs().nlargest(3)
-            anomaly.top_contributors = [
-                {'party': party, 'amount': float(amount)}
-                for party, amount in top_vendors.items()
-            ]
+        rows = self._cell_rows(anomalies)
         
-        # Generate explanation
+        if 'customer_vendor' in self.df.columns:
+            sizes = np.array([len(r) for r in rows])
+            positions = np.concatenate(rows)
+            cells = pd.DataFrame({
+                'anomaly': np.repeat(np.arange(len(anomalies)), sizes),
+                'party': self.df['customer_vendor'].take(positions).to_numpy(),
+                'amount': self.df['amount'].take(positions).to_numpy(),
+            })
+            
+            totals = cells.groupby(['anomaly', 'party'], observed=True)['amount'].sum().abs()
+            
+            # Largest three parties per anomaly, ties in party order
+            anomaly_ids = totals.index.get_level_values('anomaly').to_numpy()
+            ranked = totals.iloc[np.lexsort((-totals.to_numpy(), anomaly_ids))]
+            top = ranked.groupby(level='anomaly', sort=False).head(3)
+            
+            contributors: Dict[int, List[Dict]] = {}
+            for (anomaly_id, party), amount in top.items():
+                contributors.setdefault(anomaly_id, []).append({'party': party, 'amount': float(amount)})
+            
+            for anomaly_id, anomaly in enumerate(anomalies):
+                if len(rows[anomaly_id]) > 0:
+                    anomaly.top_contributors = contributors.get(anomaly_id, [])
+        
+        for anomaly, anomaly_rows in zip(anomalies, rows):
+            if len(anomaly_rows) > 0:
+                anomaly.explanation = self._format_explanation(anomaly)
+    
+    def _explain_anomaly(self, anomaly: Anomaly):
+        """Add explanation and top contributors to anomaly."""
+        self._explain_anomalies([anomaly])
+    
+    def _format_explanation(self, anomaly: Anomaly) -> str:
+        """Build the explanation text for an anomaly."""
         direction = "increase" if anomaly.deviation > 0 else "decrease"
         abs_pct = abs(anomaly.deviation_pct)
         
@@ -349,48 +553,68 @@ class AnomalyDetector:
                 f"Top contributor: {top_party} ({pct_of_total:.0f}% of total)"
             )
         
-        anomaly.explanation = ". ".join(explanation_parts)
+        return ". ".join(explanation_parts)
     
     def _create_summary(self, anomalies: List[Anomaly]) -> Dict:
         """Create summary statistics for anomalies."""
-        if not anomalies:
-            return {
-                'total_count': 0,
-                'high_severity_count': 0,
-                'medium_severity_count': 0,
-                'low_severity_count': 0,
-                'by_type': {},
-                'by_bucket': {}
-            }
-        
-        summary = {
-            'total_count': len(anomalies),
-            'high_severity_count': sum(1 for a in anomalies if a.severity == 'high'),
-            'medium_severity_count': sum(1 for a in anomalies if a.severity == 'medium'),
-            'low_severity_count': sum(1 for a in anomalies if a.severity == 'low'),
+        return summarize_anomalies(anomalies)
+
+
+def summarize_anomalies(anomalies: List[Anomaly]) -> Dict:
+    """Create summary statistics for a list of anomalies."""
+    if not anomalies:
+        return {
+            'total_count': 0,
+            'high_severity_count': 0,
+            'medium_severity_count': 0,
+            'low_severity_count': 0,
             'by_type': {},
             'by_bucket': {}
         }
-        
-        # Count by type
-        for anomaly in anomalies:
-            summary['by_type'][anomaly.type] = summary['by_type'].get(anomaly.type, 0) + 1
-            summary['by_bucket'][anomaly.bucket] = summary['by_bucket'].get(anomaly.bucket, 0) + 1
-        
-        return summary
+    
+    summary = {
+        'total_count': len(anomalies),
+        'high_severity_count': sum(1 for a in anomalies if a.severity == 'high'),
+        'medium_severity_count': sum(1 for a in anomalies if a.severity == 'medium'),
+        'low_severity_count': sum(1 for a in anomalies if a.severity == 'low'),
+        'by_type': {},
+        'by_bucket': {}
+    }
+    
+    # Count by type
+    for anomaly in anomalies:
+        summary['by_type'][anomaly.type] = summary['by_type'].get(anomaly.type, 0) + 1
+        summary['by_bucket'][anomaly.bucket] = summary['by_bucket'].get(anomaly.bucket, 0) + 1
+    
+    return summary
 
 
-def detect_anomalies(df: pd.DataFrame, config: Optional[Dict] = None) -> AnomalyResult:
+def detect_anomalies(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None
+) -> AnomalyResult:
     """
     Convenience function to detect anomalies.
     
     Args:
         df: Normalized FAGL DataFrame
         config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
     
     Returns:
         AnomalyResult object
     """
-    detector = AnomalyDetector(df, config)
+    detector = AnomalyDetector(df, config, cube)
     return detector.detect_all()
 
+
+def _fit_isolation_forest(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit an Isolation Forest and score its own points (process-pool worker)."""
+    iso_forest = IsolationForest(
+        contamination=0.1,  # Expect 10% anomalies
+        random_state=42
+    )
+    # -1 indicates anomaly
+    predictions = iso_forest.fit_predict(X)
+    return predictions == -1, iso_forest.score_samples(X)
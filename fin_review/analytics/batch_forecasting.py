@@ -0,0 +1,289 @@
+"""Vectorized forecasting of many monthly series with hierarchical reconciliation."""
+
+import numpy as np
+import pandas as pd
+import structlog
+from typing import List, Tuple
+from scipy import stats
+
+logger = structlog.get_logger()
+
+MODELS = ['seasonal_naive', 'ses', 'theta']
+RECONCILIATION_METHODS = ['bottom_up', 'mint']
+
+# Smoothing parameters tried for SES/Theta, chosen per series by in-sample SSE
+SES_ALPHAS = np.linspace(0.05, 0.95, 19)
+
+
+def seasonal_naive(Y: np.ndarray, horizon: int, season_length: int = 12) -> np.ndarray:
+    """
+    Repeat the last observed season (last value if history is shorter).
+    
+    Args:
+        Y: History matrix (series x months)
+        horizon: Periods to forecast
+        season_length: Season length in months
+    
+    Returns:
+        Forecast matrix (series x horizon)
+    """
+    m = season_length if Y.shape[1] >= season_length else 1
+    last_season = Y[:, -m:]
+    return last_season[:, np.arange(horizon) % m]
+
+
+def fit_ses(Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit simple exponential smoothing to all series at once.
+    
+    The recursion runs over months only; every series and candidate alpha
+    is updated together.
+    
+    Args:
+        Y: History matrix (series x months)
+    
+    Returns:
+        Tuple of (alpha per series, final level per series)
+    """
+    alphas = SES_ALPHAS[:, None]
+    level = np.repeat(Y[None, :, 0], len(SES_ALPHAS), axis=0)
+    sse = np.zeros_like(level)
+    
+    for t in range(1, Y.shape[1]):
+        error = Y[None, :, t] - level
+        sse += error ** 2
+        level = level + alphas * error
+    
+    best = np.argmin(sse, axis=0)
+    series = np.arange(Y.shape[0])
+    return SES_ALPHAS[best], level[best, series]
+
+
+def ses(Y: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Forecast with simple exponential smoothing (flat at the final level).
+    
+    Args:
+        Y: History matrix (series x months)
+        horizon: Periods to forecast
+    
+    Returns:
+        Forecast matrix (series x horizon)
+    """
+    _, level = fit_ses(Y)
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def theta(Y: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Forecast with the Theta method (SES plus half the linear trend).
+    
+    Args:
+        Y: History matrix (series x months)
+        horizon: Periods to forecast
+    
+    Returns:
+        Forecast matrix (series x horizon)
+    """
+    n_obs = Y.shape[1]
+    alpha, level = fit_ses(Y)
+    
+    # OLS slope of every series against time
+    t = np.arange(n_obs) - (n_obs - 1) / 2
+    slope = (Y @ t) / (t @ t) if n_obs > 1 else np.zeros(Y.shape[0])
+    
+    h = np.arange(1, horizon + 1)[None, :]
+    a = alpha[:, None]
+    drift = 0.5 * slope[:, None] * ((h - 1) + 1 / a - (1 - a) ** n_obs / a)
+    return level[:, None] + drift
+
+
+def forecast_series(
+    Y: np.ndarray,
+    horizon: int,
+    season_length: int = 12
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pick the best model per series on a holdout and forecast with it.
+    
+    The last months of history (up to the horizon, at most a quarter of the
+    history) are held out; each series keeps the model with the lowest
+    holdout MAE and is refitted on its full history.
+    
+    Args:
+        Y: History matrix (series x months)
+        horizon: Periods to forecast
+        season_length: Season length in months
+    
+    Returns:
+        Tuple of (forecast matrix, chosen model index per series,
+        holdout RMSE per series)
+    """
+    holdout = min(horizon, Y.shape[1] // 4)
+    
+    if holdout == 0 or Y.shape[1] - holdout < 3:
+        # Too little history to compare models; use SES and its one-step errors
+        chosen = np.full(Y.shape[0], MODELS.index('ses'))
+        rmse = np.sqrt(np.mean(np.diff(Y, axis=1) ** 2, axis=1)) if Y.shape[1] > 1 else np.zeros(Y.shape[0])
+        return ses(Y, horizon), chosen, rmse
+    
+    train, test = Y[:, :-holdout], Y[:, -holdout:]
+    errors = np.stack([
+        _run_model(name, train, holdout, season_length) - test
+        for name in MODELS
+    ])
+    
+    chosen = np.argmin(np.abs(errors).mean(axis=2), axis=0)
+    series = np.arange(Y.shape[0])
+    rmse = np.sqrt((errors[chosen, series] ** 2).mean(axis=1))
+    
+    full = np.stack([_run_model(name, Y, horizon, season_length) for name in MODELS])
+    return full[chosen, series], chosen, rmse
+
+
+def _run_model(name: str, Y: np.ndarray, horizon: int, season_length: int) -> np.ndarray:
+    """Forecast all series with one model."""
+    if name == 'seasonal_naive':
+        return seasonal_naive(Y, horizon, season_length)
+    if name == 'ses':
+        return ses(Y, horizon)
+    return theta(Y, horizon)
+
+
+def reconcile(
+    S: np.ndarray,
+    base: np.ndarray,
+    variances: np.ndarray,
+    method: str = 'bottom_up'
+) -> np.ndarray:
+    """
+    Make forecasts coherent with the aggregation hierarchy.
+    
+    Args:
+        S: Summing matrix (all nodes x bottom nodes), bottom nodes last
+        base: Base forecasts for all nodes (nodes x horizon)
+        variances: Base forecast error variance per node (used by 'mint')
+        method: 'bottom_up' or 'mint' (MinT with a diagonal covariance)
+    
+    Returns:
+        Reconciled forecasts for all nodes (nodes x horizon)
+    """
+    if method not in RECONCILIATION_METHODS:
+        raise ValueError(f"Unknown reconciliation method: {method}. Available: {RECONCILIATION_METHODS}")
+    
+    n_bottom = S.shape[1]
+    
+    if method == 'bottom_up':
+        bottom = base[-n_bottom:]
+    else:
+        # Floor zero variances (constant series) so every node keeps a finite weight
+        floor = max(float(np.max(variances)) * 1e-9, 1e-12)
+        weights = 1.0 / np.maximum(variances, floor)
+        SW = S.T * weights
+        bottom = np.linalg.solve(SW @ S, SW @ base)
+    
+    return S @ bottom
+
+
+class HierarchicalForecaster:
+    """Forecasts every bucket and reconciles buckets, types and the total."""
+    
+    TOTAL = 'Total'
+    
+    def __init__(
+        self,
+        monthly: pd.Series,
+        horizon: int,
+        confidence_level: float = 0.95,
+        reconciliation: str = 'bottom_up',
+        season_length: int = 12
+    ):
+        """
+        Initialize hierarchical forecaster.
+        
+        Args:
+            monthly: Amounts indexed by (type, bucket, year_month)
+            horizon: Periods to forecast
+            confidence_level: Prediction interval coverage
+            reconciliation: 'bottom_up' or 'mint'
+            season_length: Season length in months
+        """
+        if reconciliation not in RECONCILIATION_METHODS:
+            raise ValueError(
+                f"Unknown reconciliation method: {reconciliation}. Available: {RECONCILIATION_METHODS}"
+            )
+        
+        self.monthly = monthly
+        self.horizon = horizon
+        self.confidence_level = confidence_level
+        self.reconciliation = reconciliation
+        self.season_length = season_length
+    
+    def forecast(self) -> pd.DataFrame:
+        """
+        Forecast all nodes of the bucket -> type -> total hierarchy.
+        
+        Returns:
+            DataFrame with one row per node and forecast month
+        """
+        bottom = self.monthly.unstack('year_month', fill_value=0.0)
+        if bottom.empty:
+            return pd.DataFrame()
+        
+        months = pd.period_range(bottom.columns.min(), bottom.columns.max(), freq='M')
+        bottom = bottom.reindex(columns=months, fill_value=0.0)
+        
+        S, nodes = self._summing_matrix(bottom.index)
+        history = S @ bottom.to_numpy(dtype=float)
+        
+        base, chosen, rmse = forecast_series(history, self.horizon, self.season_length)
+        reconciled = reconcile(S, base, rmse ** 2, self.reconciliation)
+        
+        steps = np.arange(1, self.horizon + 1)
+        z_score = stats.norm.ppf(0.5 + self.confidence_level / 2)
+        margin = z_score * rmse[:, None] * np.sqrt(steps)[None, :]
+        
+        dates = pd.period_range(months[-1] + 1, periods=self.horizon, freq='M').strftime('%Y-%m')
+        n_nodes = len(nodes)
+        
+        logger.info(
+            "Hierarchical forecasts generated",
+            series=n_nodes,
+            buckets=len(bottom),
+            reconciliation=self.reconciliation
+        )
+        
+        return pd.DataFrame({
+            'date': np.tile(dates, n_nodes),
+            'level': np.repeat([n[0] for n in nodes], self.horizon),
+            'type': np.repeat([n[1] for n in nodes], self.horizon),
+            'bucket': np.repeat([n[2] for n in nodes], self.horizon),
+            'model': np.repeat(np.array(MODELS)[chosen], self.horizon),
+            'forecast': reconciled.ravel(),
+            'lower_bound': (reconciled - margin).ravel(),
+            'upper_bound': (reconciled + margin).ravel(),
+        })
+    
+    def _summing_matrix(self, bottom_index: pd.MultiIndex) -> Tuple[np.ndarray, List[Tuple]]:
+        """
+        Build the summing matrix for total, types and (type, bucket) leaves.
+        
+        Returns:
+            Tuple of (S matrix, list of (level, type, bucket) per node)
+        """
+        types = bottom_index.get_level_values(0)
+        type_codes, type_names = pd.factorize(types, sort=True)
+        n_bottom = len(bottom_index)
+        
+        S = np.vstack([
+            np.ones((1, n_bottom)),
+            (type_codes[None, :] == np.arange(len(type_names))[:, None]).astype(float),
+            np.eye(n_bottom),
+        ])
+        
+        nodes = (
+            [('total', self.TOTAL, None)] +
+            [('type', t, None) for t in type_names] +
+            [('bucket', t, b) for t, b in bottom_index]
+        )
+        return S, nodes
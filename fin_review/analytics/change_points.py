@@ -0,0 +1,228 @@
+"""Change-point (structural break) detection for monthly ledger series."""
+
+import pandas as pd
+import numpy as np
+import structlog
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+
+from .cube import LedgerCube
+
+logger = structlog.get_logger()
+
+
+def pelt(y: np.ndarray, penalty: float, min_size: int = 2) -> List[int]:
+    """
+    Find mean shifts with PELT (Pruned Exact Linear Time).
+    
+    Segment cost is the residual sum of squares around the segment mean,
+    read from cumulative sums in O(1), so the search runs in O(n) for
+    typical series.
+    
+    Args:
+        y: Series values
+        penalty: Cost added per change point
+        min_size: Minimum segment length
+    
+    Returns:
+        Sorted change-point positions (index of the first value of each new segment)
+    """
+    n = len(y)
+    if n < 2 * min_size:
+        return []
+    
+    s1 = np.concatenate([[0.0], np.cumsum(y)])
+    s2 = np.concatenate([[0.0], np.cumsum(y * y)])
+    
+    F = np.full(n + 1, np.inf)
+    F[0] = -penalty
+    last = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+    # A candidate beaten via t can be dropped once a segment starting at t is long enough
+    expiry = np.array([n + 1], dtype=np.int64)
+    
+    for t in range(min_size, n + 1):
+        live = expiry > t
+        candidates, expiry = candidates[live], expiry[live]
+        
+        admissible = t - candidates >= min_size
+        starts = candidates[admissible]
+        length = t - starts
+        segment_sum = s1[t] - s1[starts]
+        cost = np.maximum((s2[t] - s2[starts]) - segment_sum ** 2 / length, 0.0)
+        
+        total = F[starts] + cost + penalty
+        best = np.argmin(total)
+        F[t] = total[best]
+        last[t] = starts[best]
+        
+        # Prune candidates that can never be optimal again
+        beaten = np.zeros(len(candidates), dtype=bool)
+        beaten[admissible] = F[starts] + cost > F[t]
+        expiry = np.where(beaten, np.minimum(expiry, t + min_size), expiry)
+        
+        candidates = np.append(candidates, t)
+        expiry = np.append(expiry, n + 1)
+    
+    change_points = []
+    t = last[n]
+    while t > 0:
+        change_points.append(int(t))
+        t = last[t]
+    
+    return sorted(change_points)
+
+
+@dataclass
+class ChangePointResult:
+    """Container for change-point detection results."""
+    dimension: str
+    change_points: pd.DataFrame
+    segments: pd.DataFrame
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'dimension': self.dimension,
+            'change_points': self.change_points.to_dict('records'),
+            'segments': self.segments.to_dict('records'),
+        }
+
+
+class ChangePointDetector:
+    """Screens every series of a cube dimension for structural breaks."""
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        cube: Optional[LedgerCube] = None
+    ):
+        """
+        Initialize change-point detector.
+        
+        Args:
+            df: Normalized FAGL DataFrame
+            config: Configuration dictionary
+            cube: Shared ledger aggregate (built from df if not given)
+        """
+        self.df = df
+        self.config = config or {}
+        self.cube = cube if cube is not None else LedgerCube(df)
+        self.penalty_factor = self.config.get('change_point_penalty', 4.0)
+        self.min_size = self.config.get('change_point_min_size', 3)
+    
+    def detect(self, dimension: Optional[str] = None) -> ChangePointResult:
+        """
+        Detect mean shifts in the monthly series of every dimension member.
+        
+        Months without postings count as zero activity. The penalty scales
+        with each series' noise (robust sigma of first differences) and
+        log(length), BIC style.
+        
+        Args:
+            dimension: Cube dimension to screen (defaults to change_point_dimension, 'bucket')
+        
+        Returns:
+            ChangePointResult with one row per change point and per segment
+        """
+        dimension = dimension or self.config.get('change_point_dimension', 'bucket')
+        
+        matrix = self.cube.rollup(['year_month', dimension]).unstack(dimension)
+        if matrix.empty:
+            return ChangePointResult(dimension, pd.DataFrame(), pd.DataFrame())
+        
+        months = pd.period_range(matrix.index.min(), matrix.index.max(), freq='M')
+        matrix = matrix.reindex(months).fillna(0.0)
+        Y = matrix.to_numpy(dtype=float)
+        n_months = len(months)
+        
+        penalties = self.penalty_factor * self._noise_variance(Y) * np.log(max(n_months, 2))
+        labels = months.strftime('%Y-%m')
+        
+        breaks = []
+        segments = []
+        for j, member in enumerate(matrix.columns):
+            y = Y[:, j]
+            if penalties[j] <= 0:
+                bounds = [0, n_months]
+            else:
+                bounds = [0, *pelt(y, penalties[j], self.min_size), n_months]
+            
+            s1 = np.concatenate([[0.0], np.cumsum(y)])
+            starts, ends = np.array(bounds[:-1]), np.array(bounds[1:])
+            means = (s1[ends] - s1[starts]) / (ends - starts)
+            
+            segments.extend(
+                {dimension: member, 'start': labels[s], 'end': labels[e - 1], 'months': int(e - s), 'mean': float(m)}
+                for s, e, m in zip(starts, ends, means)
+            )
+            breaks.extend(
+                {
+                    dimension: member,
+                    'date': labels[s],
+                    'mean_before': float(before),
+                    'mean_after': float(after),
+                    'shift': float(after - before),
+                    'shift_pct': float((after - before) / abs(before) * 100) if before != 0 else None,
+                }
+                for s, before, after in zip(starts[1:], means[:-1], means[1:])
+            )
+        
+        change_points = pd.DataFrame(breaks, columns=[
+            dimension, 'date', 'mean_before', 'mean_after', 'shift', 'shift_pct'
+        ])
+        if len(change_points) > 0:
+            change_points = change_points.reindex(
+                change_points['shift'].abs().sort_values(ascending=False).index
+            ).reset_index(drop=True)
+        
+        logger.info(
+            "Change-point screening complete",
+            dimension=dimension,
+            series=matrix.shape[1],
+            change_points=len(change_points)
+        )
+        
+        return ChangePointResult(
+            dimension=dimension,
+            change_points=change_points,
+            segments=pd.DataFrame(segments)
+        )
+    
+    @staticmethod
+    def _noise_variance(Y: np.ndarray) -> np.ndarray:
+        """Robust noise variance per series from month-over-month differences."""
+        if Y.shape[0] < 2:
+            return np.zeros(Y.shape[1])
+        
+        diffs = np.diff(Y, axis=0)
+        mad = np.median(np.abs(diffs - np.median(diffs, axis=0)), axis=0)
+        sigma = 1.4826 * mad / np.sqrt(2)
+        
+        # Step-like series have zero MAD; fall back to the plain difference spread
+        fallback = diffs.std(axis=0) / np.sqrt(2)
+        sigma = np.where(sigma > 0, sigma, fallback)
+        return sigma ** 2
+
+
+def detect_change_points(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None,
+    dimension: Optional[str] = None
+) -> ChangePointResult:
+    """
+    Convenience function to screen series for structural breaks.
+    
+    Args:
+        df: Normalized FAGL DataFrame
+        config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
+        dimension: Cube dimension to screen (defaults to config or 'bucket')
+    
+    Returns:
+        ChangePointResult object
+    """
+    detector = ChangePointDetector(df, config, cube)
+    return detector.detect(dimension)
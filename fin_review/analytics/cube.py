@@ -0,0 +1,169 @@
+"""Shared monthly aggregate of the ledger for the analytics modules."""
+
+import pandas as pd
+import structlog
+from typing import Dict, List, Optional, Tuple
+
+logger = structlog.get_logger()
+
+
+class LedgerCube:
+    """
+    Ledger aggregated once over period, type, bucket, account, party and entity.
+
+    Analyzers read their monthly totals from rollups of this cube instead of
+    grouping the full transaction table themselves. Rollups are cached and
+    shared, so treat returned objects as read-only.
+    """
+
+    DEFAULT_DIMENSIONS = [
+        'year_month', 'type', 'bucket', 'gl_account', 'customer_vendor', 'company_code'
+    ]
+
+    MEASURES = ['amount', 'abs_amount', 'count']
+
+    def __init__(self, df: pd.DataFrame, dimensions: Optional[List[str]] = None):
+        """
+        Build the cube with one pass over the ledger.
+
+        Args:
+            df: Normalized FAGL DataFrame
+            dimensions: Columns to aggregate over (defaults to DEFAULT_DIMENSIONS;
+                columns missing from df are skipped)
+        """
+        self.dimensions = [d for d in (dimensions or self.DEFAULT_DIMENSIONS) if d in df.columns]
+        if not self.dimensions:
+            raise ValueError("None of the cube dimensions are present in the data")
+
+        self.row_count = len(df)
+
+        amount = df['amount']
+        values = pd.DataFrame({'amount': amount, 'abs_amount': amount.abs()}, index=df.index)
+
+        # Keep rows with missing keys; rollups decide whether to drop them
+        grouped = values.groupby(
+            [df[d] for d in self.dimensions],
+            observed=True,
+            dropna=False,
+            sort=True
+        )
+        self.data = grouped.sum()
+        self.data['count'] = grouped.size()
+
+        self._rollups: Dict[Tuple, pd.Series] = {}
+
+        logger.info(
+            "Ledger cube built",
+            rows=self.row_count,
+            cells=len(self.data),
+            dimensions=self.dimensions
+        )
+
+    @classmethod
+    def combine(cls, cubes: List['LedgerCube']) -> 'LedgerCube':
+        """
+        Merge cubes built over disjoint parts of one ledger.
+
+        Cells are summed from the parts' aggregates, so a group cube costs
+        no further pass over the transactions.
+
+        Args:
+            cubes: Cubes with the same dimensions (e.g. one per entity)
+
+        Returns:
+            LedgerCube equal to one built over the whole ledger
+        """
+        if not cubes:
+            raise ValueError("No cubes to combine")
+
+        dimensions = cubes[0].dimensions
+        if any(cube.dimensions != dimensions for cube in cubes):
+            raise ValueError(f"Cubes to combine must share dimensions: {dimensions}")
+
+        combined = cls.__new__(cls)
+        combined.dimensions = list(dimensions)
+        combined.row_count = sum(cube.row_count for cube in cubes)
+        combined.data = pd.concat([cube.data for cube in cubes]).groupby(
+            level=list(range(len(dimensions))),
+            observed=True,
+            dropna=False,
+            sort=True
+        ).sum()
+        combined._rollups = {}
+
+        logger.info(
+            "Ledger cubes combined",
+            parts=len(cubes),
+            rows=combined.row_count,
+            cells=len(combined.data)
+        )
+
+        return combined
+
+    def __getstate__(self) -> Dict:
+        """Pickle without cached rollups (e.g. when returned from worker processes)."""
+        state = self.__dict__.copy()
+        state['_rollups'] = {}
+        return state
+
+    def rollup(self, dimensions: List[str], measure: str = 'amount') -> pd.Series:
+        """
+        Aggregate a measure over a subset of the cube dimensions.
+
+        Keys with missing values are dropped, matching a plain groupby on
+        the transaction table.
+
+        Args:
+            dimensions: Dimensions to keep, in index order
+            measure: One of 'amount', 'abs_amount' or 'count'
+
+        Returns:
+            Series indexed by the requested dimensions
+        """
+        if measure not in self.MEASURES:
+            raise ValueError(f"Unknown cube measure: {measure}. Available: {self.MEASURES}")
+
+        missing = [d for d in dimensions if d not in self.dimensions]
+        if missing:
+            raise ValueError(f"Dimensions not in cube: {missing}. Available: {self.dimensions}")
+
+        key = (tuple(dimensions), measure)
+        if key not in self._rollups:
+            self._rollups[key] = self.data[measure].groupby(
+                level=list(dimensions),
+                observed=True,
+                sort=True
+            ).sum()
+
+        return self._rollups[key]
+
+    def monthly(self, value: str, dimension: str = 'type', measure: str = 'amount') -> pd.Series:
+        """
+        Get the monthly series for one member of a dimension.
+
+        Args:
+            value: Dimension member (e.g. 'Revenue')
+            dimension: Dimension to select on
+            measure: One of 'amount', 'abs_amount' or 'count'
+
+        Returns:
+            Series indexed by year_month (empty if the member has no rows)
+        """
+        rolled = self.rollup(['year_month', dimension], measure)
+
+        if value not in rolled.index.get_level_values(dimension):
+            return pd.Series(dtype=float, index=pd.PeriodIndex([], freq='M', name='year_month'))
+
+        return rolled.xs(value, level=dimension)
+
+    def members(self, dimension: str) -> List:
+        """
+        List the observed members of a dimension.
+
+        Args:
+            dimension: Cube dimension
+
+        Returns:
+            Sorted list of members present in the data
+        """
+        return self.rollup([dimension], 'count').index.tolist()
@@ -3,12 +3,30 @@
 import pandas as pd
 import numpy as np
 import structlog
-from typing import Dict, Optional, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, List
 from dataclasses import dataclass
 import warnings
 
+from .cube import LedgerCube
+from .model_cache import ModelCache
+from .batch_forecasting import HierarchicalForecaster
+
 logger = structlog.get_logger()
 
+# auto_arima search space for monthly series
+ARIMA_SEARCH = {
+    'seasonal': True,
+    'm': 12,  # Monthly seasonality
+    'suppress_warnings': True,
+    'error_action': 'ignore',
+    'stepwise': True,
+    'max_p': 3,
+    'max_q': 3,
+    'max_P': 2,
+    'max_Q': 2,
+}
+
 
 @dataclass
 class ForecastResult:
@@ -31,18 +49,41 @@ class ForecastResult:
 class Forecaster:
     """Generates forecasts for financial metrics."""
     
-    def __init__(self, df: pd.DataFrame, config: Optional[Dict] = None):
+    FORECAST_LEVELS = ['type', 'bucket']
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        cube: Optional[LedgerCube] = None
+    ):
         """
         Initialize forecaster.
         
         Args:
             df: Normalized FAGL DataFrame
             config: Configuration dictionary
+            cube: Shared ledger aggregate (built from df if not given)
         """
         self.df = df
         self.config = config or {}
+        self.cube = cube if cube is not None else LedgerCube(df)
         self.forecast_periods = self.config.get('forecast_periods', 6)
         self.confidence_level = self.config.get('forecast_confidence_level', 0.95)
+        self.max_workers = (
+            self.config.get('max_workers', 1) if self.config.get('parallel_processing', False) else 1
+        )
+        
+        cache_dir = self.config.get('cache_dir')
+        self.model_cache = ModelCache(cache_dir) if cache_dir else None
+        
+        self.forecast_level = self.config.get('forecast_level', 'type')
+        self.reconciliation = self.config.get('forecast_reconciliation', 'bottom_up')
+        
+        if self.forecast_level not in self.FORECAST_LEVELS:
+            raise ValueError(
+                f"Unknown forecast_level: {self.forecast_level}. Available: {self.FORECAST_LEVELS}"
+            )
     
     def forecast_all(self) -> ForecastResult:
         """
@@ -57,6 +98,11 @@ class Forecaster:
         
         logger.info(f"Generating forecasts for {self.forecast_periods} periods")
         
+        if self.forecast_level == 'bucket':
+            result = self._forecast_buckets()
+            logger.info("Using batched bucket-level forecasting")
+            return result
+        
         # Try different forecasting methods in order of preference
         try:
             # Try pmdarima ARIMA
@@ -76,51 +122,70 @@ class Forecaster:
                 return self._empty_result()
     
     def _forecast_arima(self) -> ForecastResult:
-        """Forecast using ARIMA model from pmdarima."""
+        """
+        Forecast using ARIMA model from pmdarima.
+        
+        Series are fitted in a process pool when parallel processing is
+        enabled. With a cache_dir, each fitted model is stored under a hash of
+        its series: an unchanged history reuses the cached model without any
+        search, and a history with one new month refits the cached order
+        starting from the cached parameters.
+        """
         try:
-            from pmdarima import auto_arima
+            import pmdarima  # noqa: F401
         except ImportError:
             raise ImportError("pmdarima not installed. Install with: pip install pmdarima")
         
-        forecasts = []
+        alpha = 1 - self.confidence_level
+        series = {}
+        models: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, Dict[str, Any]] = {}
         
         # Forecast for each major type
         for metric_type in ['Revenue', 'OPEX', 'Payroll']:
-            type_data = self.df[self.df['type'] == metric_type]
+            # Get monthly data
+            monthly = self.cube.monthly(metric_type)
             
-            if len(type_data) == 0:
+            if len(monthly) == 0:
                 continue
             
-            # Get monthly data
-            monthly = type_data.groupby('year_month')['amount'].sum()
-            
             if len(monthly) < 12:  # Need at least 12 months
                 logger.warning(f"Insufficient data for {metric_type} forecasting (need >= 12 months)")
                 continue
             
-            # Fit ARIMA model
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
+            series[metric_type] = monthly
+            values = monthly.values.astype(float)
+            task = {'values': values, 'forecast_periods': self.forecast_periods, 'alpha': alpha}
+            
+            if self.model_cache:
+                start = str(monthly.index[0])
+                key = self.model_cache.make_key(values, start, ARIMA_SEARCH)
+                cached = self.model_cache.load(key)
                 
-                model = auto_arima(
-                    monthly.values,
-                    seasonal=True,
-                    m=12,  # Monthly seasonality
-                    suppress_warnings=True,
-                    error_action='ignore',
-                    stepwise=True,
-                    max_p=3,
-                    max_q=3,
-                    max_P=2,
-                    max_Q=2
-                )
+                if cached is not None:
+                    horizon = cached.get('forecasts', {}).get(self._horizon_key(alpha))
+                    if horizon is not None:
+                        logger.debug(f"Reusing cached ARIMA model for {metric_type}")
+                        models[metric_type] = {**cached, **horizon}
+                        continue
+                    task['warm_start'] = cached
+                else:
+                    # One new month: warm-start from the model fitted on the previous history
+                    previous = self.model_cache.load(
+                        self.model_cache.make_key(values[:-1], start, ARIMA_SEARCH)
+                    )
+                    if previous is not None:
+                        task['warm_start'] = previous
+                
+                task['cache_key'] = key
             
-            # Generate forecast
-            forecast_values, conf_int = model.predict(
-                n_periods=self.forecast_periods,
-                return_conf_int=True,
-                alpha=1 - self.confidence_level
-            )
+            tasks[metric_type] = task
+        
+        models.update(self._fit_arima_models(tasks))
+        
+        forecasts = []
+        for metric_type, monthly in series.items():
+            model = models[metric_type]
             
             # Create forecast dates
             last_date = monthly.index[-1].to_timestamp()
@@ -135,9 +200,9 @@ class Forecaster:
                 forecasts.append({
                     'date': date.strftime('%Y-%m'),
                     'type': metric_type,
-                    'forecast': float(forecast_values[i]),
-                    'lower_bound': float(conf_int[i, 0]),
-                    'upper_bound': float(conf_int[i, 1]),
+                    'forecast': float(model['forecast'][i]),
+                    'lower_bound': float(model['conf_int'][i][0]),
+                    'upper_bound': float(model['conf_int'][i][1]),
                 })
         
         forecasts_df = pd.DataFrame(forecasts)
@@ -151,20 +216,69 @@ class Forecaster:
             confidence_level=self.confidence_level
         )
     
+    def _fit_arima_models(self, tasks: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Fit ARIMA models for several series, in parallel if enabled, and cache them."""
+        if not tasks:
+            return {}
+        
+        names = list(tasks)
+        workers = min(self.max_workers, len(names))
+        args = [
+            (task['values'], task['forecast_periods'], task['alpha'], task.get('warm_start'))
+            for task in tasks.values()
+        ]
+        
+        if workers > 1:
+            logger.debug("Fitting ARIMA models in parallel", series=len(names), workers=workers)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                fitted = list(executor.map(_fit_arima_series, *zip(*args)))
+        else:
+            fitted = [_fit_arima_series(*task_args) for task_args in args]
+        
+        models = dict(zip(names, fitted))
+        
+        if self.model_cache:
+            for name, model in models.items():
+                key = tasks[name].get('cache_key')
+                if key is None:
+                    continue
+                
+                warm_start = tasks[name].get('warm_start') or {}
+                same_model = (
+                    warm_start.get('order') == model['order'] and
+                    warm_start.get('seasonal_order') == model['seasonal_order']
+                )
+                horizons = dict(warm_start.get('forecasts', {})) if same_model else {}
+                horizons[self._horizon_key(tasks[name]['alpha'])] = {
+                    'forecast': model['forecast'],
+                    'conf_int': model['conf_int'],
+                }
+                
+                self.model_cache.save(key, {
+                    'order': model['order'],
+                    'seasonal_order': model['seasonal_order'],
+                    'params': model['params'],
+                    'forecasts': horizons,
+                })
+        
+        return models
+    
+    def _horizon_key(self, alpha: float) -> str:
+        """Key for a cached forecast horizon and interval width."""
+        return f"{self.forecast_periods}:{alpha:.6f}"
+    
     def _forecast_moving_average(self) -> ForecastResult:
         """Forecast using weighted moving average (fallback method)."""
         forecasts = []
         
         # Forecast for each major type
         for metric_type in ['Revenue', 'OPEX', 'Payroll']:
-            type_data = self.df[self.df['type'] == metric_type]
+            # Get monthly data
+            monthly = self.cube.monthly(metric_type)
             
-            if len(type_data) == 0:
+            if len(monthly) == 0:
                 continue
             
-            # Get monthly data
-            monthly = type_data.groupby('year_month')['amount'].sum()
-            
             if len(monthly) < 3:
                 continue
             
@@ -220,6 +334,36 @@ class Forecaster:
             confidence_level=self.confidence_level
         )
     
+    def _forecast_buckets(self) -> ForecastResult:
+        """
+        Forecast every bucket in one batch and reconcile the hierarchy.
+        
+        Seasonal naive, SES and Theta models are fitted to all bucket, type
+        and total series at once; each series keeps the model with the best
+        holdout error. Forecasts are then reconciled so buckets sum to their
+        type and types sum to the total.
+        """
+        monthly = self.cube.rollup(['type', 'bucket', 'year_month'])
+        
+        forecasts_df = HierarchicalForecaster(
+            monthly,
+            horizon=self.forecast_periods,
+            confidence_level=self.confidence_level,
+            reconciliation=self.reconciliation
+        ).forecast()
+        
+        if len(forecasts_df) == 0:
+            return self._empty_result()
+        
+        summary = self._create_forecast_summary(forecasts_df[forecasts_df['level'] == 'type'])
+        
+        return ForecastResult(
+            forecasts=forecasts_df,
+            summary=summary,
+            method_used=f'Batched ETS/Theta/Seasonal Naive ({self.reconciliation})',
+            confidence_level=self.confidence_level
+        )
+    
     def _create_forecast_summary(self, forecasts_df: pd.DataFrame) -> Dict:
         """Create summary of forecasts."""
         if len(forecasts_df) == 0:
@@ -231,7 +375,7 @@ class Forecaster:
             type_forecasts = forecasts_df[forecasts_df['type'] == metric_type]
             
             # Get historical average
-            historical = self.df[self.df['type'] == metric_type].groupby('year_month')['amount'].sum()
+            historical = self.cube.monthly(metric_type)
             historical_avg = historical.mean() if len(historical) > 0 else 0
             
             # Get forecast average
@@ -271,14 +415,12 @@ class Forecaster:
         Returns:
             DataFrame with forecasts or None
         """
-        type_data = self.df[self.df['type'] == metric_type]
+        monthly = self.cube.monthly(metric_type)
         
-        if len(type_data) == 0:
+        if len(monthly) == 0:
             logger.warning(f"No data found for {metric_type}")
             return None
         
-        monthly = type_data.groupby('year_month')['amount'].sum()
-        
         if len(monthly) < 3:
             logger.warning(f"Insufficient data for {metric_type} forecasting")
             return None
@@ -301,17 +443,69 @@ class Forecaster:
         return forecasts
 
 
-def generate_forecasts(df: pd.DataFrame, config: Optional[Dict] = None) -> ForecastResult:
+def generate_forecasts(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None
+) -> ForecastResult:
     """
     Convenience function to generate forecasts.
     
     Args:
         df: Normalized FAGL DataFrame
         config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
     
     Returns:
         ForecastResult object
     """
-    forecaster = Forecaster(df, config)
+    forecaster = Forecaster(df, config, cube)
     return forecaster.forecast_all()
 
+
+def _fit_arima_series(
+    values: np.ndarray,
+    forecast_periods: int,
+    alpha: float,
+    warm_start: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Fit an ARIMA model to one series and forecast it (process-pool worker).
+    
+    Without warm_start the order is chosen by auto_arima. With a cached
+    model the stepwise search is skipped: its order is refitted starting
+    from its fitted parameters.
+    """
+    from pmdarima import ARIMA, auto_arima
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        
+        if warm_start is None:
+            model = auto_arima(values, **ARIMA_SEARCH)
+        else:
+            model = ARIMA(
+                order=tuple(warm_start['order']),
+                seasonal_order=tuple(warm_start['seasonal_order']),
+                start_params=np.asarray(warm_start['params']),
+                suppress_warnings=True
+            )
+            try:
+                model.fit(values)
+            except Exception:
+                # Parameters no longer fit the extended history; search again
+                model = auto_arima(values, **ARIMA_SEARCH)
+    
+    forecast_values, conf_int = model.predict(
+        n_periods=forecast_periods,
+        return_conf_int=True,
+        alpha=alpha
+    )
+    
+    return {
+        'order': list(model.order),
+        'seasonal_order': list(model.seasonal_order),
+        'params': np.asarray(model.params()).tolist(),
+        'forecast': np.asarray(forecast_values).tolist(),
+        'conf_int': np.asarray(conf_int).tolist(),
+    }
@@ -6,6 +6,10 @@ import structlog
 from typing import Dict, Optional, List
 from dataclasses import dataclass
 
+from .cube import LedgerCube
+from .working_capital import WorkingCapitalAnalyzer
+from .parties import PartyAnalyzer, top_n_positions
+
 logger = structlog.get_logger()
 
 
@@ -16,30 +20,44 @@ class KPIResult:
     summary_kpis: Dict
     growth_metrics: Dict
     ratios: Dict
+    working_capital: Optional[Dict] = None
+    parties: Optional[Dict] = None
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        return {
+        result = {
             'monthly_kpis': self.monthly_kpis.to_dict('records'),
             'summary_kpis': self.summary_kpis,
             'growth_metrics': self.growth_metrics,
             'ratios': self.ratios,
         }
+        if self.working_capital:
+            result['working_capital'] = self.working_capital
+        if self.parties is not None:
+            result['parties'] = self.parties
+        return result
 
 
 class KPICalculator:
     """Calculates financial KPIs and metrics."""
     
-    def __init__(self, df: pd.DataFrame, config: Optional[Dict] = None):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        cube: Optional[LedgerCube] = None
+    ):
         """
         Initialize KPI calculator.
         
         Args:
             df: Normalized FAGL DataFrame with mapping information
             config: Configuration dictionary
+            cube: Shared ledger aggregate (built from df if not given)
         """
         self.df = df
         self.config = config or {}
+        self.cube = cube if cube is not None else LedgerCube(df)
     
     def calculate_all(self) -> KPIResult:
         """
@@ -50,8 +68,45 @@ class KPICalculator:
         """
         logger.info("Calculating KPIs")
         
-        monthly_kpis = self._calculate_monthly_kpis()
         summary_kpis = self._calculate_summary_kpis()
+        summary_kpis.update(self._ledger_summary_kpis())
+        
+        return self._build_result(summary_kpis)
+    
+    def consolidate(self, parts: List[KPIResult]) -> KPIResult:
+        """
+        Calculate group KPIs from a merged cube and the parts' KPI results.
+        
+        Monthly, summary, growth, ratio and party figures come from the
+        cube; transaction counts, average size and date range are combined
+        from the parts' summaries. Only working capital reads the ledger,
+        since it needs daily balances.
+        
+        Args:
+            parts: KPI results of the ledgers merged into the cube (e.g. one per entity)
+        
+        Returns:
+            KPIResult object for the combined ledger
+        """
+        logger.info("Consolidating KPIs", parts=len(parts))
+        
+        summaries = [part.summary_kpis for part in parts]
+        counts = np.array([summary['total_transactions'] for summary in summaries], dtype=float)
+        sizes = np.array([summary['avg_transaction_size'] for summary in summaries], dtype=float)
+        
+        summary_kpis = self._calculate_summary_kpis()
+        summary_kpis.update({
+            'total_transactions': int(counts.sum()),
+            'avg_transaction_size': float(np.average(sizes, weights=counts)) if counts.sum() > 0 else np.nan,
+            'start_date': min(summary['start_date'] for summary in summaries),
+            'end_date': max(summary['end_date'] for summary in summaries),
+        })
+        
+        return self._build_result(summary_kpis)
+    
+    def _build_result(self, summary_kpis: Dict) -> KPIResult:
+        """Add monthly, growth, ratio, working-capital and party figures to the summary."""
+        monthly_kpis = self._calculate_monthly_kpis()
         
         growth_metrics = {}
         ratios = {}
@@ -62,24 +117,28 @@ class KPICalculator:
         if self.config.get('enable_ratios', True):
             ratios = self._calculate_ratios(monthly_kpis)
         
+        working_capital = None
+        if self.config.get('enable_working_capital', True):
+            working_capital = WorkingCapitalAnalyzer(self.df, self.config).analyze().to_dict()
+        
+        # Customer/vendor concentration, shared with commentary and reports
+        parties = PartyAnalyzer(self.df, self.config, self.cube).analyze().to_dict()
+        
         logger.info("KPI calculation complete")
         
         return KPIResult(
             monthly_kpis=monthly_kpis,
             summary_kpis=summary_kpis,
             growth_metrics=growth_metrics,
-            ratios=ratios
+            ratios=ratios,
+            working_capital=working_capital,
+            parties=parties
         )
     
     def _calculate_monthly_kpis(self) -> pd.DataFrame:
         """Calculate monthly KPIs by type and bucket."""
-        # Group by year_month and type
-        monthly = self.df.groupby(['year_month', 'type']).agg({
-            'amount': 'sum',
-            'doc_id': 'count'
-        }).reset_index()
-        
-        monthly.columns = ['year_month', 'type', 'amount', 'transaction_count']
+        # Monthly totals by type from the shared cube
+        monthly = self.cube.rollup(['year_month', 'type']).reset_index()
         
         # Pivot to have types as columns
         monthly_pivot = monthly.pivot(
@@ -137,11 +196,11 @@ class KPICalculator:
         return monthly_pivot.reset_index()
     
     def _calculate_summary_kpis(self) -> Dict:
-        """Calculate summary KPIs across entire period."""
+        """Calculate summary KPIs across entire period from the cube."""
         summary = {}
         
         # Total by type
-        by_type = self.df.groupby('type')['amount'].sum().to_dict()
+        by_type = self.cube.rollup(['type']).to_dict()
         summary['total_by_type'] = by_type
         
         # Total revenue
@@ -164,22 +223,23 @@ class KPICalculator:
             summary['net_margin_pct'] = 0
         
         # Top buckets by amount
-        top_buckets = self.df.groupby('bucket')['amount'].sum().abs().nlargest(10)
+        top_buckets = self.cube.rollup(['bucket']).abs().nlargest(10)
         summary['top_10_buckets'] = top_buckets.to_dict()
         
         # Transaction counts
-        summary['total_transactions'] = len(self.df)
-        summary['transactions_by_type'] = self.df.groupby('type').size().to_dict()
-        
-        # Average transaction size
-        summary['avg_transaction_size'] = self.df['amount'].mean()
-        
-        # Date range
-        summary['start_date'] = self.df['posting_date'].min().strftime('%Y-%m-%d')
-        summary['end_date'] = self.df['posting_date'].max().strftime('%Y-%m-%d')
+        summary['transactions_by_type'] = self.cube.rollup(['type'], 'count').to_dict()
         
         return summary
     
+    def _ledger_summary_kpis(self) -> Dict:
+        """Calculate the summary KPIs read from the transactions themselves."""
+        return {
+            'total_transactions': len(self.df),
+            'avg_transaction_size': self.df['amount'].mean(),
+            'start_date': self.df['posting_date'].min().strftime('%Y-%m-%d'),
+            'end_date': self.df['posting_date'].max().strftime('%Y-%m-%d'),
+        }
+    
     def _calculate_growth_metrics(self, monthly_kpis: pd.DataFrame) -> Dict:
         """Calculate YoY, MoM growth rates and CAGR."""
         growth = {}
@@ -355,25 +415,37 @@ class KPICalculator:
         Returns:
             DataFrame with top items
         """
-        df = self.df.copy()
-        
-        if type_filter:
-            df = df[df['type'] == type_filter]
-        
-        if group_by not in df.columns:
-            logger.error(f"Column {group_by} not found in data")
-            return pd.DataFrame()
-        
-        top = df.groupby(group_by).agg({
-            'amount': 'sum',
-            'doc_id': 'count'
-        }).reset_index()
+        if group_by in self.cube.dimensions:
+            # Served from the shared cube (type x party is the same rollup PartyAnalyzer uses)
+            if type_filter:
+                amounts = self.cube.rollup(['type', group_by])
+                counts = self.cube.rollup(['type', group_by], 'count')
+                if type_filter not in amounts.index.get_level_values('type'):
+                    amounts, counts = amounts.iloc[:0].droplevel('type'), counts.iloc[:0].droplevel('type')
+                else:
+                    amounts, counts = amounts.xs(type_filter, level='type'), counts.xs(type_filter, level='type')
+            else:
+                amounts = self.cube.rollup([group_by])
+                counts = self.cube.rollup([group_by], 'count')
+        else:
+            df = self.df[self.df['type'] == type_filter] if type_filter else self.df
+            
+            if group_by not in df.columns:
+                logger.error(f"Column {group_by} not found in data")
+                return pd.DataFrame()
+            
+            grouped = df.groupby(group_by, observed=True)['amount']
+            amounts, counts = grouped.sum(), grouped.size()
         
-        top.columns = [group_by, 'total_amount', 'transaction_count']
-        top = top.sort_values('total_amount', key=abs, ascending=False).head(n)
+        top_positions = top_n_positions(np.abs(amounts.to_numpy(dtype=float)), n)
+        top = pd.DataFrame({
+            group_by: amounts.index[top_positions],
+            'total_amount': amounts.to_numpy(dtype=float)[top_positions],
+            'transaction_count': counts.reindex(amounts.index).to_numpy()[top_positions],
+        })
         
         # Calculate percentage of total
-        total = df['amount'].sum()
+        total = amounts.sum()
         if total != 0:
             top['pct_of_total'] = (top['total_amount'] / total) * 100
         else:
@@ -382,17 +454,22 @@ class KPICalculator:
         return top
 
 
-def calculate_kpis(df: pd.DataFrame, config: Optional[Dict] = None) -> KPIResult:
+def calculate_kpis(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None
+) -> KPIResult:
     """
     Convenience function to calculate KPIs.
     
     Args:
         df: Normalized FAGL DataFrame
         config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
     
     Returns:
         KPIResult object
     """
-    calculator = KPICalculator(df, config)
+    calculator = KPICalculator(df, config, cube)
     return calculator.calculate_all()
 
@@ -0,0 +1,93 @@
+"""Content-addressed cache for fitted forecasting models."""
+
+import hashlib
+import json
+import os
+import numpy as np
+import structlog
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+logger = structlog.get_logger()
+
+# Bump when the cached entry layout changes so stale entries are ignored
+CACHE_VERSION = 1
+
+
+class ModelCache:
+    """Stores selected model orders and fitted parameters as JSON, keyed by series hash."""
+    
+    def __init__(self, cache_dir: str):
+        """
+        Initialize model cache.
+        
+        Args:
+            cache_dir: Directory holding cached model entries
+        """
+        self.cache_dir = Path(cache_dir) / 'models'
+    
+    def make_key(self, values: Sequence[float], start: str, settings: Dict[str, Any]) -> str:
+        """
+        Build a cache key from a series and the model search settings.
+        
+        Args:
+            values: Series history
+            start: First period of the series (e.g. '2023-01')
+            settings: Model search settings that influence the fitted model
+        
+        Returns:
+            Hex digest identifying the fitted model
+        """
+        digest = hashlib.sha256()
+        digest.update(np.asarray(values, dtype=np.float64).tobytes())
+        digest.update(str(start).encode())
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        digest.update(str(CACHE_VERSION).encode())
+        return digest.hexdigest()
+    
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached model entry.
+        
+        Args:
+            key: Cache key from make_key()
+        
+        Returns:
+            Cached entry or None on a miss
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable model cache entry {path.name}: {e}")
+            return None
+    
+    def save(self, key: str, entry: Dict[str, Any]):
+        """
+        Store a model entry under the given key.
+        
+        Failures are logged and otherwise ignored so caching never breaks a forecast.
+        
+        Args:
+            key: Cache key from make_key()
+            entry: JSON-serializable model entry
+        """
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not cache model: {e}")
+            tmp_path.unlink(missing_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        """Get the JSON path for a key."""
+        return self.cache_dir / f"{key}.json"
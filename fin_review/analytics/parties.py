@@ -0,0 +1,246 @@
+"""Customer and vendor concentration (Top-N, Pareto/ABC, Herfindahl) from one aggregate."""
+
+import pandas as pd
+import numpy as np
+import structlog
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+
+from .cube import LedgerCube
+
+logger = structlog.get_logger()
+
+
+def top_n_positions(magnitudes: np.ndarray, n: int) -> np.ndarray:
+    """
+    Positions of the n largest values, largest first.
+    
+    Uses argpartition so only the selected values are sorted.
+    
+    Args:
+        magnitudes: Values to rank
+        n: Number of positions to return
+    
+    Returns:
+        Array of at most n positions
+    """
+    k = min(n, len(magnitudes))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    
+    selected = np.argpartition(-magnitudes, k - 1)[:k]
+    return selected[np.argsort(-magnitudes[selected], kind='stable')]
+
+
+@dataclass
+class PartyConcentration:
+    """Concentration profile of the parties posting to one type."""
+    type: str
+    parties: pd.DataFrame
+    total_amount: float
+    party_count: int
+    hhi: float
+    top_5_pct: float
+    pareto_party_count: int
+    pareto_party_pct: float
+    abc_counts: Dict[str, int] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'type': self.type,
+            'total_amount': self.total_amount,
+            'party_count': self.party_count,
+            'hhi': self.hhi,
+            'top_5_pct': self.top_5_pct,
+            'pareto_party_count': self.pareto_party_count,
+            'pareto_party_pct': self.pareto_party_pct,
+            'abc_counts': self.abc_counts,
+            'top_parties': self.parties.to_dict('records'),
+        }
+
+
+@dataclass
+class PartyResult:
+    """Container for party concentration results by type."""
+    concentrations: Dict[str, PartyConcentration]
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {type_: c.to_dict() for type_, c in self.concentrations.items()}
+
+
+class PartyAnalyzer:
+    """
+    Ranks customers and vendors and measures their concentration.
+    
+    Amounts come from the shared cube's type x party rollup, so the ledger
+    is aggregated once for KPIs, commentary and every report.
+    """
+    
+    REPORT_TOP_N = 20  # Parties kept per type for reports
+    ABC_B_THRESHOLD = 0.95  # Cumulative share closing class B
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        cube: Optional[LedgerCube] = None
+    ):
+        """
+        Initialize party analyzer.
+        
+        Args:
+            df: Normalized FAGL DataFrame
+            config: Configuration dictionary
+            cube: Shared ledger aggregate (built from df if not given)
+        """
+        self.df = df
+        self.config = config or {}
+        self.cube = cube if cube is not None else LedgerCube(df)
+        self.pareto_threshold = self.config.get('pareto_threshold', 0.80)
+        self.top_n = max(
+            self.REPORT_TOP_N,
+            self.config.get('top_n_vendors', 10),
+            self.config.get('top_n_customers', 10),
+            self.config.get('top_n_expenses', 15)
+        )
+    
+    def analyze(self, types: Optional[List[str]] = None) -> PartyResult:
+        """
+        Build the concentration profile of every type's parties.
+        
+        Args:
+            types: Types to profile (defaults to every type with parties)
+        
+        Returns:
+            PartyResult keyed by type
+        """
+        if 'customer_vendor' not in self.cube.dimensions or 'type' not in self.cube.dimensions:
+            logger.warning("No customer_vendor data for party analysis")
+            return PartyResult(concentrations={})
+        
+        amounts = self.cube.rollup(['type', 'customer_vendor'])
+        counts = self.cube.rollup(['type', 'customer_vendor'], 'count')
+        
+        # Rollups are sorted by type, so each type is one contiguous block
+        type_values = amounts.index.get_level_values('type')
+        party_values = amounts.index.get_level_values('customer_vendor')
+        codes, names = pd.factorize(type_values)
+        bounds = np.searchsorted(codes, np.arange(len(names) + 1))
+        
+        amount_values = amounts.to_numpy(dtype=float)
+        count_values = counts.to_numpy()
+        
+        wanted = set(types) if types is not None else None
+        concentrations = {}
+        for i, type_ in enumerate(names):
+            if wanted is not None and type_ not in wanted:
+                continue
+            block = slice(bounds[i], bounds[i + 1])
+            concentrations[type_] = self._profile(
+                type_,
+                party_values[block],
+                amount_values[block],
+                count_values[block]
+            )
+        
+        logger.info("Party concentration analyzed", types=len(concentrations))
+        
+        return PartyResult(concentrations=concentrations)
+    
+    def _profile(
+        self,
+        type_: str,
+        parties: pd.Index,
+        amounts: np.ndarray,
+        counts: np.ndarray
+    ) -> PartyConcentration:
+        """Top-N, Pareto/ABC split and HHI for one type's parties."""
+        magnitudes = np.abs(amounts)
+        total = float(magnitudes.sum())
+        party_count = len(magnitudes)
+        
+        # Cumulative share of the parties sorted by magnitude
+        if total > 0:
+            cumulative = np.cumsum(np.sort(magnitudes)[::-1]) / total
+            hhi = float(((magnitudes / total) ** 2).sum() * 10000)
+        else:
+            cumulative = np.zeros(party_count)
+            hhi = 0.0
+        
+        pareto_count = min(int(np.searchsorted(cumulative, self.pareto_threshold - 1e-12)) + 1, party_count)
+        b_count = min(int(np.searchsorted(cumulative, self.ABC_B_THRESHOLD - 1e-12)) + 1, party_count)
+        b_count = max(b_count, pareto_count)
+        
+        top = top_n_positions(magnitudes, self.top_n)
+        ranks = np.arange(len(top))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(total > 0, magnitudes[top] / total * 100, 0.0)
+        
+        top_parties = pd.DataFrame({
+            'party': np.asarray(parties)[top],
+            'total_amount': amounts[top],
+            'transaction_count': counts[top].astype(np.int64),
+            'pct_of_total': share,
+            'cumulative_pct': cumulative[:len(top)] * 100,
+            'abc_class': np.select([ranks < pareto_count, ranks < b_count], ['A', 'B'], default='C'),
+        })
+        
+        return PartyConcentration(
+            type=type_,
+            parties=top_parties,
+            total_amount=total,
+            party_count=party_count,
+            hhi=hhi,
+            top_5_pct=float(cumulative[min(5, party_count) - 1] * 100) if party_count else 0.0,
+            pareto_party_count=pareto_count,
+            pareto_party_pct=(pareto_count / party_count * 100) if party_count else 0.0,
+            abc_counts={
+                'A': pareto_count,
+                'B': b_count - pareto_count,
+                'C': party_count - b_count,
+            }
+        )
+
+
+def party_profiles(kpis: Optional[Dict], df: pd.DataFrame, config: Optional[Dict] = None) -> Dict:
+    """
+    Get party concentration profiles from KPI results, computing them if absent.
+    
+    Args:
+        kpis: KPI results (as from KPIResult.to_dict())
+        df: Normalized FAGL DataFrame, used only when kpis carry no profiles
+        config: Configuration dictionary
+    
+    Returns:
+        Profiles keyed by type (as from PartyResult.to_dict())
+    """
+    if kpis and kpis.get('parties') is not None:
+        return kpis['parties']
+    
+    if df is None or 'customer_vendor' not in df.columns:
+        return {}
+    
+    return analyze_parties(df, config).to_dict()
+
+
+def analyze_parties(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None
+) -> PartyResult:
+    """
+    Convenience function to profile party concentration.
+    
+    Args:
+        df: Normalized FAGL DataFrame
+        config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
+    
+    Returns:
+        PartyResult object
+    """
+    analyzer = PartyAnalyzer(df, config, cube)
+    return analyzer.analyze()
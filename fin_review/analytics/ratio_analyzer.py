@@ -7,6 +7,8 @@ from dataclasses import dataclass
 import structlog
 from datetime import datetime, date
 
+from .cube import LedgerCube
+
 logger = structlog.get_logger(__name__)
 
 
@@ -37,6 +39,321 @@ class GoingConcernAssessment:
     detailed_analysis: str
 
 
+# Statement lines fed directly by ABCOTD categories. Balance lines are
+# closing balances (cumulative to the period end), flow lines are the
+# period's movements. A category may feed several lines.
+STATEMENT_LINES = {
+    'Current Assets': ('balance', [
+        'Cash and cash equivalents',
+        'Inventory',
+        'Receivables - trade accounts',
+        'Other receivables',
+        'Prepaid expenses and accrued income'
+    ]),
+    'Non-Current Assets': ('balance', [
+        'Property, plant, and equipment',
+        'Intangibles - other',
+        'Leases - right of use assets',
+        'Deferred tax asset or liability'
+    ]),
+    'Current Liabilities': ('balance', [
+        'Payables - trade accounts',
+        'Other payables',
+        'Deferred revenue'
+    ]),
+    'Non-Current Liabilities': ('balance', [
+        'Lease liabilities',
+        'Deferred tax asset or liability'
+    ]),
+    'Total Equity': ('balance', ['Equity']),
+    'Cash and Cash Equivalents': ('balance', ['Cash and cash equivalents']),
+    'Revenue': ('flow', ['Revenue']),
+    'Cost of Sales': ('flow', ['Cost of sales']),
+    'Operating Expenses': ('flow', ['Operating expenses']),
+    'Payroll': ('flow', ['Payroll']),
+    'Depreciation': ('flow', [
+        'Depreciation of property, plant, and equipment',
+        'Depreciation/amortization of rights of use assets',
+        'Amortization of intangibles - other'
+    ]),
+    'Other Expenses': ('flow', ['Other expenses']),
+    'Interest Expense': ('flow', ['Interest on lease obligations']),
+    'Income Tax': ('flow', ['Income tax expense or benefit']),
+    # Cash costs netted as one line for the operating cash flow estimate
+    'Cash Operating Costs': ('flow', [
+        'Cost of sales',
+        'Operating expenses',
+        'Payroll',
+        'Other expenses'
+    ]),
+}
+
+# Lines derived from earlier lines, as {line: coefficient}, in dependency order
+DERIVED_LINES = {
+    'Total Assets': {'Current Assets': 1.0, 'Non-Current Assets': 1.0},
+    'Total Liabilities': {'Current Liabilities': 1.0, 'Non-Current Liabilities': 1.0},
+    'Gross Profit': {'Revenue': 1.0, 'Cost of Sales': -1.0},
+    'Total Operating Expenses': {
+        'Operating Expenses': 1.0, 'Payroll': 1.0, 'Depreciation': 1.0, 'Other Expenses': 1.0
+    },
+    'EBIT': {'Gross Profit': 1.0, 'Total Operating Expenses': -1.0},
+    'Net Income': {'EBIT': 1.0, 'Interest Expense': -1.0, 'Income Tax': -1.0},
+    'Operating Cash Flow': {'Revenue': 1.0, 'Cash Operating Costs': -1.0},
+    # CapEx estimated as 1.5x depreciation (rough approximation)
+    'Capital Expenditures': {'Depreciation': 1.5},
+    'Free Cash Flow': {'Operating Cash Flow': 1.0, 'Capital Expenditures': -1.0},
+}
+
+# Lines reported in each statement
+STATEMENTS = {
+    'balance_sheet': [
+        'Current Assets', 'Non-Current Assets', 'Total Assets', 'Current Liabilities',
+        'Non-Current Liabilities', 'Total Liabilities', 'Total Equity'
+    ],
+    'income_statement': [
+        'Revenue', 'Cost of Sales', 'Gross Profit', 'Operating Expenses', 'Payroll',
+        'Depreciation', 'Other Expenses', 'Total Operating Expenses', 'EBIT',
+        'Interest Expense', 'Income Tax', 'Net Income'
+    ],
+    'cash_flow': [
+        'Operating Cash Flow', 'Capital Expenditures', 'Free Cash Flow', 'Cash and Cash Equivalents'
+    ],
+}
+
+# Ratios as (numerator, denominator) linear combinations of lines; a None
+# denominator reports the numerator itself. Ratios with a zero denominator
+# are not applicable.
+RATIO_EXPRESSIONS = {
+    'current_ratio': ({'Current Assets': 1.0}, {'Current Liabilities': 1.0}),
+    # Inventory estimated as 20% of current assets (rough approximation)
+    'quick_ratio': ({'Current Assets': 0.8}, {'Current Liabilities': 1.0}),
+    'cash_ratio': ({'Cash and Cash Equivalents': 1.0}, {'Current Liabilities': 1.0}),
+    'operating_cash_flow_ratio': ({'Operating Cash Flow': 1.0}, {'Current Liabilities': 1.0}),
+    'working_capital': ({'Current Assets': 1.0, 'Current Liabilities': -1.0}, None),
+    'net_working_capital_ratio': (
+        {'Current Assets': 1.0, 'Current Liabilities': -1.0}, {'Total Assets': 1.0}
+    ),
+    'debt_to_equity_ratio': ({'Total Liabilities': 1.0}, {'Total Equity': 1.0}),
+    'equity_ratio': ({'Total Equity': 1.0}, {'Total Assets': 1.0}),
+    'debt_ratio': ({'Total Liabilities': 1.0}, {'Total Assets': 1.0}),
+    'interest_coverage_ratio': ({'EBIT': 1.0}, {'Interest Expense': 1.0}),
+    'cash_flow_to_debt_ratio': ({'Operating Cash Flow': 1.0}, {'Total Liabilities': 1.0}),
+    'free_cash_flow': ({'Free Cash Flow': 1.0}, None),
+    'free_cash_flow_to_revenue': ({'Free Cash Flow': 1.0}, {'Revenue': 1.0}),
+    'current_liability_coverage_ratio': ({'Free Cash Flow': 1.0}, {'Current Liabilities': 1.0}),
+    'net_profit_margin': ({'Net Income': 1.0}, {'Revenue': 1.0}),
+    'return_on_assets': ({'Net Income': 1.0}, {'Total Assets': 1.0}),
+    'return_on_equity': ({'Net Income': 1.0}, {'Total Equity': 1.0}),
+    'asset_turnover': ({'Revenue': 1.0}, {'Total Assets': 1.0}),
+}
+
+
+# Stress drivers drawn per scenario as normal(mean, std) clipped to [0, max]
+STRESS_DRIVERS = {
+    'revenue_decline': {'mean': 0.10, 'std': 0.10, 'max': 1.0},  # Share of revenue lost
+    'cost_inflation': {'mean': 0.05, 'std': 0.05, 'max': None},  # Rise in operating costs
+    'collection_delay_days': {'mean': 15.0, 'std': 15.0, 'max': None},  # Extra days to collect
+    'rate_shock': {'mean': 0.25, 'std': 0.25, 'max': None},  # Rise in interest expense
+}
+
+# Score per ratio status and overall score floors of the status bands
+STATUS_POINTS = {'excellent': 90, 'good': 75, 'warning': 50, 'critical': 25}
+STATUS_BANDS = {'strong': 80, 'adequate': 60, 'concerning': 40}
+NEUTRAL_SCORE = 50.0  # Category score when none of its ratios applies
+SCORED_CATEGORIES = {'liquidity': 'Liquidity', 'solvency': 'Solvency', 'cash_flow': 'Cash Flow'}
+
+
+class RatioEngine:
+    """
+    Evaluates the declared ratios for many periods and entities at once.
+    
+    The declarations compile to matrices: an ABCOTD x line lookup table, a
+    line matrix expressing every derived line in base lines, and numerator
+    and denominator matrices over the lines. Evaluating a (period x entity
+    x category) amount array is then a few matrix products.
+    """
+    
+    def __init__(
+        self,
+        lines: Optional[Dict] = None,
+        derived: Optional[Dict] = None,
+        ratios: Optional[Dict] = None
+    ):
+        """
+        Compile the line and ratio declarations.
+        
+        Args:
+            lines: Base lines as {line: (kind, ABCOTD categories)} (defaults to STATEMENT_LINES)
+            derived: Derived lines as {line: {line: coefficient}} (defaults to DERIVED_LINES)
+            ratios: Ratios as {name: (numerator, denominator)} (defaults to RATIO_EXPRESSIONS)
+        """
+        lines = lines or STATEMENT_LINES
+        derived = derived or DERIVED_LINES
+        ratios = ratios or RATIO_EXPRESSIONS
+        
+        base = list(lines)
+        self.base_names = base
+        self.line_names = base + list(derived)
+        self.ratio_names = list(ratios)
+        line_position = {name: i for i, name in enumerate(self.line_names)}
+        
+        # ABCOTD -> base line lookup table
+        self.categories = pd.Index(sorted({c for _, cats in lines.values() for c in cats}))
+        self.membership = np.zeros((len(self.categories), len(base)))
+        for j, (_, cats) in enumerate(lines.values()):
+            self.membership[self.categories.get_indexer(cats), j] = 1.0
+        self.is_balance = np.array([kind == 'balance' for kind, _ in lines.values()])
+        
+        # Every line as a combination of base lines
+        self.line_matrix = np.zeros((len(base), len(self.line_names)))
+        self.line_matrix[:, :len(base)] = np.eye(len(base))
+        for name, terms in derived.items():
+            column = line_position[name]
+            for line, coefficient in terms.items():
+                self.line_matrix[:, column] += coefficient * self.line_matrix[:, line_position[line]]
+        
+        # Numerators and denominators over the lines plus a constant one
+        self.numerators = np.zeros((len(self.line_names) + 1, len(self.ratio_names)))
+        self.denominators = np.zeros_like(self.numerators)
+        for r, (numerator, denominator) in enumerate(ratios.values()):
+            for line, coefficient in numerator.items():
+                self.numerators[line_position[line], r] = coefficient
+            if denominator is None:
+                self.denominators[-1, r] = 1.0
+            for line, coefficient in (denominator or {}).items():
+                self.denominators[line_position[line], r] = coefficient
+    
+    def statement_lines(self, amounts: np.ndarray) -> np.ndarray:
+        """
+        Build statement lines from category amounts.
+        
+        Args:
+            amounts: Amounts per (period x entity x category), categories
+                ordered as self.categories
+        
+        Returns:
+            Array of (period x entity x line), lines ordered as self.line_names
+        """
+        return self.derive(self.base_lines(amounts))
+    
+    def base_lines(self, amounts: np.ndarray) -> np.ndarray:
+        """
+        Build the base lines from category amounts.
+        
+        Base lines are reported in absolute terms, as in the statements.
+        
+        Args:
+            amounts: Amounts per (period x entity x category)
+        
+        Returns:
+            Array of (period x entity x base line), ordered as self.base_names
+        """
+        balances = np.cumsum(amounts, axis=0)
+        base = np.where(self.is_balance, balances @ self.membership, amounts @ self.membership)
+        return np.abs(base)
+    
+    def derive(self, base: np.ndarray) -> np.ndarray:
+        """
+        Complete base lines with the derived lines.
+        
+        Args:
+            base: Array of (... x base line)
+        
+        Returns:
+            Array of (... x line), lines ordered as self.line_names
+        """
+        return base @ self.line_matrix
+    
+    def evaluate(self, lines: np.ndarray) -> np.ndarray:
+        """
+        Evaluate every ratio from statement lines.
+        
+        Args:
+            lines: Array of (period x entity x line)
+        
+        Returns:
+            Array of (period x entity x ratio), NaN where a denominator is zero
+        """
+        extended = np.concatenate([lines, np.ones(lines.shape[:-1] + (1,))], axis=-1)
+        numerator = extended @ self.numerators
+        denominator = extended @ self.denominators
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(denominator != 0, numerator / denominator, np.nan)
+    
+    def category_amounts(self, totals: pd.Series, axes: List[pd.Index]) -> np.ndarray:
+        """
+        Scatter aggregated amounts into an (axes... x category) array.
+        
+        Args:
+            totals: Amounts indexed by the axes' keys followed by ABCOTD
+            axes: Leading axes, e.g. [periods, entities] (empty for one total)
+        
+        Returns:
+            Amount array; keys outside the axes or the lookup table are dropped
+        """
+        keys = totals.index
+        positions = [axis.get_indexer(keys.get_level_values(i)) for i, axis in enumerate(axes)]
+        positions.append(self.categories.get_indexer(keys.get_level_values(len(axes))))
+        keep = np.logical_and.reduce([p >= 0 for p in positions])
+        
+        shape = tuple(len(axis) for axis in axes) + (len(self.categories),)
+        cells = np.ravel_multi_index(tuple(p[keep] for p in positions), shape)
+        values = totals.to_numpy(dtype=float)[keep]
+        return np.bincount(cells, weights=values, minlength=int(np.prod(shape))).reshape(shape)
+
+
+@dataclass
+class RatioTrendResult:
+    """Container for ratio trends by period and entity."""
+    entity_dimension: str
+    ratios: pd.DataFrame
+    status: pd.DataFrame
+    lines: pd.DataFrame
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        def records(frame: pd.DataFrame) -> List[Dict]:
+            flat = frame.reset_index()
+            flat['year_month'] = flat['year_month'].astype(str)
+            return flat.astype(object).where(flat.notna(), None).to_dict('records')
+        
+        return {
+            'entity_dimension': self.entity_dimension,
+            'ratios': records(self.ratios),
+            'status': records(self.status),
+            'lines': records(self.lines),
+        }
+
+
+@dataclass
+class StressTestResult:
+    """Container for Monte Carlo going-concern stress test results."""
+    n_scenarios: int
+    base_scores: Dict[str, float]
+    base_status: str
+    scores: pd.DataFrame
+    score_percentiles: pd.DataFrame
+    status_probabilities: Dict[str, float]
+    breach_probabilities: Dict[str, float]
+    ratio_critical_probabilities: Dict[str, float]
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization (without per-scenario scores)."""
+        return {
+            'n_scenarios': self.n_scenarios,
+            'base_scores': self.base_scores,
+            'base_status': self.base_status,
+            'score_percentiles': {
+                score: {f'p{int(q)}': float(v) for q, v in values.items()}
+                for score, values in self.score_percentiles.to_dict().items()
+            },
+            'status_probabilities': self.status_probabilities,
+            'breach_probabilities': self.breach_probabilities,
+            'ratio_critical_probabilities': self.ratio_critical_probabilities,
+        }
+
+
 class FinancialRatioAnalyzer:
     """Comprehensive financial ratio analysis for going concern assessment."""
     
@@ -52,6 +369,9 @@ class FinancialRatioAnalyzer:
         self.balance_sheet_data: Optional[pd.DataFrame] = None
         self.income_statement_data: Optional[pd.DataFrame] = None
         self.cash_flow_data: Optional[pd.DataFrame] = None
+        self.engine = RatioEngine()
+        self.ratio_values: Dict[str, float] = {}
+        self.base_values: Optional[np.ndarray] = None
         
         # Define ratio configurations
         self.ratio_configs = {
@@ -184,20 +504,29 @@ class FinancialRatioAnalyzer:
             }
         }
     
-    def analyze(self, mapped_df: pd.DataFrame) -> Tuple[List[RatioResult], GoingConcernAssessment]:
+    def analyze(
+        self,
+        mapped_df: pd.DataFrame,
+        cube: Optional[LedgerCube] = None
+    ) -> Tuple[List[RatioResult], GoingConcernAssessment]:
         """
         Perform comprehensive financial ratio analysis.
         
         Args:
             mapped_df: Mapped financial data with ABCOTD classifications
-            
+            cube: Shared ledger aggregate with ABCOTD and bucket dimensions
+                (built from mapped_df if not given)
+        
         Returns:
             Tuple of (ratios, going_concern_assessment)
         """
         logger.info("Starting comprehensive financial ratio analysis")
         
+        if cube is None:
+            cube = LedgerCube(mapped_df, dimensions=['ABCOTD', 'bucket'])
+        
         # Prepare financial statements data
-        self._prepare_financial_statements(mapped_df)
+        self._prepare_financial_statements(cube)
         
         # Calculate all applicable ratios
         self._calculate_ratios()
@@ -211,190 +540,288 @@ class FinancialRatioAnalyzer:
         
         return self.ratios, going_concern
     
-    def _prepare_financial_statements(self, mapped_df: pd.DataFrame):
-        """Prepare financial statements data from mapped transactions."""
+    def _prepare_financial_statements(self, cube: LedgerCube):
+        """Prepare financial statements data from the aggregated ledger."""
         logger.info("Preparing financial statements data")
         
-        # Aggregate by ABCOTD categories
-        aggregated = mapped_df.groupby(['ABCOTD', 'bucket']).agg({
-            'amount': 'sum'
-        }).reset_index()
+        # The whole dataset as one period of one entity
+        amounts = self.engine.category_amounts(cube.rollup(['ABCOTD']), [])
+        self.base_values = self.engine.base_lines(amounts[None, None])[0, 0]
+        lines = self.engine.derive(self.base_values)[None, None]
+        values = dict(zip(self.engine.line_names, lines[0, 0]))
+        self.ratio_values = dict(zip(self.engine.ratio_names, self.engine.evaluate(lines)[0, 0]))
         
-        # Create balance sheet data
-        self.balance_sheet_data = self._create_balance_sheet(aggregated)
-        
-        # Create income statement data
-        self.income_statement_data = self._create_income_statement(aggregated)
-        
-        # Create cash flow data (estimated from available data)
-        self.cash_flow_data = self._create_cash_flow_statement(aggregated)
+        self.balance_sheet_data = self._statement_frame(values, 'balance_sheet')
+        self.income_statement_data = self._statement_frame(values, 'income_statement')
+        self.cash_flow_data = self._statement_frame(values, 'cash_flow')
         
         logger.info("Financial statements prepared",
                    balance_sheet_items=len(self.balance_sheet_data),
                    income_statement_items=len(self.income_statement_data),
                    cash_flow_items=len(self.cash_flow_data))
     
-    def _create_balance_sheet(self, aggregated: pd.DataFrame) -> pd.DataFrame:
-        """Create balance sheet from aggregated ABCOTD data."""
-        balance_sheet = {}
-        
-        # Current Assets
-        current_assets = aggregated[
-            aggregated['ABCOTD'].isin([
-                'Cash and cash equivalents',
-                'Inventory',
-                'Receivables - trade accounts',
-                'Other receivables',
-                'Prepaid expenses and accrued income'
-            ])
-        ]['amount'].sum()
-        balance_sheet['Current Assets'] = abs(current_assets)
-        
-        # Non-Current Assets
-        non_current_assets = aggregated[
-            aggregated['ABCOTD'].isin([
-                'Property, plant, and equipment',
-                'Intangibles - other',
-                'Leases - right of use assets',
-                'Deferred tax asset or liability'
-            ])
-        ]['amount'].sum()
-        balance_sheet['Non-Current Assets'] = abs(non_current_assets)
-        
-        # Total Assets
-        balance_sheet['Total Assets'] = balance_sheet['Current Assets'] + balance_sheet['Non-Current Assets']
-        
-        # Current Liabilities
-        current_liabilities = aggregated[
-            aggregated['ABCOTD'].isin([
-                'Payables - trade accounts',
-                'Other payables',
-                'Deferred revenue'
-            ])
-        ]['amount'].sum()
-        balance_sheet['Current Liabilities'] = abs(current_liabilities)
-        
-        # Non-Current Liabilities
-        non_current_liabilities = aggregated[
-            aggregated['ABCOTD'].isin([
-                'Lease liabilities',
-                'Deferred tax asset or liability'
-            ])
-        ]['amount'].sum()
-        balance_sheet['Non-Current Liabilities'] = abs(non_current_liabilities)
-        
-        # Total Liabilities
-        balance_sheet['Total Liabilities'] = balance_sheet['Current Liabilities'] + balance_sheet['Non-Current Liabilities']
-        
-        # Equity
-        equity = aggregated[aggregated['ABCOTD'] == 'Equity']['amount'].sum()
-        balance_sheet['Total Equity'] = abs(equity)
-        
-        return pd.DataFrame([balance_sheet])
-    
-    def _create_income_statement(self, aggregated: pd.DataFrame) -> pd.DataFrame:
-        """Create income statement from aggregated ABCOTD data."""
-        income_statement = {}
-        
-        # Revenue
-        revenue = aggregated[aggregated['ABCOTD'] == 'Revenue']['amount'].sum()
-        income_statement['Revenue'] = abs(revenue)
-        
-        # Cost of Sales
-        cost_of_sales = aggregated[aggregated['ABCOTD'] == 'Cost of sales']['amount'].sum()
-        income_statement['Cost of Sales'] = abs(cost_of_sales)
-        
-        # Gross Profit
-        income_statement['Gross Profit'] = income_statement['Revenue'] - income_statement['Cost of Sales']
-        
-        # Operating Expenses
-        operating_expenses = aggregated[aggregated['ABCOTD'] == 'Operating expenses']['amount'].sum()
-        income_statement['Operating Expenses'] = abs(operating_expenses)
-        
-        # Payroll
-        payroll = aggregated[aggregated['ABCOTD'] == 'Payroll']['amount'].sum()
-        income_statement['Payroll'] = abs(payroll)
-        
-        # Depreciation
-        depreciation = aggregated[
-            aggregated['ABCOTD'].isin([
-                'Depreciation of property, plant, and equipment',
-                'Depreciation/amortization of rights of use assets',
-                'Amortization of intangibles - other'
-            ])
-        ]['amount'].sum()
-        income_statement['Depreciation'] = abs(depreciation)
-        
-        # Other Expenses
-        other_expenses = aggregated[aggregated['ABCOTD'] == 'Other expenses']['amount'].sum()
-        income_statement['Other Expenses'] = abs(other_expenses)
-        
-        # Total Operating Expenses
-        income_statement['Total Operating Expenses'] = (
-            income_statement['Operating Expenses'] + 
-            income_statement['Payroll'] + 
-            income_statement['Depreciation'] + 
-            income_statement['Other Expenses']
-        )
+    @staticmethod
+    def _statement_frame(values: Dict[str, float], statement: str) -> pd.DataFrame:
+        """One-row DataFrame with a statement's lines."""
+        return pd.DataFrame([{line: float(values[line]) for line in STATEMENTS[statement]}])
+    
+    def ratio_trends(
+        self,
+        mapped_df: pd.DataFrame,
+        cube: Optional[LedgerCube] = None,
+        entity_dimension: str = 'company_code'
+    ) -> RatioTrendResult:
+        """
+        Evaluate every ratio for every month and entity in one pass.
         
-        # EBIT (Earnings Before Interest and Taxes)
-        income_statement['EBIT'] = income_statement['Gross Profit'] - income_statement['Total Operating Expenses']
+        Balance-sheet lines are month-end closing balances and income and
+        cash-flow lines are the month's movements, so margins, returns and
+        coverage ratios are monthly figures.
         
-        # Interest Expense (estimated)
-        interest_expense = aggregated[aggregated['ABCOTD'] == 'Interest on lease obligations']['amount'].sum()
-        income_statement['Interest Expense'] = abs(interest_expense)
+        Args:
+            mapped_df: Mapped financial data with ABCOTD classifications
+            cube: Shared ledger aggregate with year_month, entity and ABCOTD
+                dimensions (built from mapped_df if not given)
+            entity_dimension: Column identifying the entity
         
-        # Income Tax
-        income_tax = aggregated[aggregated['ABCOTD'] == 'Income tax expense or benefit']['amount'].sum()
-        income_statement['Income Tax'] = abs(income_tax)
+        Returns:
+            RatioTrendResult indexed by (year_month, entity)
+        """
+        dimensions = ['year_month', entity_dimension, 'ABCOTD']
+        if cube is None or any(d not in cube.dimensions for d in dimensions):
+            source = mapped_df
+            if 'year_month' not in source.columns:
+                source = source.assign(year_month=pd.to_datetime(source['posting_date']).dt.to_period('M'))
+            if entity_dimension not in source.columns:
+                source = source.assign(**{entity_dimension: 'ALL'})
+            cube = LedgerCube(source, dimensions=dimensions)
+        
+        totals = cube.rollup(dimensions)
+        if totals.empty:
+            logger.warning("No ABCOTD data for ratio trends")
+            empty = pd.DataFrame()
+            return RatioTrendResult(entity_dimension, empty, empty, empty)
+        
+        # Months may be periods or 'YYYY-MM' strings; fill gaps so balances carry over
+        keys = totals.index
+        months = pd.PeriodIndex(keys.get_level_values(0), freq='M')
+        totals = totals.set_axis(pd.MultiIndex.from_arrays(
+            [months, keys.get_level_values(1), keys.get_level_values(2)]
+        ))
+        periods = pd.period_range(months.min(), months.max(), freq='M')
+        entities = keys.get_level_values(1).unique().sort_values()
+        
+        amounts = self.engine.category_amounts(totals, [periods, entities])
+        lines = self.engine.statement_lines(amounts)
+        values = self.engine.evaluate(lines)
+        
+        index = pd.MultiIndex.from_product([periods, entities], names=['year_month', entity_dimension])
+        ratios = pd.DataFrame(
+            values.reshape(-1, len(self.engine.ratio_names)),
+            index=index,
+            columns=self.engine.ratio_names
+        )
         
-        # Net Income
-        income_statement['Net Income'] = (
-            income_statement['EBIT'] - 
-            income_statement['Interest Expense'] - 
-            income_statement['Income Tax']
+        logger.info("Ratio trends evaluated",
+                   periods=len(periods),
+                   entities=len(entities),
+                   ratios=len(self.engine.ratio_names))
+        
+        return RatioTrendResult(
+            entity_dimension=entity_dimension,
+            ratios=ratios,
+            status=self._status_frame(ratios),
+            lines=pd.DataFrame(
+                lines.reshape(-1, len(self.engine.line_names)),
+                index=index,
+                columns=self.engine.line_names
+            )
         )
+    
+    def _status_frame(self, ratios: pd.DataFrame) -> pd.DataFrame:
+        """Status of every ratio value (None where not applicable), as _determine_status."""
+        values = ratios.to_numpy(dtype=float)
+        limits = {
+            level: np.array([self.ratio_configs[name]['thresholds'][level] for name in ratios.columns])
+            for level in ('excellent', 'good', 'warning')
+        }
         
-        return pd.DataFrame([income_statement])
+        status = np.select(
+            [values >= limits['excellent'], values >= limits['good'], values >= limits['warning']],
+            ['excellent', 'good', 'warning'],
+            default='critical'
+        ).astype(object)
+        status[np.isnan(values)] = None
+        
+        return pd.DataFrame(status, index=ratios.index, columns=ratios.columns)
     
-    def _create_cash_flow_statement(self, aggregated: pd.DataFrame) -> pd.DataFrame:
-        """Create cash flow statement from aggregated ABCOTD data."""
-        cash_flow = {}
+    def stress_test(
+        self,
+        mapped_df: pd.DataFrame,
+        cube: Optional[LedgerCube] = None,
+        n_scenarios: int = 10000,
+        drivers: Optional[Dict[str, Dict]] = None,
+        seed: Optional[int] = None
+    ) -> StressTestResult:
+        """
+        Simulate stress scenarios and score the going-concern assessment in each.
         
-        # Operating Cash Flow (estimated from revenue and expenses)
-        revenue = aggregated[aggregated['ABCOTD'] == 'Revenue']['amount'].sum()
-        operating_expenses = aggregated[
-            aggregated['ABCOTD'].isin([
-                'Cost of sales',
-                'Operating expenses',
-                'Payroll',
-                'Other expenses'
-            ])
-        ]['amount'].sum()
+        Revenue decline, cost inflation and higher interest cut profit and
+        drain period-end cash; delayed collections turn cash into
+        receivables and cut operating cash flow. Drains beyond the cash
+        balance are funded by current liabilities, and lost profit reduces
+        equity. All scenarios go through the ratio formulas and scoring
+        thresholds as arrays.
         
-        # Rough estimate of operating cash flow
-        cash_flow['Operating Cash Flow'] = abs(revenue) - abs(operating_expenses)
+        Args:
+            mapped_df: Mapped financial data with ABCOTD classifications
+            cube: Shared ledger aggregate with the ABCOTD dimension
+                (built from mapped_df if not given)
+            n_scenarios: Number of scenarios to simulate
+            drivers: Overrides of STRESS_DRIVERS parameters by driver
+            seed: Random seed for reproducible scenarios
+        
+        Returns:
+            StressTestResult with score distributions and status probabilities
+        """
+        if n_scenarios < 1:
+            raise ValueError(f"n_scenarios must be positive, got {n_scenarios}")
+        
+        unknown = sorted(set(drivers or {}) - set(STRESS_DRIVERS))
+        if unknown:
+            raise ValueError(f"Unknown stress drivers: {unknown}. Available: {list(STRESS_DRIVERS)}")
+        
+        if cube is None or 'ABCOTD' not in cube.dimensions:
+            cube = LedgerCube(mapped_df, dimensions=['ABCOTD'])
+        self._prepare_financial_statements(cube)
+        
+        rng = np.random.default_rng(seed)
+        shocks = {}
+        for name, defaults in STRESS_DRIVERS.items():
+            params = {**defaults, **(drivers or {}).get(name, {})}
+            shocks[name] = np.clip(rng.normal(params['mean'], params['std'], n_scenarios), 0.0, params['max'])
+        
+        # Revenue per day over the posting period converts delay days to cash
+        days = 365.0
+        if 'posting_date' in mapped_df.columns and mapped_df['posting_date'].notna().any():
+            posted = pd.to_datetime(mapped_df['posting_date'])
+            days = float((posted.max() - posted.min()).days + 1)
+        
+        # Row 0 is the unstressed base, scored the same way
+        base = np.repeat(self.base_values[None, :], n_scenarios + 1, axis=0)
+        shocked = self._apply_shocks(base[1:], shocks, days)
+        scenarios = np.vstack([base[:1], shocked])
+        
+        values = self.engine.evaluate(self.engine.derive(scenarios))
+        scores, points = self._score_scenarios(values)
+        overall = scores['overall']
+        status = np.select(
+            [overall >= floor for floor in STATUS_BANDS.values()],
+            list(STATUS_BANDS),
+            default='critical'
+        )
         
-        # Capital Expenditures (estimated from depreciation)
-        depreciation = aggregated[
-            aggregated['ABCOTD'].isin([
-                'Depreciation of property, plant, and equipment',
-                'Depreciation/amortization of rights of use assets',
-                'Amortization of intangibles - other'
-            ])
-        ]['amount'].sum()
+        simulated = scores.iloc[1:].reset_index(drop=True)
+        simulated_status = status[1:]
+        
+        result = StressTestResult(
+            n_scenarios=n_scenarios,
+            base_scores={name: float(v) for name, v in scores.iloc[0].items()},
+            base_status=str(status[0]),
+            scores=simulated,
+            score_percentiles=simulated.quantile([0.05, 0.25, 0.5, 0.75, 0.95]).set_axis(
+                [5, 25, 50, 75, 95]
+            ),
+            status_probabilities={
+                band: float((simulated_status == band).mean()) for band in [*STATUS_BANDS, 'critical']
+            },
+            breach_probabilities={
+                f'below_{band}': float((simulated['overall'].to_numpy() < floor).mean())
+                for band, floor in STATUS_BANDS.items()
+            },
+            ratio_critical_probabilities={
+                name: float((points[1:, r] == STATUS_POINTS['critical']).mean())
+                for r, name in enumerate(self.engine.ratio_names)
+            }
+        )
         
-        # Estimate CapEx as 1.5x depreciation (rough approximation)
-        cash_flow['Capital Expenditures'] = abs(depreciation) * 1.5
+        logger.info("Going-concern stress test completed",
+                   scenarios=n_scenarios,
+                   base_status=result.base_status,
+                   median_score=round(float(simulated['overall'].median()), 1),
+                   below_adequate=result.breach_probabilities['below_adequate'])
         
-        # Free Cash Flow
-        cash_flow['Free Cash Flow'] = cash_flow['Operating Cash Flow'] - cash_flow['Capital Expenditures']
+        return result
+    
+    def _apply_shocks(self, base: np.ndarray, shocks: Dict[str, np.ndarray], days: float) -> np.ndarray:
+        """Stressed base lines (scenarios x base line) for the drawn shocks."""
+        line = {name: i for i, name in enumerate(self.engine.base_names)}
+        stressed = base.copy()
+        
+        revenue_loss = shocks['revenue_decline'] * base[:, line['Revenue']]
+        stressed[:, line['Revenue']] -= revenue_loss
+        
+        inflation = 1.0 + shocks['cost_inflation'][:, None]
+        costs = [line[name] for name in (
+            'Cost of Sales', 'Operating Expenses', 'Payroll', 'Other Expenses', 'Cash Operating Costs'
+        )]
+        stressed[:, costs] *= inflation
+        cost_increase = stressed[:, line['Cash Operating Costs']] - base[:, line['Cash Operating Costs']]
+        
+        interest_increase = shocks['rate_shock'] * base[:, line['Interest Expense']]
+        stressed[:, line['Interest Expense']] += interest_increase
+        
+        # Delayed collections tie up days of (stressed) revenue in receivables;
+        # operating cash flow is revenue less cash operating costs, so book it there
+        tied_up = stressed[:, line['Revenue']] / days * shocks['collection_delay_days']
+        stressed[:, line['Cash Operating Costs']] += tied_up
+        
+        # Cash absorbs the drains first, short-term funding covers the rest
+        lost_profit = revenue_loss + cost_increase + interest_increase
+        drain = lost_profit + tied_up
+        cash_used = np.minimum(drain, base[:, line['Cash and Cash Equivalents']])
+        stressed[:, line['Cash and Cash Equivalents']] -= cash_used
+        stressed[:, line['Current Assets']] += tied_up - cash_used
+        stressed[:, line['Current Liabilities']] += drain - cash_used
+        stressed[:, line['Total Equity']] -= lost_profit
+        
+        return stressed
+    
+    def _score_scenarios(self, values: np.ndarray):
+        """
+        Score ratio values as _assess_going_concern does, for many scenarios.
         
-        # Cash and Cash Equivalents
-        cash = aggregated[aggregated['ABCOTD'] == 'Cash and cash equivalents']['amount'].sum()
-        cash_flow['Cash and Cash Equivalents'] = abs(cash)
+        Args:
+            values: Ratio values (scenarios x ratio), NaN where not applicable
         
-        return pd.DataFrame([cash_flow])
+        Returns:
+            Tuple of (DataFrame of category and overall scores, points per
+            ratio with NaN where not applicable)
+        """
+        names = self.engine.ratio_names
+        limits = {
+            level: np.array([self.ratio_configs[name]['thresholds'][level] for name in names])
+            for level in ('excellent', 'good', 'warning')
+        }
+        points = np.select(
+            [values >= limits[level] for level in limits],
+            [STATUS_POINTS[level] for level in limits],
+            default=STATUS_POINTS['critical']
+        ).astype(float)
+        applicable = ~np.isnan(values)
+        points[~applicable] = np.nan
+        
+        scores = {}
+        for score, category in SCORED_CATEGORIES.items():
+            members = applicable & np.array([self.ratio_configs[n]['category'] == category for n in names])
+            count = members.sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores[score] = np.where(
+                    count > 0, np.where(members, points, 0.0).sum(axis=1) / count, NEUTRAL_SCORE
+                )
+        scores['overall'] = sum(scores[score] for score in SCORED_CATEGORIES) / len(SCORED_CATEGORIES)
+        
+        return pd.DataFrame(scores), points
     
     def _calculate_ratios(self):
         """Calculate all applicable financial ratios."""
@@ -432,7 +859,7 @@ class FinancialRatioAnalyzer:
                     )
                 
                 self.ratios.append(ratio_result)
-                
+            
             except Exception as e:
                 logger.warning(f"Could not calculate ratio {ratio_name}: {e}")
                 self.ratios.append(RatioResult(
@@ -447,108 +874,11 @@ class FinancialRatioAnalyzer:
                 ))
     
     def _calculate_single_ratio(self, ratio_name: str, config: Dict) -> Optional[float]:
-        """Calculate a single financial ratio."""
-        try:
-            if ratio_name == 'current_ratio':
-                current_assets = self.balance_sheet_data['Current Assets'].iloc[0]
-                current_liabilities = self.balance_sheet_data['Current Liabilities'].iloc[0]
-                return current_assets / current_liabilities if current_liabilities != 0 else None
-                
-            elif ratio_name == 'quick_ratio':
-                current_assets = self.balance_sheet_data['Current Assets'].iloc[0]
-                current_liabilities = self.balance_sheet_data['Current Liabilities'].iloc[0]
-                # Estimate inventory as 20% of current assets (rough approximation)
-                inventory = current_assets * 0.2
-                quick_assets = current_assets - inventory
-                return quick_assets / current_liabilities if current_liabilities != 0 else None
-                
-            elif ratio_name == 'cash_ratio':
-                cash = self.cash_flow_data['Cash and Cash Equivalents'].iloc[0]
-                current_liabilities = self.balance_sheet_data['Current Liabilities'].iloc[0]
-                return cash / current_liabilities if current_liabilities != 0 else None
-                
-            elif ratio_name == 'operating_cash_flow_ratio':
-                operating_cash_flow = self.cash_flow_data['Operating Cash Flow'].iloc[0]
-                current_liabilities = self.balance_sheet_data['Current Liabilities'].iloc[0]
-                return operating_cash_flow / current_liabilities if current_liabilities != 0 else None
-                
-            elif ratio_name == 'working_capital':
-                current_assets = self.balance_sheet_data['Current Assets'].iloc[0]
-                current_liabilities = self.balance_sheet_data['Current Liabilities'].iloc[0]
-                return current_assets - current_liabilities
-                
-            elif ratio_name == 'net_working_capital_ratio':
-                current_assets = self.balance_sheet_data['Current Assets'].iloc[0]
-                current_liabilities = self.balance_sheet_data['Current Liabilities'].iloc[0]
-                total_assets = self.balance_sheet_data['Total Assets'].iloc[0]
-                working_capital = current_assets - current_liabilities
-                return working_capital / total_assets if total_assets != 0 else None
-                
-            elif ratio_name == 'debt_to_equity_ratio':
-                total_debt = self.balance_sheet_data['Total Liabilities'].iloc[0]
-                total_equity = self.balance_sheet_data['Total Equity'].iloc[0]
-                return total_debt / total_equity if total_equity != 0 else None
-                
-            elif ratio_name == 'equity_ratio':
-                total_equity = self.balance_sheet_data['Total Equity'].iloc[0]
-                total_assets = self.balance_sheet_data['Total Assets'].iloc[0]
-                return total_equity / total_assets if total_assets != 0 else None
-                
-            elif ratio_name == 'debt_ratio':
-                total_debt = self.balance_sheet_data['Total Liabilities'].iloc[0]
-                total_assets = self.balance_sheet_data['Total Assets'].iloc[0]
-                return total_debt / total_assets if total_assets != 0 else None
-                
-            elif ratio_name == 'interest_coverage_ratio':
-                ebit = self.income_statement_data['EBIT'].iloc[0]
-                interest_expense = self.income_statement_data['Interest Expense'].iloc[0]
-                return ebit / interest_expense if interest_expense != 0 else None
-                
-            elif ratio_name == 'cash_flow_to_debt_ratio':
-                operating_cash_flow = self.cash_flow_data['Operating Cash Flow'].iloc[0]
-                total_debt = self.balance_sheet_data['Total Liabilities'].iloc[0]
-                return operating_cash_flow / total_debt if total_debt != 0 else None
-                
-            elif ratio_name == 'free_cash_flow':
-                return self.cash_flow_data['Free Cash Flow'].iloc[0]
-                
-            elif ratio_name == 'free_cash_flow_to_revenue':
-                free_cash_flow = self.cash_flow_data['Free Cash Flow'].iloc[0]
-                revenue = self.income_statement_data['Revenue'].iloc[0]
-                return free_cash_flow / revenue if revenue != 0 else None
-                
-            elif ratio_name == 'current_liability_coverage_ratio':
-                free_cash_flow = self.cash_flow_data['Free Cash Flow'].iloc[0]
-                current_liabilities = self.balance_sheet_data['Current Liabilities'].iloc[0]
-                return free_cash_flow / current_liabilities if current_liabilities != 0 else None
-                
-            elif ratio_name == 'net_profit_margin':
-                net_income = self.income_statement_data['Net Income'].iloc[0]
-                revenue = self.income_statement_data['Revenue'].iloc[0]
-                return net_income / revenue if revenue != 0 else None
-                
-            elif ratio_name == 'return_on_assets':
-                net_income = self.income_statement_data['Net Income'].iloc[0]
-                total_assets = self.balance_sheet_data['Total Assets'].iloc[0]
-                return net_income / total_assets if total_assets != 0 else None
-                
-            elif ratio_name == 'return_on_equity':
-                net_income = self.income_statement_data['Net Income'].iloc[0]
-                total_equity = self.balance_sheet_data['Total Equity'].iloc[0]
-                return net_income / total_equity if total_equity != 0 else None
-                
-            elif ratio_name == 'asset_turnover':
-                revenue = self.income_statement_data['Revenue'].iloc[0]
-                total_assets = self.balance_sheet_data['Total Assets'].iloc[0]
-                return revenue / total_assets if total_assets != 0 else None
-                
-            # Add more ratios as needed
-            else:
-                return None
-                
-        except Exception as e:
-            logger.warning(f"Error calculating {ratio_name}: {e}")
+        """Look up a ratio evaluated by the ratio engine (None if not applicable)."""
+        value = self.ratio_values.get(ratio_name)
+        if value is None or np.isnan(value):
             return None
+        return float(value)
     
     def _determine_status(self, value: float, thresholds: Dict[str, float]) -> str:
         """Determine status based on ratio value and thresholds."""
@@ -635,76 +965,34 @@ class FinancialRatioAnalyzer:
     
     def _calculate_liquidity_score(self) -> float:
         """Calculate liquidity score (0-100)."""
-        liquidity_ratios = [r for r in self.ratios if r.category == 'Liquidity' and r.applicable]
-        
-        if not liquidity_ratios:
-            return 50.0  # Neutral if no data
-        
-        scores = []
-        for ratio in liquidity_ratios:
-            if ratio.status == 'excellent':
-                scores.append(90)
-            elif ratio.status == 'good':
-                scores.append(75)
-            elif ratio.status == 'warning':
-                scores.append(50)
-            else:  # critical
-                scores.append(25)
-        
-        return np.mean(scores)
+        return self._category_score(SCORED_CATEGORIES['liquidity'])
     
     def _calculate_solvency_score(self) -> float:
         """Calculate solvency score (0-100)."""
-        solvency_ratios = [r for r in self.ratios if r.category == 'Solvency' and r.applicable]
-        
-        if not solvency_ratios:
-            return 50.0  # Neutral if no data
-        
-        scores = []
-        for ratio in solvency_ratios:
-            if ratio.status == 'excellent':
-                scores.append(90)
-            elif ratio.status == 'good':
-                scores.append(75)
-            elif ratio.status == 'warning':
-                scores.append(50)
-            else:  # critical
-                scores.append(25)
-        
-        return np.mean(scores)
+        return self._category_score(SCORED_CATEGORIES['solvency'])
     
     def _calculate_cash_flow_score(self) -> float:
         """Calculate cash flow score (0-100)."""
-        cash_flow_ratios = [r for r in self.ratios if r.category == 'Cash Flow' and r.applicable]
-        
-        if not cash_flow_ratios:
-            return 50.0  # Neutral if no data
+        return self._category_score(SCORED_CATEGORIES['cash_flow'])
+    
+    def _category_score(self, category: str) -> float:
+        """Mean STATUS_POINTS of a category's applicable ratios (neutral if none)."""
+        ratios = [r for r in self.ratios if r.category == category and r.applicable]
         
-        scores = []
-        for ratio in cash_flow_ratios:
-            if ratio.status == 'excellent':
-                scores.append(90)
-            elif ratio.status == 'good':
-                scores.append(75)
-            elif ratio.status == 'warning':
-                scores.append(50)
-            else:  # critical
-                scores.append(25)
+        if not ratios:
+            return NEUTRAL_SCORE
         
-        return np.mean(scores)
+        # Any status other than the scored ones counts as critical
+        return np.mean([STATUS_POINTS.get(r.status, STATUS_POINTS['critical']) for r in ratios])
     
     def _determine_overall_status(self, liquidity_score: float, solvency_score: float, cash_flow_score: float) -> str:
         """Determine overall going concern status."""
         overall_score = (liquidity_score + solvency_score + cash_flow_score) / 3
         
-        if overall_score >= 80:
-            return 'strong'
-        elif overall_score >= 60:
-            return 'adequate'
-        elif overall_score >= 40:
-            return 'concerning'
-        else:
-            return 'critical'
+        for status, floor in STATUS_BANDS.items():
+            if overall_score >= floor:
+                return status
+        return 'critical'
     
     def _identify_key_risks(self) -> List[str]:
         """Identify key going concern risks."""
@@ -795,20 +1083,73 @@ Based on the comprehensive analysis, the entity {'demonstrates strong financial
 
 This assessment should be reviewed regularly and updated as new financial information becomes available.
 """
-        
+
         return analysis.strip()
 
 
-def analyze_financial_ratios(mapped_df: pd.DataFrame, config=None) -> Tuple[List[RatioResult], GoingConcernAssessment]:
+def analyze_financial_ratios(
+    mapped_df: pd.DataFrame,
+    config=None,
+    cube: Optional[LedgerCube] = None
+) -> Tuple[List[RatioResult], GoingConcernAssessment]:
     """
     Convenience function to perform financial ratio analysis.
     
     Args:
         mapped_df: Mapped financial data with ABCOTD classifications
         config: Configuration object (optional)
-        
+        cube: Shared ledger aggregate with ABCOTD and bucket dimensions
+    
     Returns:
         Tuple of (ratios, going_concern_assessment)
     """
     analyzer = FinancialRatioAnalyzer(config)
-    return analyzer.analyze(mapped_df)
+    return analyzer.analyze(mapped_df, cube)
+
+
+def calculate_ratio_trends(
+    mapped_df: pd.DataFrame,
+    config=None,
+    cube: Optional[LedgerCube] = None,
+    entity_dimension: str = 'company_code'
+) -> RatioTrendResult:
+    """
+    Convenience function to evaluate ratio trends by month and entity.
+    
+    Args:
+        mapped_df: Mapped financial data with ABCOTD classifications
+        config: Configuration object (optional)
+        cube: Shared ledger aggregate with year_month, entity and ABCOTD dimensions
+        entity_dimension: Column identifying the entity
+    
+    Returns:
+        RatioTrendResult object
+    """
+    analyzer = FinancialRatioAnalyzer(config)
+    return analyzer.ratio_trends(mapped_df, cube, entity_dimension)
+
+
+def stress_test_going_concern(
+    mapped_df: pd.DataFrame,
+    config=None,
+    cube: Optional[LedgerCube] = None,
+    n_scenarios: int = 10000,
+    drivers: Optional[Dict[str, Dict]] = None,
+    seed: Optional[int] = None
+) -> StressTestResult:
+    """
+    Convenience function to stress test the going-concern assessment.
+    
+    Args:
+        mapped_df: Mapped financial data with ABCOTD classifications
+        config: Configuration object (optional)
+        cube: Shared ledger aggregate with the ABCOTD dimension
+        n_scenarios: Number of scenarios to simulate
+        drivers: Overrides of STRESS_DRIVERS parameters by driver
+        seed: Random seed for reproducible scenarios
+    
+    Returns:
+        StressTestResult object
+    """
+    analyzer = FinancialRatioAnalyzer(config)
+    return analyzer.stress_test(mapped_df, cube, n_scenarios, drivers, seed)
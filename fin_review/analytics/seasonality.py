@@ -0,0 +1,239 @@
+"""Batch seasonality detection for monthly ledger series."""
+
+import pandas as pd
+import numpy as np
+import structlog
+from typing import Dict, Optional
+from scipy import stats
+
+from .cube import LedgerCube
+
+logger = structlog.get_logger()
+
+
+def seasonal_spectrum(Y: np.ndarray, period: int = 12) -> Dict[str, np.ndarray]:
+    """
+    Measure yearly seasonality of many series with one FFT.
+    
+    Each series is cut to whole seasons and linearly detrended. On whole
+    seasons the seasonal harmonics fall exactly on periodogram bins, so the
+    power share at those bins equals the variance explained by
+    month-of-season means.
+    
+    Args:
+        Y: Value matrix (months x series), at least two seasons long
+        period: Season length in months
+    
+    Returns:
+        Dict with 'strength', 'acf' (autocorrelation at lag period),
+        'p_value' (F-test of the seasonal means) and 'profile'
+        (period x series seasonal component, from the window start)
+    """
+    n_seasons = Y.shape[0] // period
+    m = n_seasons * period
+    X = Y[-m:]
+    
+    # Remove level and linear trend from every series
+    t = np.arange(m) - (m - 1) / 2
+    X = X - X.mean(axis=0)
+    X = X - np.outer(t, (t @ X) / (t @ t))
+    
+    spectrum = np.fft.rfft(X, axis=0)
+    power = np.abs(spectrum) ** 2
+    
+    # One-sided spectrum: interior bins count twice (Parseval)
+    weights = np.full(len(power), 2.0)
+    weights[0] = 1.0
+    weights[-1] = 1.0
+    
+    harmonics = n_seasons * np.arange(1, period // 2 + 1)
+    total = weights @ power
+    seasonal = weights[harmonics] @ power[harmonics]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength = np.where(total > 0, seasonal / total, 0.0)
+        
+        # Month-of-season means use period - 1 df, the trend one more
+        df_model, df_resid = period - 1, m - period - 1
+        f_stat = (strength / df_model) / ((1 - strength) / df_resid)
+    p_value = np.where(
+        total > 0,
+        stats.f.sf(np.nan_to_num(f_stat, nan=0.0, posinf=np.inf), df_model, df_resid),
+        1.0
+    )
+    
+    # Autocorrelation at the seasonal lag (Wiener-Khinchin, zero-padded)
+    acov = np.fft.irfft(np.abs(np.fft.rfft(X, n=2 * m, axis=0)) ** 2, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acf = np.where(acov[0] > 0, acov[period] / acov[0], 0.0)
+    
+    # Seasonal component: inverse transform of the harmonic bins only
+    masked = np.zeros_like(spectrum)
+    masked[harmonics] = spectrum[harmonics]
+    profile = np.fft.irfft(masked, n=m, axis=0)[:period]
+    
+    return {'strength': strength, 'acf': acf, 'p_value': p_value, 'profile': profile}
+
+
+def seasonal_autocorrelation(Y: np.ndarray, period: int = 12) -> Dict[str, np.ndarray]:
+    """
+    Measure the seasonal-lag autocorrelation of series shorter than two seasons.
+    
+    Each series is linearly detrended over all its months. The lagged
+    products are averaged over the n - period overlapping pairs rather than
+    all n months, so a repeating pattern scores near one however short the
+    overlap is.
+    
+    Args:
+        Y: Value matrix (months x series), at least period + 1 months long
+        period: Season length in months
+    
+    Returns:
+        Dict with 'acf' (autocorrelation at lag period, clipped to [-1, 1])
+        and 'profile' (period x series detrended values of the last season)
+    """
+    n = Y.shape[0]
+    
+    # Remove level and linear trend from every series
+    t = np.arange(n) - (n - 1) / 2
+    X = Y - Y.mean(axis=0)
+    X = X - np.outer(t, (t @ X) / (t @ t))
+    
+    lagged = (X[period:] * X[:-period]).mean(axis=0)
+    variance = (X ** 2).mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acf = np.where(variance > 0, np.clip(lagged / variance, -1.0, 1.0), 0.0)
+    
+    return {'acf': acf, 'profile': X[-period:]}
+
+
+class SeasonalityDetector:
+    """Screens every series of a cube dimension for yearly seasonality."""
+    
+    PERIOD = 12
+    MIN_MONTHS = 24  # Two full years for the periodogram
+    MIN_ACF_MONTHS = 13  # One seasonal lag for the autocorrelation alone
+    MIN_STRENGTH = 0.1  # Share of detrended variance
+    MIN_ACF = 0.5  # Lag-12 autocorrelation for short histories
+    SIGNIFICANCE = 0.05
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        cube: Optional[LedgerCube] = None
+    ):
+        """
+        Initialize seasonality detector.
+        
+        Args:
+            df: Normalized FAGL DataFrame
+            config: Configuration dictionary
+            cube: Shared ledger aggregate (built from df if not given)
+        """
+        self.df = df
+        self.config = config or {}
+        self.cube = cube if cube is not None else LedgerCube(df)
+    
+    def detect(self, dimension: str = 'type') -> pd.DataFrame:
+        """
+        Measure seasonal strength and peak months for every dimension member.
+        
+        Months without postings count as zero activity. A series is seasonal
+        when its month-of-year pattern is significant and explains at least
+        MIN_STRENGTH of the detrended variance. Histories of MIN_ACF_MONTHS
+        up to MIN_MONTHS months are too short for the periodogram; for those
+        only acf_12 is reported and a series is seasonal when it exceeds
+        MIN_ACF (strength and p_value are NaN, confidence is at most medium).
+        
+        Args:
+            dimension: Cube dimension to screen
+        
+        Returns:
+            DataFrame indexed by member with n_months, strength, acf_12,
+            p_value, detected, confidence, peak_months and trough_months
+            (empty if there are fewer than MIN_ACF_MONTHS months)
+        """
+        matrix = self.cube.rollup(['year_month', dimension]).unstack(dimension)
+        if matrix.empty:
+            return pd.DataFrame()
+        
+        months = pd.period_range(matrix.index.min(), matrix.index.max(), freq='M')
+        if len(months) < self.MIN_ACF_MONTHS:
+            logger.warning(
+                f"Insufficient data for seasonality detection (need >= {self.MIN_ACF_MONTHS} months)",
+                dimension=dimension
+            )
+            return pd.DataFrame()
+        
+        matrix = matrix.reindex(months).fillna(0.0)
+        Y = matrix.to_numpy(dtype=float)
+        
+        if len(months) >= self.MIN_MONTHS:
+            result = seasonal_spectrum(Y, self.PERIOD)
+            n_used = len(months) // self.PERIOD * self.PERIOD
+            strength = result['strength']
+            p_value = result['p_value']
+            detected = (p_value < self.SIGNIFICANCE) & (strength > self.MIN_STRENGTH)
+        else:
+            logger.info(
+                f"Short history, screening lag-{self.PERIOD} autocorrelation only",
+                dimension=dimension,
+                months=len(months)
+            )
+            result = seasonal_autocorrelation(Y, self.PERIOD)
+            n_used = len(months)
+            strength = np.full(Y.shape[1], np.nan)
+            p_value = np.full(Y.shape[1], np.nan)
+            detected = result['acf'] > self.MIN_ACF
+        
+        # Calendar month of each profile position
+        first_month = months[-self.PERIOD].month
+        calendar = (first_month - 1 + np.arange(self.PERIOD)) % self.PERIOD + 1
+        ranked = calendar[np.argsort(-result['profile'], axis=0, kind='stable')]
+        
+        seasonality = pd.DataFrame({
+            'n_months': n_used,
+            'strength': strength,
+            'acf_12': result['acf'],
+            'p_value': p_value,
+            'detected': detected,
+            'confidence': np.select(
+                [~detected, strength > 0.2],
+                ['low', 'high'],
+                default='medium'
+            ),
+            'peak_months': ranked[:3].T.tolist(),
+            'trough_months': ranked[::-1][:3].T.tolist(),
+        }, index=matrix.columns)
+        
+        logger.info(
+            "Seasonality screening complete",
+            dimension=dimension,
+            series=len(seasonality),
+            seasonal=int(detected.sum())
+        )
+        
+        return seasonality
+
+
+def detect_seasonality(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None,
+    dimension: str = 'type'
+) -> pd.DataFrame:
+    """
+    Convenience function to screen series for yearly seasonality.
+    
+    Args:
+        df: Normalized FAGL DataFrame
+        config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
+        dimension: Cube dimension to screen
+    
+    Returns:
+        DataFrame with seasonality statistics per member
+    """
+    detector = SeasonalityDetector(df, config, cube)
+    return detector.detect(dimension)
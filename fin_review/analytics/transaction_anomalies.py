@@ -0,0 +1,314 @@
+"""Line-item anomaly scoring over the full ledger."""
+
+import pandas as pd
+import numpy as np
+import structlog
+from typing import Dict, Optional, List, Tuple, Union
+
+from .anomalies import Anomaly, AnomalyResult, summarize_anomalies
+
+logger = structlog.get_logger()
+
+
+class TransactionAnomalyScorer:
+    """
+    Scores every posting for anomalies.
+    
+    Monthly bucket detectors only see postings that move a whole bucket
+    total. This scorer rates each line on vectorized features with
+    histogram-based outlier scoring: per-feature histograms are fitted on a
+    random sample and a line's score is the sum of its features'
+    log-rarities.
+    
+    The ledger-wide inputs (GL and party median amounts, GL/party pair and
+    document line counts) are small tables indexed by key code, computed
+    once. Feature rows are then built and scored one chunk at a time while
+    only a running top-N is kept, so beyond the per-line key codes, memory
+    grows with the chunk size rather than the ledger.
+    """
+    
+    FEATURES = {
+        'amount_vs_gl': "amount vs GL median",
+        'amount_vs_party': "amount vs party median",
+        'weekday': "posting weekday",
+        'doc_lines': "document line count",
+        'pair_rarity': "rare GL/party pair",
+    }
+    
+    SAMPLE_SIZE = 200_000  # Lines used to fit the histograms
+    SCORE_CHUNK_ROWS = 1_000_000  # Lines scored per batch
+    HISTOGRAM_BINS = 50
+    FIT_QUANTILES = (0.001, 0.999)
+    
+    # Score quantiles (over the fitted sample) for high and medium severity
+    SEVERITY_QUANTILES = (0.999, 0.995)
+    
+    def __init__(self, df: pd.DataFrame, config: Optional[Dict] = None):
+        """
+        Initialize transaction anomaly scorer.
+        
+        Args:
+            df: Normalized FAGL DataFrame
+            config: Configuration dictionary
+        """
+        self.df = df
+        self.config = config or {}
+        self.top_n = self.config.get('transaction_anomaly_top_n', 100)
+        self.contamination = self.config.get('transaction_anomaly_contamination', 0.01)
+        self.histograms: List[Tuple[np.ndarray, np.ndarray, float]] = []
+        self._keys: Optional[Dict[str, np.ndarray]] = None
+    
+    def score(self) -> AnomalyResult:
+        """
+        Score all postings and report the most anomalous lines.
+        
+        Returns:
+            AnomalyResult with up to top_n line-level anomalies
+        """
+        logger.info("Starting transaction-level anomaly scoring", lines=len(self.df))
+        
+        n = len(self.df)
+        if n == 0:
+            return AnomalyResult(anomalies=[], summary=self._summary([], 0, 0))
+        
+        self.prepare()
+        
+        rng = np.random.default_rng(42)
+        if n > self.SAMPLE_SIZE:
+            sample = self.build_features(rng.choice(n, size=self.SAMPLE_SIZE, replace=False))
+        else:
+            sample = self.build_features(slice(None))
+        
+        self.fit(sample)
+        sample_scores = self.score_lines(sample).sum(axis=1)
+        cutoff, high, medium = np.quantile(
+            sample_scores, [1 - self.contamination, *self.SEVERITY_QUANTILES]
+        )
+        
+        # Running top-N of the outliers across chunks
+        flagged = np.empty(0, dtype=np.int64)
+        flagged_scores = np.empty(0, dtype=np.float32)
+        outliers = 0
+        for start in range(0, n, self.SCORE_CHUNK_ROWS):
+            scores = self.score_lines(self.build_features(slice(start, start + self.SCORE_CHUNK_ROWS))).sum(axis=1)
+            hits = np.flatnonzero(scores > cutoff)
+            outliers += len(hits)
+            
+            flagged = np.concatenate([flagged, hits + start])
+            flagged_scores = np.concatenate([flagged_scores, scores[hits]])
+            if len(flagged) > self.top_n:
+                keep = np.argpartition(-flagged_scores, self.top_n - 1)[:self.top_n]
+                flagged, flagged_scores = flagged[keep], flagged_scores[keep]
+        
+        # Most anomalous first, ties in ledger order
+        order = np.lexsort((flagged, -flagged_scores))
+        flagged, flagged_scores = flagged[order], flagged_scores[order]
+        
+        severity = np.select(
+            [flagged_scores > high, flagged_scores > medium],
+            ['high', 'medium'],
+            default='low'
+        )
+        contributions = self.score_lines(self.build_features(flagged))
+        anomalies = self._build_anomalies(flagged, contributions, severity)
+        
+        logger.info(
+            "Transaction-level anomaly scoring complete",
+            outliers=outliers,
+            reported=len(anomalies)
+        )
+        
+        return AnomalyResult(
+            anomalies=anomalies,
+            summary=self._summary(anomalies, n, outliers)
+        )
+    
+    def prepare(self):
+        """
+        Compute the key codes and the code-level tables the features need.
+        
+        Medians and counts are stored once per GL account, party, GL/party
+        pair and document; build_features() looks them up by code.
+        """
+        df = self.df
+        abs_amount = pd.Series(np.abs(df['amount'].to_numpy(dtype=float)))
+        
+        gl_codes = self._codes(df, 'gl_account')
+        party_codes = self._codes(df, 'customer_vendor')
+        pair_codes = pd.factorize(gl_codes * (party_codes.max(initial=0) + 1) + party_codes)[0]
+        doc_codes = self._codes(df, 'doc_id')
+        
+        self._keys = {
+            'gl': gl_codes,
+            'party': party_codes,
+            'pair': pair_codes,
+            'doc': doc_codes,
+            'gl_median': abs_amount.groupby(gl_codes).median().to_numpy(),
+            'party_median': abs_amount.groupby(party_codes).median().to_numpy(),
+            'pair_count': np.bincount(pair_codes, minlength=1),
+            'doc_lines': np.bincount(doc_codes, minlength=1),
+        }
+    
+    def build_features(self, rows: Union[slice, np.ndarray]) -> np.ndarray:
+        """
+        Build feature rows for a slice or array of ledger positions.
+        
+        Args:
+            rows: Ledger positions to build
+        
+        Returns:
+            float32 array (rows x features, columns in FEATURES order)
+        """
+        if self._keys is None:
+            self.prepare()
+        keys = self._keys
+        df = self.df
+        
+        # Slice the columns before converting so only the requested rows are copied
+        gl = keys['gl'][rows]
+        log_amount = np.log1p(np.abs(df['amount'].to_numpy()[rows].astype(float)))
+        
+        if 'day_of_week' in df.columns:
+            weekday = df['day_of_week'].to_numpy()[rows].astype(float)
+        else:
+            days = df['posting_date'].to_numpy()[rows].astype('datetime64[D]')
+            # 1970-01-01 was a Thursday (Monday = 0)
+            weekday = np.where(np.isnat(days), np.nan, (days.astype(np.int64) + 3) % 7)
+        
+        X = np.empty((len(gl), len(self.FEATURES)), dtype=np.float32)
+        X[:, 0] = log_amount - np.log1p(keys['gl_median'][gl])
+        X[:, 1] = log_amount - np.log1p(keys['party_median'][keys['party'][rows]])
+        X[:, 2] = np.nan_to_num(weekday, nan=0.0)
+        X[:, 3] = np.log1p(keys['doc_lines'][keys['doc'][rows]])
+        X[:, 4] = -np.log(keys['pair_count'][keys['pair'][rows]] / max(len(df), 1))
+        return X
+    
+    def fit(self, sample: np.ndarray):
+        """
+        Fit one equal-width histogram per feature.
+        
+        Bins span the sample's central FIT_QUANTILES range so a few extreme
+        lines cannot stretch them; values beyond it score as unseen plus
+        their distance out in bin widths.
+        
+        Args:
+            sample: Feature rows (columns in FEATURES order)
+        """
+        self.histograms = []
+        for column in sample.T:
+            low, high = (float(q) for q in np.quantile(column, self.FIT_QUANTILES))
+            if high <= low:
+                high = low + 1.0
+            counts, edges = np.histogram(column, bins=self.HISTOGRAM_BINS, range=(low, high))
+            
+            # Add-one smoothing; the most common bin scores 0
+            rarity = -np.log((counts + 1) / (counts.max() + 1))
+            unseen = float(-np.log(1 / (counts.max() + 1)))
+            self.histograms.append((edges, rarity, unseen))
+    
+    def score_lines(self, X: np.ndarray) -> np.ndarray:
+        """
+        Score feature rows against the fitted histograms.
+        
+        Args:
+            X: Feature rows (columns in FEATURES order)
+        
+        Returns:
+            Array of per-feature rarity scores (rows x features)
+        """
+        scores = np.empty(X.shape, dtype=np.float32)
+        for j, (edges, rarity, unseen) in enumerate(self.histograms):
+            values = X[:, j]
+            bins = np.searchsorted(edges, values, side='right') - 1
+            # The top edge closes the last bin
+            bins[values == edges[-1]] = len(rarity) - 1
+            inside = (bins >= 0) & (bins < len(rarity))
+            
+            width = edges[1] - edges[0]
+            beyond = np.maximum(edges[0] - values, values - edges[-1]) / width
+            scores[:, j] = np.where(
+                inside,
+                rarity[np.clip(bins, 0, len(rarity) - 1)],
+                unseen + np.log1p(np.maximum(beyond, 0))
+            )
+        return scores
+    
+    @staticmethod
+    def _codes(df: pd.DataFrame, column: str) -> np.ndarray:
+        """Integer codes for a key column, with missing values as their own code."""
+        if column not in df.columns:
+            return np.zeros(len(df), dtype=np.int64)
+        return pd.factorize(df[column], use_na_sentinel=False)[0].astype(np.int64)
+    
+    def _build_anomalies(
+        self,
+        positions: np.ndarray,
+        contributions: np.ndarray,
+        severity: np.ndarray
+    ) -> List[Anomaly]:
+        """Create Anomaly records for the reported lines."""
+        if len(positions) == 0:
+            return []
+        
+        rows = self.df.take(positions)
+        
+        amounts = rows['amount'].to_numpy(dtype=float)
+        expected = np.sign(amounts) * self._keys['gl_median'][self._keys['gl'][positions]]
+        deviation = amounts - expected
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation_pct = np.where(expected != 0, (deviation / np.abs(expected)) * 100, 0.0)
+        
+        drivers = np.array(list(self.FEATURES.values()))[np.argmax(contributions, axis=1)]
+        
+        def column(name: str, default: str = '') -> List:
+            return rows[name].tolist() if name in rows.columns else [default] * len(rows)
+        
+        anomalies = []
+        for i, (date, bucket, type_, gl, party, doc) in enumerate(zip(
+            rows['posting_date'].dt.strftime('%Y-%m-%d'),
+            column('bucket', 'Unmapped'),
+            column('type', 'Other'),
+            column('gl_account'),
+            column('customer_vendor'),
+            column('doc_id')
+        )):
+            party_str = party if isinstance(party, str) and party else "no party"
+            anomalies.append(Anomaly(
+                date=date,
+                bucket=bucket,
+                type=type_,
+                amount=float(amounts[i]),
+                expected_amount=float(expected[i]),
+                deviation=float(deviation[i]),
+                deviation_pct=float(deviation_pct[i]),
+                severity=str(severity[i]),
+                method='transaction',
+                explanation=(
+                    f"Document {doc} on GL {gl} / {party_str}. "
+                    f"{abs(deviation_pct[i]):.1f}% vs GL median. Main driver: {drivers[i]}"
+                )
+            ))
+        
+        return anomalies
+    
+    def _summary(self, anomalies: List[Anomaly], lines_scored: int, outliers: int) -> Dict:
+        """Create summary statistics including scoring coverage."""
+        summary = summarize_anomalies(anomalies)
+        summary['lines_scored'] = lines_scored
+        summary['outlier_count'] = outliers
+        return summary
+
+
+def score_transactions(df: pd.DataFrame, config: Optional[Dict] = None) -> AnomalyResult:
+    """
+    Convenience function to score every posting for anomalies.
+    
+    Args:
+        df: Normalized FAGL DataFrame
+        config: Configuration dictionary
+    
+    Returns:
+        AnomalyResult object
+    """
+    scorer = TransactionAnomalyScorer(df, config)
+    return scorer.score()
@@ -6,7 +6,10 @@ import structlog
 from typing import Dict, Optional, List
 from dataclasses import dataclass
 from scipy import stats
-from statsmodels.tsa.seasonal import seasonal_decompose
+
+from .cube import LedgerCube
+from .change_points import ChangePointDetector
+from .seasonality import SeasonalityDetector
 
 logger = structlog.get_logger()
 
@@ -18,6 +21,7 @@ class TrendResult:
     seasonality: Optional[Dict]
     trend_direction: Dict
     correlation_matrix: Optional[pd.DataFrame]
+    change_points: Optional[Dict] = None
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
@@ -29,22 +33,31 @@ class TrendResult:
             result['seasonality'] = self.seasonality
         if self.correlation_matrix is not None:
             result['correlation_matrix'] = self.correlation_matrix.to_dict()
+        if self.change_points:
+            result['change_points'] = self.change_points
         return result
 
 
 class TrendAnalyzer:
     """Analyzes time series trends and patterns."""
     
-    def __init__(self, df: pd.DataFrame, config: Optional[Dict] = None):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        cube: Optional[LedgerCube] = None
+    ):
         """
         Initialize trend analyzer.
         
         Args:
             df: Normalized FAGL DataFrame
             config: Configuration dictionary
+            cube: Shared ledger aggregate (built from df if not given)
         """
         self.df = df
         self.config = config or {}
+        self.cube = cube if cube is not None else LedgerCube(df)
     
     def analyze_all(self) -> TrendResult:
         """
@@ -64,21 +77,24 @@ class TrendAnalyzer:
         
         correlation_matrix = self._calculate_correlations()
         
+        change_points = None
+        if self.config.get('enable_change_points', True):
+            change_points = ChangePointDetector(self.df, self.config, self.cube).detect().to_dict()
+        
         logger.info("Trend analysis complete")
         
         return TrendResult(
             rolling_averages=rolling_avgs,
             seasonality=seasonality,
             trend_direction=trend_direction,
-            correlation_matrix=correlation_matrix
+            correlation_matrix=correlation_matrix,
+            change_points=change_points
         )
     
     def _calculate_rolling_averages(self) -> pd.DataFrame:
         """Calculate rolling averages for key metrics."""
-        # Group by month and type
-        monthly = self.df.groupby(['year_month', 'type']).agg({
-            'amount': 'sum'
-        }).reset_index()
+        # Monthly totals by type from the shared cube
+        monthly = self.cube.rollup(['year_month', 'type']).reset_index()
         
         monthly['year_month'] = monthly['year_month'].dt.to_timestamp()
         
@@ -112,104 +128,144 @@ class TrendAnalyzer:
         """Determine trend direction (up/down/flat) for key metrics."""
         directions = {}
         
-        # Group by month
-        monthly = self.df.groupby(['year_month', 'type'])['amount'].sum().reset_index()
+        trend_stats = self.trend_statistics('type')
         
-        for metric_type in monthly['type'].unique():
-            type_data = monthly[monthly['type'] == metric_type].copy()
-            type_data = type_data.sort_values('year_month')
-            
-            if len(type_data) < 3:
-                directions[metric_type] = 'insufficient_data'
+        for metric_type, row in trend_stats.iterrows():
+            if row['direction'] in ('insufficient_data', 'no_variation'):
+                directions[metric_type] = row['direction']
                 continue
             
-            # Use linear regression to determine trend
-            x = np.arange(len(type_data))
-            y = type_data['amount'].values
-            
-            if len(x) > 0 and not np.all(y == 0):
-                slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-                
-                # Determine direction based on slope and significance
-                if p_value < 0.05:  # Significant trend
-                    if slope > 0:
-                        direction = 'increasing'
-                    else:
-                        direction = 'decreasing'
-                else:
-                    direction = 'flat'
-                
-                directions[metric_type] = {
-                    'direction': direction,
-                    'slope': float(slope),
-                    'r_squared': float(r_value ** 2),
-                    'p_value': float(p_value),
-                    'confidence': 'high' if p_value < 0.01 else 'medium'
-                }
-            else:
-                directions[metric_type] = 'no_variation'
+            directions[metric_type] = {
+                'direction': row['direction'],
+                'slope': float(row['slope']),
+                'r_squared': float(row['r_squared']),
+                'p_value': float(row['p_value']),
+                'confidence': row['confidence']
+            }
         
         return directions
     
-    def _detect_seasonality(self) -> Optional[Dict]:
-        """Detect seasonality patterns."""
-        # Group by month for revenue
-        revenue_data = self.df[self.df['type'] == 'Revenue'].copy()
-        
-        if len(revenue_data) == 0:
-            logger.warning("No revenue data for seasonality analysis")
-            return None
+    def trend_statistics(self, dimension: str = 'type') -> pd.DataFrame:
+        """
+        Calculate trend statistics for every member of a dimension at once.
         
-        monthly = revenue_data.groupby('year_month')['amount'].sum()
+        Monthly totals are laid out as a months x series matrix and the
+        least-squares slope, R², p-value and coefficient of variation are
+        computed in closed form for all columns together. Each series is
+        regressed on its own observed months (0, 1, 2, ...), matching a
+        per-series linregress.
         
-        if len(monthly) < 24:  # Need at least 2 years for good seasonality detection
-            logger.warning("Insufficient data for seasonality detection (need >= 24 months)")
-            return {'detected': False, 'reason': 'insufficient_data'}
+        Args:
+            dimension: Cube dimension to screen (e.g. 'type', 'bucket', 'gl_account')
         
-        try:
-            # Perform seasonal decomposition
-            decomposition = seasonal_decompose(
-                monthly.values,
-                model='additive',
-                period=12,
-                extrapolate_trend='freq'
-            )
-            
-            # Calculate strength of seasonality
-            seasonal_strength = np.var(decomposition.seasonal) / np.var(monthly.values)
-            
-            # Detect if seasonality is significant
-            is_seasonal = seasonal_strength > 0.1  # More than 10% of variance
+        Returns:
+            DataFrame indexed by dimension member with n_months, slope,
+            intercept, r_squared, p_value, mean, std, cv, direction and confidence
+        """
+        matrix = self.cube.rollup(['year_month', dimension]).unstack(dimension)
+        Y = matrix.to_numpy(dtype=float)
+        
+        present = ~np.isnan(Y)
+        n = present.sum(axis=0)
+        x = np.where(present, np.cumsum(present, axis=0) - 1, 0.0)
+        y = np.where(present, Y, 0.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_mean = x.sum(axis=0) / n
+            y_mean = y.sum(axis=0) / n
+            dx = np.where(present, x - x_mean, 0.0)
+            dy = np.where(present, y - y_mean, 0.0)
             
-            # Find peak months
-            seasonal_pattern = pd.Series(decomposition.seasonal[:12])
-            peak_months = seasonal_pattern.nlargest(3).index.tolist()
-            trough_months = seasonal_pattern.nsmallest(3).index.tolist()
+            sxx = (dx * dx).sum(axis=0)
+            sxy = (dx * dy).sum(axis=0)
+            syy = (dy * dy).sum(axis=0)
             
-            result = {
-                'detected': bool(is_seasonal),
-                'strength': float(seasonal_strength),
-                'peak_months': [int(m + 1) for m in peak_months],  # 1-indexed
-                'trough_months': [int(m + 1) for m in trough_months],
-                'confidence': 'high' if seasonal_strength > 0.2 else 'medium'
-            }
+            slope = sxy / sxx
+            intercept = y_mean - slope * x_mean
             
-            logger.info(
-                "Seasonality analysis complete",
-                detected=is_seasonal,
-                strength=seasonal_strength
+            # Same conventions as scipy.stats.linregress
+            r = np.where(
+                (sxx > 0) & (syy > 0),
+                sxy / np.sqrt(sxx * syy),
+                np.where(sxy == 0, np.nan, 0.0)
             )
+            r = np.clip(r, -1.0, 1.0)
+            dof = n - 2
+            t = r * np.sqrt(dof / ((1.0 - r + 1e-20) * (1.0 + r + 1e-20)))
+            p_value = np.where(dof > 0, 2 * stats.t.sf(np.abs(t), np.maximum(dof, 1)), np.nan)
             
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error in seasonality detection: {e}")
-            return {'detected': False, 'reason': 'error', 'error': str(e)}
+            std = np.sqrt(syy / (n - 1))
+            cv = np.where(y_mean != 0, std / np.abs(y_mean) * 100, np.nan)
+        
+        no_variation = (np.abs(y).sum(axis=0) == 0)
+        direction = np.select(
+            [n < 3, no_variation, (p_value < 0.05) & (slope > 0), p_value < 0.05],
+            ['insufficient_data', 'no_variation', 'increasing', 'decreasing'],
+            default='flat'
+        )
+        
+        return pd.DataFrame({
+            'n_months': n,
+            'slope': slope,
+            'intercept': intercept,
+            'r_squared': r ** 2,
+            'p_value': p_value,
+            'mean': y_mean,
+            'std': std,
+            'cv': cv,
+            'direction': direction,
+            'confidence': np.where(p_value < 0.01, 'high', 'medium'),
+        }, index=matrix.columns)
+    
+    def _detect_seasonality(self) -> Optional[Dict]:
+        """
+        Detect yearly seasonality for every type and bucket series.
+        
+        The top-level keys describe Revenue; 'by_type' and 'by_bucket' hold
+        one record per series from the batch periodogram screen.
+        """
+        detector = SeasonalityDetector(self.df, self.config, self.cube)
+        by_type = detector.detect('type')
+        
+        if by_type.empty:
+            if len(self.cube.monthly('Revenue')) == 0:
+                logger.warning("No revenue data for seasonality analysis")
+                return None
+            return {'detected': False, 'reason': 'insufficient_data'}
+        
+        by_bucket = detector.detect('bucket') if 'bucket' in self.cube.dimensions else pd.DataFrame()
+        
+        result = {
+            'by_type': by_type.rename_axis('type').reset_index().to_dict('records'),
+            'by_bucket': by_bucket.rename_axis('bucket').reset_index().to_dict('records'),
+        }
+        
+        if 'Revenue' in by_type.index:
+            revenue = by_type.loc['Revenue']
+            result.update({
+                'detected': bool(revenue['detected']),
+                'strength': float(revenue['strength']),
+                'peak_months': revenue['peak_months'],
+                'trough_months': revenue['trough_months'],
+                'confidence': 'high' if revenue['strength'] > 0.2 else 'medium'
+            })
+        else:
+            logger.warning("No revenue data for seasonality analysis")
+            result['detected'] = False
+        
+        logger.info(
+            "Seasonality analysis complete",
+            detected=result['detected'],
+            seasonal_types=int(by_type['detected'].sum()),
+            seasonal_buckets=int(by_bucket['detected'].sum()) if len(by_bucket) else 0
+        )
+        
+        return result
     
     def _calculate_correlations(self) -> Optional[pd.DataFrame]:
         """Calculate correlations between different types."""
         # Get monthly totals by type
-        monthly = self.df.groupby(['year_month', 'type'])['amount'].sum().reset_index()
+        monthly = self.cube.rollup(['year_month', 'type']).reset_index()
         
         if len(monthly) < 12:
             logger.warning("Insufficient data for correlation analysis")
@@ -253,7 +309,7 @@ class TrendAnalyzer:
             return []
         
         # Get monthly data
-        monthly = self.df[self.df['type'] == metric_type].groupby('year_month')['amount'].sum()
+        monthly = self.cube.monthly(metric_type)
         
         if len(monthly) < 6:
             logger.warning(f"Insufficient data for change point detection in {metric}")
@@ -264,17 +320,23 @@ class TrendAnalyzer:
         
         # Identify significant changes (> 2 standard deviations)
         threshold = 2 * pct_changes.std()
-        
-        change_points = []
-        for date, change in pct_changes.items():
-            if abs(change) > threshold and not pd.isna(change):
-                change_points.append({
-                    'date': date.strftime('%Y-%m'),
-                    'change_pct': float(change * 100),
-                    'previous_value': float(monthly.loc[monthly.index < date].iloc[-1]),
-                    'new_value': float(monthly.loc[date]),
-                    'significance': 'high' if abs(change) > 3 * threshold else 'medium'
-                })
+        significant = (pct_changes.abs() > threshold).to_numpy()
+        
+        dates = monthly.index[significant].strftime('%Y-%m')
+        changes = pct_changes.to_numpy()[significant]
+        previous_values = monthly.shift(1).to_numpy()[significant]
+        new_values = monthly.to_numpy()[significant]
+        
+        change_points = [
+            {
+                'date': date,
+                'change_pct': float(change * 100),
+                'previous_value': float(previous),
+                'new_value': float(new),
+                'significance': 'high' if abs(change) > 3 * threshold else 'medium'
+            }
+            for date, change, previous, new in zip(dates, changes, previous_values, new_values)
+        ]
         
         logger.info(f"Identified {len(change_points)} change points for {metric}")
         
@@ -282,34 +344,30 @@ class TrendAnalyzer:
     
     def calculate_volatility(self) -> Dict[str, float]:
         """Calculate volatility (coefficient of variation) for each type."""
-        volatility = {}
+        trend_stats = self.trend_statistics('type')
         
-        for metric_type in self.df['type'].unique():
-            type_data = self.df[self.df['type'] == metric_type]
-            monthly = type_data.groupby('year_month')['amount'].sum()
-            
-            if len(monthly) > 0:
-                mean = monthly.mean()
-                std = monthly.std()
-                
-                if mean != 0:
-                    cv = (std / abs(mean)) * 100  # Coefficient of variation as percentage
-                    volatility[metric_type] = float(cv)
-        
-        return volatility
+        # Coefficient of variation as percentage, where the mean is non-zero
+        cv = trend_stats.loc[trend_stats['mean'] != 0, 'cv']
+        
+        return {metric_type: float(value) for metric_type, value in cv.items()}
 
 
-def analyze_trends(df: pd.DataFrame, config: Optional[Dict] = None) -> TrendResult:
+def analyze_trends(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None
+) -> TrendResult:
     """
     Convenience function to analyze trends.
     
     Args:
         df: Normalized FAGL DataFrame
         config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
     
     Returns:
         TrendResult object
     """
-    analyzer = TrendAnalyzer(df, config)
+    analyzer = TrendAnalyzer(df, config, cube)
     return analyzer.analyze_all()
 
@@ -0,0 +1,192 @@
+"""Working-capital metrics (DSO, DPO, DIO, cash conversion cycle) over time."""
+
+import pandas as pd
+import numpy as np
+import structlog
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class WorkingCapitalResult:
+    """Container for working-capital time series."""
+    monthly: pd.DataFrame
+    latest: Dict
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'monthly': self.monthly.to_dict('records'),
+            'latest': self.latest,
+        }
+
+
+class WorkingCapitalAnalyzer:
+    """
+    Computes DSO, DPO, DIO and the cash conversion cycle at every month-end.
+    
+    The ledger is aggregated once into daily totals per role (receivables,
+    payables, inventory, revenue, cost). Balances are cumulative sums of
+    the balance-sheet roles; flows over any trailing window are differences
+    of the cumulative flow sums, so each extra window only costs one lookup
+    per month-end.
+    """
+    
+    # Mapping types feeding each role (standard and Bulgarian type names)
+    ROLE_TYPES = {
+        'receivable': ['Receivable', 'AR'],
+        'payable': ['Payable', 'AP'],
+        'inventory': ['Inventory'],
+        'revenue': ['Revenue'],
+        'cost': ['OPEX', 'Operating Expense'],
+    }
+    
+    DEFAULT_WINDOWS = [30, 90, 365]
+    
+    def __init__(self, df: pd.DataFrame, config: Optional[Dict] = None):
+        """
+        Initialize working-capital analyzer.
+        
+        Args:
+            df: Normalized FAGL DataFrame with mapping information
+            config: Configuration dictionary
+        """
+        self.df = df
+        self.config = config or {}
+        self.windows: List[int] = sorted(self.config.get('working_capital_windows', self.DEFAULT_WINDOWS))
+        self.roles = list(self.ROLE_TYPES)
+    
+    def analyze(self) -> WorkingCapitalResult:
+        """
+        Build the month-end working-capital time series.
+        
+        Balances are taken in absolute terms (debit receivables and
+        inventory, credit payables) and flows as absolute window totals, so
+        the result does not depend on the sign convention. A window longer
+        than the history uses the days available.
+        
+        Returns:
+            WorkingCapitalResult with one row per month-end
+        """
+        daily, first_day = self._daily_totals()
+        if daily is None:
+            logger.warning("No data for working-capital analysis")
+            return WorkingCapitalResult(monthly=pd.DataFrame(), latest={})
+        
+        n_days = daily.shape[0]
+        cumulative = np.cumsum(daily, axis=0)
+        present = np.abs(daily).sum(axis=0) > 0
+        
+        # Month-ends inside the data range; the last snapshot is the last posting day
+        start = pd.Timestamp(first_day)
+        end = start + pd.Timedelta(days=n_days - 1)
+        month_ends = pd.period_range(start, end, freq='M').to_timestamp(how='end').normalize()
+        month_ends = month_ends.where(month_ends <= end, end)
+        snapshot = (month_ends - start).days.to_numpy()
+        
+        role = {name: i for i, name in enumerate(self.roles)}
+        balance = np.abs(cumulative[snapshot])
+        
+        monthly = pd.DataFrame({
+            'date': month_ends,
+            'year_month': month_ends.to_period('M'),
+            'ar_balance': balance[:, role['receivable']],
+            'ap_balance': balance[:, role['payable']],
+            'inventory_balance': np.where(present[role['inventory']], balance[:, role['inventory']], np.nan),
+        })
+        
+        # Trailing flows: cumulative sum at the snapshot minus the sum w days earlier
+        padded = np.vstack([np.zeros((1, len(self.roles))), cumulative])
+        for window in self.windows:
+            earlier = np.maximum(snapshot + 1 - window, 0)
+            flows = np.abs(padded[snapshot + 1] - padded[earlier])
+            days = (snapshot + 1 - earlier).astype(float)
+            
+            daily_revenue = flows[:, role['revenue']] / days
+            daily_cost = flows[:, role['cost']] / days
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                dso = np.where(daily_revenue > 0, monthly['ar_balance'] / daily_revenue, np.nan)
+                dpo = np.where(daily_cost > 0, monthly['ap_balance'] / daily_cost, np.nan)
+                dio = np.where(daily_cost > 0, monthly['inventory_balance'] / daily_cost, np.nan)
+            
+            monthly[f'dso_{window}d'] = dso
+            monthly[f'dpo_{window}d'] = dpo
+            monthly[f'dio_{window}d'] = dio
+            # Without inventory accounts the cycle is DSO - DPO
+            monthly[f'ccc_{window}d'] = dso + (dio if present[role['inventory']] else 0.0) - dpo
+        
+        latest = self._latest(monthly)
+        
+        logger.info(
+            "Working-capital series computed",
+            months=len(monthly),
+            windows=self.windows,
+            **{k: round(v, 1) for k, v in latest.items() if k.startswith('ccc_') and v is not None}
+        )
+        
+        return WorkingCapitalResult(monthly=monthly, latest=latest)
+    
+    def _daily_totals(self):
+        """
+        Aggregate amounts per day and role in one pass.
+        
+        Returns:
+            Tuple of (days x roles matrix, first day) or (None, None) without data
+        """
+        df = self.df
+        if len(df) == 0 or 'type' not in df.columns:
+            return None, None
+        
+        type_codes, type_names = pd.factorize(df['type'])
+        role_of_type = np.full(len(type_names) + 1, -1)
+        for i, name in enumerate(type_names):
+            for r, role in enumerate(self.roles):
+                if name in self.ROLE_TYPES[role]:
+                    role_of_type[i] = r
+        roles = role_of_type[type_codes]
+        
+        posted = df['posting_date'].to_numpy(dtype='datetime64[D]')
+        valid = (roles >= 0) & ~np.isnat(posted)
+        if not valid.any():
+            return None, None
+        
+        day_numbers = posted.astype(np.int64)
+        first_day = day_numbers[~np.isnat(posted)].min()
+        last_day = day_numbers[~np.isnat(posted)].max()
+        n_days = int(last_day - first_day) + 1
+        
+        cells = (day_numbers[valid] - first_day) * len(self.roles) + roles[valid]
+        amounts = np.nan_to_num(df['amount'].to_numpy(dtype=float)[valid])
+        daily = np.bincount(cells, weights=amounts, minlength=n_days * len(self.roles))
+        
+        return daily.reshape(n_days, len(self.roles)), np.datetime64(int(first_day), 'D')
+    
+    def _latest(self, monthly: pd.DataFrame) -> Dict:
+        """Latest month-end values of every metric (None where undefined)."""
+        if len(monthly) == 0:
+            return {}
+        
+        last = monthly.iloc[-1]
+        return {
+            column: (None if pd.isna(last[column]) else float(last[column]))
+            for column in monthly.columns
+            if column not in ('date', 'year_month')
+        }
+
+
+def calculate_working_capital(df: pd.DataFrame, config: Optional[Dict] = None) -> WorkingCapitalResult:
+    """
+    Convenience function to compute the working-capital time series.
+    
+    Args:
+        df: Normalized FAGL DataFrame
+        config: Configuration dictionary
+    
+    Returns:
+        WorkingCapitalResult object
+    """
+    analyzer = WorkingCapitalAnalyzer(df, config)
+    return analyzer.analyze()
@@ -8,6 +8,7 @@ import pandas as pd
 
 from .config import load_config
 from .loaders.bulgarian_mapping_loader import BulgarianMappingLoader
+from .loaders.classification_rules import load_classification_rules
 from .loaders.fagl_loader import FAGLLoader
 from .transformers.validator import DataValidator
 from .transformers.normalizer import DataNormalizer
@@ -105,8 +106,10 @@ def main(
         if not config_path.exists():
             logger.warning(f"Bulgarian config not found: {config}, using defaults")
             cfg = None
+            classification_rules = None
         else:
             cfg = load_config(config_path)
+            classification_rules = load_classification_rules(config_path)
         
         # Create output directory
         output_dir = Path(out_dir)
@@ -123,7 +126,7 @@ def main(
         if not mapping_path.exists():
             raise FileNotFoundError(f"Bulgarian mapping file not found: {mapping}")
         
-        mapping_loader = BulgarianMappingLoader(mapping_path, cfg)
+        mapping_loader = BulgarianMappingLoader(mapping_path, cfg, rules=classification_rules)
         mapping_df = mapping_loader.load()
         
         # Get Bulgarian summary
@@ -10,8 +10,7 @@ from datetime import datetime
 from fin_review.config import load_config, Config
 from fin_review.loaders import load_mapping, load_fagl_data
 from fin_review.transformers import validate_data, normalize_data
-from fin_review.analytics import calculate_kpis, analyze_trends, calculate_aging, detect_anomalies, generate_forecasts
-from fin_review.nlp import generate_commentary
+from fin_review.pipeline import run_analytics, run_multi_entity
 from fin_review.reporting import generate_excel_report, generate_pptx_report, generate_pdf_report, generate_html_report, generate_manifest
 
 # Configure logging
@@ -35,6 +34,8 @@ logger = structlog.get_logger()
 @click.option('--start', type=str, help='Start date (YYYY-MM-DD)')
 @click.option('--end', type=str, help='End date (YYYY-MM-DD)')
 @click.option('--entity', type=str, help='Entity filter')
+@click.option('--multi-entity', is_flag=True, help='Run every company code in parallel and consolidate the group')
+@click.option('--entities', type=str, help='Comma-separated company codes for multi-entity mode (implies --multi-entity)')
 @click.option('--generate-dashboard/--no-dashboard', default=False, help='Generate Streamlit dashboard')
 @click.option('--generate-pdf/--no-pdf', default=True, help='Generate PDF summary report')
 @click.option('--auto-open/--no-auto-open', default=True, help='Automatically open generated reports')
@@ -51,6 +52,8 @@ def main(
     start,
     end,
     entity,
+    multi_entity,
+    entities,
     generate_dashboard,
     generate_pdf,
     auto_open,
@@ -89,6 +92,8 @@ def main(
             start_date=start,
             end_date=end,
             entity=entity,
+            multi_entity=(multi_entity or bool(entities)) or None,
+            entities=[code.strip() for code in entities.split(',') if code.strip()] if entities else None,
             generate_dashboard=generate_dashboard,
             dry_run=dry_run,
             explain_mode=explain_mode,
@@ -104,7 +109,7 @@ def main(
         logger.info("STEP 1: Loading Mapping File")
         logger.info("=" * 60)
         
-        mapping_df = load_mapping(cfg.mapping_file)
+        mapping_df = load_mapping(cfg.mapping_file, cache_dir=cfg.cache_dir)
         logger.info(f"Loaded {len(mapping_df)} GL account mappings")
         
         # Step 2: Load FAGL data
@@ -118,7 +123,10 @@ def main(
             column_mapping=cfg.column_mapping,
             start_date=cfg.start_date,
             end_date=cfg.end_date,
-            entity=cfg.entity
+            entity=cfg.entity,
+            chunk_size=cfg.chunk_size if cfg.streaming_load else None,
+            max_workers=cfg.max_workers if cfg.parallel_processing else 1,
+            cache_dir=cfg.cache_dir
         )
         
         logger.info(
@@ -189,80 +197,33 @@ def main(
         output_path = cfg.create_output_dir()
         logger.info(f"Output directory: {output_path}")
         
-        # Step 6: Calculate KPIs
+        # Step 6: Run analytics (per entity and consolidated in multi-entity mode)
         logger.info("=" * 60)
-        logger.info("STEP 5: Calculating KPIs")
+        logger.info("STEP 5: Running Analytics")
         logger.info("=" * 60)
         
-        kpi_result = calculate_kpis(normalized_df, cfg.__dict__)
-        logger.info("KPIs calculated")
-        
-        # Step 7: Analyze trends
-        logger.info("=" * 60)
-        logger.info("STEP 6: Analyzing Trends")
-        logger.info("=" * 60)
-        
-        trend_result = analyze_trends(normalized_df, cfg.__dict__)
-        logger.info("Trends analyzed")
-        
-        # Step 8: Calculate aging
-        logger.info("=" * 60)
-        logger.info("STEP 7: Calculating AR/AP Aging")
-        logger.info("=" * 60)
-        
-        aging_result = calculate_aging(normalized_df, cfg.__dict__)
-        logger.info(
-            "Aging calculated",
-            ar_overdue_pct=aging_result.ar_summary.get('overdue_pct', 0),
-            ap_overdue_pct=aging_result.ap_summary.get('overdue_pct', 0)
-        )
-        
-        # Step 9: Detect anomalies
+        group_result = None
+        if cfg.multi_entity:
+            if cfg.entities:
+                # Group reports cover the selected entities only
+                selected = normalized_df['company_code'].astype(str).isin(cfg.entities)
+                normalized_df = normalized_df[selected]
+            group_result = run_multi_entity(normalized_df, cfg.__dict__)
+            analytics = group_result.group
+            click.echo(f"✓ Analyzed {len(group_result.entities)} entities and the consolidated group")
+        else:
+            analytics = run_analytics(normalized_df, cfg.__dict__)
+        
+        kpi_result = analytics.kpi_result
+        trend_result = analytics.trend_result
+        aging_result = analytics.aging_result
+        anomaly_result = analytics.anomaly_result
+        forecast_result = analytics.forecast_result
+        commentary_result = analytics.commentary_result
+        
+        # Step 7: Save outputs
         logger.info("=" * 60)
-        logger.info("STEP 8: Detecting Anomalies")
-        logger.info("=" * 60)
-        
-        anomaly_result = detect_anomalies(normalized_df, cfg.__dict__)
-        logger.info(
-            "Anomalies detected",
-            total=len(anomaly_result.anomalies),
-            high_severity=anomaly_result.summary.get('high_severity_count', 0)
-        )
-        
-        # Step 10: Generate forecasts
-        forecast_result = None
-        if cfg.enable_forecasting:
-            logger.info("=" * 60)
-            logger.info("STEP 9: Generating Forecasts")
-            logger.info("=" * 60)
-            
-            forecast_result = generate_forecasts(normalized_df, cfg.__dict__)
-            logger.info(f"Forecasts generated using {forecast_result.method_used}")
-        
-        # Step 11: Generate NLP commentary
-        logger.info("=" * 60)
-        logger.info("STEP 10: Generating NLP Commentary")
-        logger.info("=" * 60)
-        
-        commentary_result = generate_commentary(
-            normalized_df,
-            kpi_result.to_dict(),
-            trend_result.to_dict(),
-            aging_result.to_dict(),
-            anomaly_result.to_dict(),
-            cfg.__dict__
-        )
-        
-        logger.info(
-            "Commentary generated",
-            insights=len(commentary_result.insights),
-            risks=len(commentary_result.risks),
-            recommendations=len(commentary_result.recommendations)
-        )
-        
-        # Step 12: Save outputs
-        logger.info("=" * 60)
-        logger.info("STEP 11: Generating Reports")
+        logger.info("STEP 6: Generating Reports")
         logger.info("=" * 60)
         
         # Save mapped data
@@ -372,6 +333,22 @@ def main(
             json.dump(validation_result.to_dict(), f, indent=2)
         logger.info(f"Saved data quality report: {quality_path}")
         
+        # Save per-entity results and the entity comparison
+        if group_result is not None:
+            comparison_path = output_path / "entity_comparison.csv"
+            group_result.comparison.to_csv(comparison_path)
+            logger.info(f"Saved entity comparison: {comparison_path}")
+            
+            for code, entity_result in group_result.entities.items():
+                entity_path = output_path / "entities" / code
+                entity_path.mkdir(parents=True, exist_ok=True)
+                with open(entity_path / "kpis.json", 'w') as f:
+                    json.dump(entity_result.kpi_result.to_dict(), f, indent=2, default=str)
+                with open(entity_path / "commentary.txt", 'w') as f:
+                    f.write(entity_result.commentary_result.executive_summary)
+            
+            click.echo(f"✓ Entity comparison: {comparison_path}")
+        
         # Generate manifest
         if cfg.generate_manifest:
             manifest_path = output_path / "run_manifest.json"
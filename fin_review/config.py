@@ -26,11 +26,14 @@ class Config:
     
     # Filters
     entity: Optional[str] = None
+    multi_entity: bool = False
+    entities: Optional[List[str]] = None  # Company codes for multi-entity mode (None = all)
     
     # Data processing
     amount_sign_convention: str = "positive_debit"
     default_currency: str = "EUR"
     column_mapping: Dict[str, str] = field(default_factory=dict)
+    mapping_extra_columns: List[str] = field(default_factory=list)
     
     # Aging buckets
     aging_buckets: List[List] = field(default_factory=lambda: [
@@ -40,19 +43,31 @@ class Config:
         [61, 90, "61-90 days"],
         [91, 999999, ">90 days"],
     ])
+    aging_as_of_date: Optional[str] = None  # Defaults to the latest posting date
+    aging_history_months: int = 24  # Month-end aging snapshots (0 disables)
     
     # Analytics configuration
     enable_growth_metrics: bool = True
     enable_ratios: bool = True
     rolling_windows: List[int] = field(default_factory=lambda: [3, 6, 12])
     enable_seasonality: bool = True
+    enable_change_points: bool = True
+    change_point_dimension: str = 'bucket'
+    change_point_penalty: float = 4.0
+    change_point_min_size: int = 3
     enable_anomaly_detection: bool = True
     anomaly_threshold_zscore: float = 3.0
     anomaly_threshold_mad: float = 3.5
     use_isolation_forest: bool = True
+    isolation_forest_mode: str = 'per_bucket'
+    enable_transaction_anomalies: bool = False
+    transaction_anomaly_top_n: int = 100
+    transaction_anomaly_contamination: float = 0.01
     enable_forecasting: bool = True
     forecast_periods: int = 6
     forecast_confidence_level: float = 0.95
+    forecast_level: str = 'type'
+    forecast_reconciliation: str = 'bottom_up'
     top_n_vendors: int = 10
     top_n_customers: int = 10
     top_n_expenses: int = 15
@@ -61,6 +76,8 @@ class Config:
     # AR/AP
     calculate_dso: bool = True
     calculate_dpo: bool = True
+    enable_working_capital: bool = True
+    working_capital_windows: List[int] = field(default_factory=lambda: [30, 90, 365])
     flag_overdue: bool = True
     overdue_threshold_days: int = 30
     
@@ -99,6 +116,10 @@ class Config:
     parallel_processing: bool = True
     max_workers: int = 4
     chunk_size: int = 10000
+    streaming_load: bool = False
+    cache_dir: Optional[str] = None
+    compact_dtypes: bool = False
+    compact_float32: bool = False
     
     # Reproducibility
     generate_manifest: bool = True
@@ -117,6 +138,10 @@ class Config:
         if self.fagl_dir and self.fagl_file:
             logger.warning("Both fagl_dir and fagl_file provided, using fagl_file")
             self.fagl_dir = None
+        
+        # YAML reads numeric company codes as ints; the ledger's codes are compared as strings
+        if self.entities:
+            self.entities = [str(code) for code in self.entities]
     
     @classmethod
     def from_yaml(cls, yaml_path: str) -> "Config":
@@ -136,8 +161,10 @@ class Config:
         
         # Top-level keys
         for key in ['mapping_file', 'fagl_dir', 'fagl_file', 'output_dir', 
-                    'start_date', 'end_date', 'entity', 'amount_sign_convention',
-                    'default_currency', 'column_mapping', 'aging_buckets']:
+                    'start_date', 'end_date', 'entity', 'multi_entity', 'entities',
+                    'amount_sign_convention',
+                    'default_currency', 'column_mapping', 'mapping_extra_columns',
+                    'aging_buckets', 'aging_as_of_date', 'aging_history_months']:
             if key in config_dict:
                 flat[key] = config_dict[key]
         
@@ -145,10 +172,16 @@ class Config:
         if 'analytics' in config_dict:
             analytics = config_dict['analytics']
             for key in ['enable_growth_metrics', 'enable_ratios', 'rolling_windows',
-                       'enable_seasonality', 'enable_anomaly_detection',
+                       'enable_seasonality', 'enable_change_points',
+                       'change_point_dimension', 'change_point_penalty',
+                       'change_point_min_size', 'enable_anomaly_detection',
                        'anomaly_threshold_zscore', 'anomaly_threshold_mad',
-                       'use_isolation_forest', 'enable_forecasting',
+                       'use_isolation_forest', 'isolation_forest_mode',
+                       'enable_transaction_anomalies', 'transaction_anomaly_top_n',
+                       'transaction_anomaly_contamination',
+                       'enable_forecasting',
                        'forecast_periods', 'forecast_confidence_level',
+                       'forecast_level', 'forecast_reconciliation',
                        'top_n_vendors', 'top_n_customers', 'top_n_expenses',
                        'pareto_threshold']:
                 if key in analytics:
@@ -157,7 +190,8 @@ class Config:
         # AR/AP section
         if 'ar_ap' in config_dict:
             ar_ap = config_dict['ar_ap']
-            for key in ['calculate_dso', 'calculate_dpo', 'flag_overdue',
+            for key in ['calculate_dso', 'calculate_dpo', 'enable_working_capital',
+                       'working_capital_windows', 'flag_overdue',
                        'overdue_threshold_days']:
                 if key in ar_ap:
                     flat[key] = ar_ap[key]
@@ -200,7 +234,9 @@ class Config:
         # Performance section
         if 'performance' in config_dict:
             perf = config_dict['performance']
-            for key in ['parallel_processing', 'max_workers', 'chunk_size']:
+            for key in ['parallel_processing', 'max_workers', 'chunk_size',
+                       'streaming_load', 'cache_dir',
+                       'compact_dtypes', 'compact_float32']:
                 if key in perf:
                     flat[key] = perf[key]
         
@@ -224,20 +260,34 @@ class Config:
             'start_date': self.start_date,
             'end_date': self.end_date,
             'entity': self.entity,
+            'multi_entity': self.multi_entity,
+            'entities': self.entities,
             'amount_sign_convention': self.amount_sign_convention,
             'default_currency': self.default_currency,
             'aging_buckets': self.aging_buckets,
+            'aging_as_of_date': self.aging_as_of_date,
+            'aging_history_months': self.aging_history_months,
             'analytics': {
                 'enable_growth_metrics': self.enable_growth_metrics,
                 'enable_ratios': self.enable_ratios,
                 'rolling_windows': self.rolling_windows,
                 'enable_seasonality': self.enable_seasonality,
+                'enable_change_points': self.enable_change_points,
+                'change_point_dimension': self.change_point_dimension,
+                'change_point_penalty': self.change_point_penalty,
+                'change_point_min_size': self.change_point_min_size,
                 'enable_anomaly_detection': self.enable_anomaly_detection,
                 'anomaly_threshold_zscore': self.anomaly_threshold_zscore,
                 'anomaly_threshold_mad': self.anomaly_threshold_mad,
                 'use_isolation_forest': self.use_isolation_forest,
+                'isolation_forest_mode': self.isolation_forest_mode,
+                'enable_transaction_anomalies': self.enable_transaction_anomalies,
+                'transaction_anomaly_top_n': self.transaction_anomaly_top_n,
+                'transaction_anomaly_contamination': self.transaction_anomaly_contamination,
                 'enable_forecasting': self.enable_forecasting,
                 'forecast_periods': self.forecast_periods,
+                'forecast_level': self.forecast_level,
+                'forecast_reconciliation': self.forecast_reconciliation,
                 'top_n_vendors': self.top_n_vendors,
                 'top_n_customers': self.top_n_customers,
                 'top_n_expenses': self.top_n_expenses,
@@ -246,6 +296,8 @@ class Config:
             'ar_ap': {
                 'calculate_dso': self.calculate_dso,
                 'calculate_dpo': self.calculate_dpo,
+                'enable_working_capital': self.enable_working_capital,
+                'working_capital_windows': self.working_capital_windows,
                 'flag_overdue': self.flag_overdue,
                 'overdue_threshold_days': self.overdue_threshold_days,
             },
@@ -265,7 +317,10 @@ class Config:
         from datetime import datetime
         
         timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        entity_str = f"_{self.entity}" if self.entity else ""
+        if self.multi_entity:
+            entity_str = "_group"
+        else:
+            entity_str = f"_{self.entity}" if self.entity else ""
         dir_name = f"{timestamp}_financial_review{entity_str}"
         
         output_path = Path(self.output_dir) / dir_name
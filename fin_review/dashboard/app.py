@@ -246,7 +246,7 @@ def main():
         with col1:
             st.subheader("Amount by Type")
             
-            type_amounts = filtered_df.groupby('type')['amount'].sum().abs().sort_values(ascending=False)
+            type_amounts = filtered_df.groupby('type', observed=True)['amount'].sum().abs().sort_values(ascending=False)
             
             fig = px.pie(
                 values=type_amounts.values,
@@ -259,7 +259,7 @@ def main():
         with col2:
             st.subheader("Top 10 Buckets")
             
-            bucket_amounts = filtered_df.groupby('bucket')['amount'].sum().abs().nlargest(10)
+            bucket_amounts = filtered_df.groupby('bucket', observed=True)['amount'].sum().abs().nlargest(10)
             
             fig = px.bar(
                 x=bucket_amounts.values,
@@ -276,7 +276,7 @@ def main():
         # Time series by bucket
         st.subheader("Bucket Trends Over Time")
         
-        top_buckets = filtered_df.groupby('bucket')['amount'].sum().abs().nlargest(5).index.tolist()
+        top_buckets = filtered_df.groupby('bucket', observed=True)['amount'].sum().abs().nlargest(5).index.tolist()
         
         selected_buckets = st.multiselect(
             "Select buckets to display",
@@ -286,7 +286,7 @@ def main():
         
         if selected_buckets:
             bucket_monthly = filtered_df[filtered_df['bucket'].isin(selected_buckets)].groupby(
-                ['year_month', 'bucket']
+                ['year_month', 'bucket'], observed=True
             )['amount'].sum().reset_index()
             
             fig = px.line(
@@ -361,7 +361,7 @@ def main():
             
             # Top overdue parties
             if 'customer_vendor' in overdue.columns:
-                top_overdue = overdue.groupby('customer_vendor')['open_amount'].sum().abs().nlargest(10)
+                top_overdue = overdue.groupby('customer_vendor', observed=True)['open_amount'].sum().abs().nlargest(10)
                 
                 fig = px.bar(
                     x=top_overdue.values,
@@ -9,22 +9,26 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from .cache import ParquetCache
+
 logger = structlog.get_logger(__name__)
 
 
 class BulgarianFAGLLoader:
     """Load and process Bulgarian FAGL03 data from movements 2024.xlsx."""
     
-    def __init__(self, movements_file: Path, config=None):
+    def __init__(self, movements_file: Path, config=None, cache_dir: Optional[str] = None):
         """
         Initialize Bulgarian FAGL03 loader.
         
         Args:
             movements_file: Path to movements 2024.xlsx file
             config: Configuration object (optional)
+            cache_dir: Directory for the Parquet cache (defaults to config.cache_dir)
         """
         self.movements_file = movements_file
         self.config = config
+        self.cache_dir = cache_dir or getattr(config, 'cache_dir', None)
         self.fagl_df: Optional[pd.DataFrame] = None
         
         # Column mappings based on your description
@@ -36,6 +40,7 @@ class BulgarianFAGLLoader:
             'account_name': 'Account Name',      # Column K
             'debit_amount': 'Debit',             # Column N
             'credit_amount': 'Credit',           # Column O
+            'amount': 'Amount',                  # Pre-netted exports only
             'line_item_text': 'Line Item Text',  # Column S
             'currency': 'Currency',              # Column P
             'company_code': 'Company Code',      # Column A
@@ -67,6 +72,21 @@ class BulgarianFAGLLoader:
         
         self._validate_file_exists()
         
+        cache = ParquetCache(self.cache_dir) if self.cache_dir else None
+        if cache:
+            cache_key = cache.make_key(
+                self.movements_file,
+                {
+                    'loader': 'BulgarianFAGLLoader',
+                    'sample_size': sample_size,
+                    'column_mappings': self.column_mappings
+                }
+            )
+            cached = cache.load(cache_key)
+            if cached is not None:
+                self.fagl_df = cached
+                return self.fagl_df
+        
         # Load Excel file
         try:
             if sample_size:
@@ -87,6 +107,9 @@ class BulgarianFAGLLoader:
         self._convert_to_standard_format()
         self._validate_bulgarian_types()
         
+        if cache:
+            cache.save(cache_key, self.fagl_df)
+        
         logger.info("Bulgarian FAGL03 processing completed", 
                    final_rows=len(self.fagl_df))
         
@@ -99,6 +122,12 @@ class BulgarianFAGLLoader:
             'Account Name', 'Debit', 'Credit'
         ]
         
+        # Pre-netted exports carry a single signed Amount instead of Debit/Credit
+        if 'Amount' in self.fagl_df.columns:
+            required_columns = [
+                col for col in required_columns if col not in ('Debit', 'Credit')
+            ]
+        
         missing_columns = [col for col in required_columns if col not in self.fagl_df.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns in movements file: {missing_columns}")
@@ -124,8 +153,8 @@ class BulgarianFAGLLoader:
         # Handle date column
         self.fagl_df['Posting Date'] = pd.to_datetime(self.fagl_df['Posting Date'], errors='coerce')
         
-        # Clean numeric columns (Debit, Credit)
-        for col in ['Debit', 'Credit']:
+        # Clean numeric columns (Debit, Credit, or pre-netted Amount)
+        for col in ['Debit', 'Credit', 'Amount']:
             if col in self.fagl_df.columns:
                 # Convert to numeric, handling any text values
                 self.fagl_df[col] = pd.to_numeric(self.fagl_df[col], errors='coerce')
@@ -147,58 +176,37 @@ class BulgarianFAGLLoader:
         """Convert Bulgarian movements data to standard FAGL03 format."""
         logger.info("Converting to standard FAGL03 format")
         
-        # Create standard FAGL03 format
-        standard_df = pd.DataFrame()
-        
-        # Map columns to standard format
-        standard_df['posting_date'] = self.fagl_df['Posting Date']
-        standard_df['document_no'] = self.fagl_df['Document Number'].astype(str)
-        standard_df['reference_no'] = self.fagl_df['Reference Number'].fillna('')
-        standard_df['gl_account'] = self.fagl_df['G/L Account']
-        standard_df['account_name'] = self.fagl_df['Account Name']
-        standard_df['line_item_text'] = self.fagl_df['Line Item Text'].fillna('')
-        
-        # Handle currency
-        if 'Currency' in self.fagl_df.columns:
-            standard_df['currency'] = self.fagl_df['Currency'].fillna('BGN')
-        else:
-            standard_df['currency'] = 'BGN'  # Default to Bulgarian Lev
-        
-        # Handle company code
-        if 'Company Code' in self.fagl_df.columns:
-            standard_df['company_code'] = self.fagl_df['Company Code'].fillna('BG10')
-        else:
-            standard_df['company_code'] = 'BG10'  # Default Bulgarian company code
-        
         # CRITICAL: Convert debit/credit to single amount column
         # Assets and Expenses: Use debit amounts (positive)
         # Revenue, Liabilities, Equity: Use credit amounts (negative)
-        
-        def calculate_amount(row):
-            """Calculate net amount based on Bulgarian accounting logic."""
-            debit = float(row['Debit']) if pd.notna(row['Debit']) else 0.0
-            credit = float(row['Credit']) if pd.notna(row['Credit']) else 0.0
-            
-            # For assets and expenses, use debit amounts (positive)
-            # For revenue, liabilities, equity, use credit amounts (negative)
-            # This creates a standard where positive = assets/expenses, negative = revenue/liabilities/equity
-            
-            if debit > 0:
-                return debit  # Assets and expenses
-            elif credit > 0:
-                return -credit  # Revenue, liabilities, equity (negative)
-            else:
-                return 0.0
-        
-        standard_df['amount'] = self.fagl_df.apply(calculate_amount, axis=1)
-        
-        # Add additional fields for compatibility
-        standard_df['customer_vendor'] = ''  # Not available in movements file
-        standard_df['due_date'] = None  # Not available in movements file
-        standard_df['open_amount'] = standard_df['amount']  # Assume all amounts are open
-        
-        # Create posting_text from line_item_text
-        standard_df['posting_text'] = standard_df['line_item_text']
+        amount = self._net_amounts()
+        
+        def column_or(name: str, default) -> pd.Series:
+            """Get a source column with missing values filled, or a constant column."""
+            if name in self.fagl_df.columns:
+                return self.fagl_df[name].fillna(default)
+            return pd.Series(default, index=self.fagl_df.index)
+        
+        line_item_text = column_or('Line Item Text', '')
+        
+        # Build the standard frame in one step rather than column by column
+        standard_df = pd.DataFrame({
+            'posting_date': self.fagl_df['Posting Date'],
+            'document_no': self.fagl_df['Document Number'].astype(str),
+            'reference_no': column_or('Reference Number', ''),
+            'gl_account': self.fagl_df['G/L Account'],
+            'account_name': self.fagl_df['Account Name'],
+            'line_item_text': line_item_text,
+            'currency': column_or('Currency', 'BGN'),          # Default to Bulgarian Lev
+            'company_code': column_or('Company Code', 'BG10'),  # Default Bulgarian company code
+            'amount': amount,
+            # Additional fields for compatibility
+            'customer_vendor': '',  # Not available in movements file
+            'due_date': None,  # Not available in movements file
+            'open_amount': amount,  # Assume all amounts are open
+            # Create posting_text from line_item_text
+            'posting_text': line_item_text,
+        }, index=self.fagl_df.index)
         
         self.fagl_df = standard_df
         
@@ -206,6 +214,23 @@ class BulgarianFAGLLoader:
                    final_rows=len(self.fagl_df),
                    amount_range=f"{self.fagl_df['amount'].min():,.2f} to {self.fagl_df['amount'].max():,.2f}")
     
+    def _net_amounts(self) -> np.ndarray:
+        """
+        Calculate net amounts based on Bulgarian accounting logic.
+        
+        Separate debit/credit exports are netted so that a positive debit is
+        kept as is (assets, expenses) and otherwise a positive credit becomes
+        negative (revenue, liabilities, equity). Pre-netted exports with an
+        'Amount' column already follow that convention and are used directly.
+        """
+        if 'Debit' not in self.fagl_df.columns or 'Credit' not in self.fagl_df.columns:
+            return self.fagl_df['Amount'].to_numpy(dtype='float64')
+        
+        debit = self.fagl_df['Debit'].to_numpy(dtype='float64')
+        credit = self.fagl_df['Credit'].to_numpy(dtype='float64')
+        
+        return np.where(debit > 0, debit, np.where(credit > 0, -credit, 0.0))
+    
     def _validate_bulgarian_types(self):
         """Validate Bulgarian data types and consistency."""
         logger.info("Validating Bulgarian data types")
@@ -254,7 +279,12 @@ class BulgarianFAGLLoader:
         }
 
 
-def load_bulgarian_fagl(movements_file: Path, config=None, sample_size: Optional[int] = None) -> pd.DataFrame:
+def load_bulgarian_fagl(
+    movements_file: Path,
+    config=None,
+    sample_size: Optional[int] = None,
+    cache_dir: Optional[str] = None
+) -> pd.DataFrame:
     """
     Convenience function to load Bulgarian FAGL03 data.
     
@@ -262,9 +292,10 @@ def load_bulgarian_fagl(movements_file: Path, config=None, sample_size: Optional
         movements_file: Path to movements 2024.xlsx file
         config: Configuration object (optional)
         sample_size: Optional number of rows to load for testing
+        cache_dir: Directory for the Parquet cache (optional)
         
     Returns:
         Standardized FAGL03 DataFrame
     """
-    loader = BulgarianFAGLLoader(movements_file, config)
+    loader = BulgarianFAGLLoader(movements_file, config, cache_dir=cache_dir)
     return loader.load(sample_size=sample_size)
@@ -5,6 +5,8 @@ import structlog
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from ..config import Config
+from .cache import ParquetCache
+from .classification_rules import DEFAULT_CLASSIFICATION_RULES, RuleClassifier
 
 logger = structlog.get_logger(__name__)
 
@@ -12,16 +14,23 @@ logger = structlog.get_logger(__name__)
 class BulgarianMappingLoader:
     """Load and process Bulgarian financial mapping data."""
     
-    def __init__(self, mapping_file: Path, config: Config):
+    def __init__(self, mapping_file: Path, config: Config, cache_dir: Optional[str] = None,
+                 rules: Optional[Dict] = None):
         """
         Initialize Bulgarian mapping loader.
         
         Args:
             mapping_file: Path to Bulgarian mapping Excel file
             config: Configuration object
+            cache_dir: Directory for the Parquet cache (defaults to config.cache_dir)
+            rules: Bucket/type rule tables (defaults to DEFAULT_CLASSIFICATION_RULES)
         """
         self.mapping_file = mapping_file
         self.config = config
+        self.cache_dir = cache_dir or getattr(config, 'cache_dir', None)
+        self.rules = {**DEFAULT_CLASSIFICATION_RULES, **(rules or {})}
+        self.bucket_classifier = RuleClassifier(self.rules['bucket'])
+        self.type_classifier = RuleClassifier(self.rules['type'])
         self.mapping_df: Optional[pd.DataFrame] = None
         
     def _validate_file_exists(self):
@@ -43,6 +52,17 @@ class BulgarianMappingLoader:
         
         self._validate_file_exists()
         
+        cache = ParquetCache(self.cache_dir) if self.cache_dir else None
+        if cache:
+            cache_key = cache.make_key(self.mapping_file, {
+                'loader': 'BulgarianMappingLoader',
+                'rules': self.rules
+            })
+            cached = cache.load(cache_key)
+            if cached is not None:
+                self.mapping_df = cached
+                return self.mapping_df
+        
         # Load Excel file
         try:
             self.mapping_df = pd.read_excel(self.mapping_file)
@@ -54,6 +74,9 @@ class BulgarianMappingLoader:
         self._validate_bulgarian_types()
         self._create_bulgarian_classifications()
         
+        if cache:
+            cache.save(cache_key, self.mapping_df)
+        
         logger.info("Bulgarian mapping loaded successfully", 
                    accounts=len(self.mapping_df),
                    fs_sub_classes=len(self.mapping_df['FS Sub class'].unique()),
@@ -136,110 +159,14 @@ class BulgarianMappingLoader:
         """Create standardized classifications for Bulgarian data."""
         logger.info("Creating Bulgarian classifications")
         
-        # Create standardized bucket mapping based on ABCOTD and FS Sub class
-        def get_bucket_type(row):
-            """Determine bucket type from Bulgarian classifications."""
-            fs_sub_class = str(row.get('FS Sub class', '')).lower()
-            abcotd = str(row.get('ABCOTD', '')).lower()
-            classes = str(row.get('Classes', '')).lower()
-            
-            # P&L items (from ABCOTD)
-            revenue_keywords = ['revenue', 'other income']
-            expense_keywords = [
-                'cost of sales', 'operating expenses', 'payroll', 'other expenses',
-                'income tax', 'interest', 'depreciation', 'amortization'
-            ]
-            
-            # Balance Sheet items
-            asset_keywords = [
-                'cash', 'inventory', 'receivables', 'property', 'intangibles',
-                'prepaid', 'deferred tax asset'
-            ]
-            liability_keywords = [
-                'payables', 'deferred revenue', 'lease liabilities',
-                'deferred tax liability'
-            ]
-            equity_keywords = ['equity']
-            
-            # Check ABCOTD first (most specific)
-            if any(keyword in abcotd for keyword in revenue_keywords):
-                return 'Revenue'
-            elif any(keyword in abcotd for keyword in expense_keywords):
-                return 'OPEX'
-            elif any(keyword in abcotd for keyword in asset_keywords):
-                if 'current' in fs_sub_class:
-                    return 'Current Assets'
-                else:
-                    return 'Non-current Assets'
-            elif any(keyword in abcotd for keyword in liability_keywords):
-                if 'current' in fs_sub_class:
-                    return 'Current Liabilities'
-                else:
-                    return 'Non-current Liabilities'
-            elif any(keyword in abcotd for keyword in equity_keywords):
-                return 'Equity'
-            
-            # Fallback to FS Sub class
-            elif 'profit' in fs_sub_class or 'loss' in fs_sub_class:
-                return 'P&L'
-            elif 'assets' in fs_sub_class:
-                if 'current' in fs_sub_class:
-                    return 'Current Assets'
-                else:
-                    return 'Non-current Assets'
-            elif 'liabilities' in fs_sub_class:
-                if 'current' in fs_sub_class:
-                    return 'Current Liabilities'
-                else:
-                    return 'Non-current Liabilities'
-            elif 'equity' in fs_sub_class:
-                return 'Equity'
-            
-            # Final fallback to Classes
-            elif 'profit' in classes or 'loss' in classes:
-                return 'P&L'
-            elif 'assets' in classes:
-                return 'Assets'
-            elif 'liabilities' in classes:
-                return 'Liabilities'
-            elif 'equity' in classes:
-                return 'Equity'
-            
-            return 'Other'
-        
-        # Apply bucket classification
-        self.mapping_df['bucket'] = self.mapping_df.apply(get_bucket_type, axis=1)
+        # Bucket rules look at ABCOTD, then FS Sub class, then Classes;
+        # type rules also see the derived bucket
+        self.mapping_df['bucket'] = self.bucket_classifier.classify(self.mapping_df)
         
         # Create entity classification (default to single entity for now)
         self.mapping_df['entity'] = 'Main Entity'
         
-        # Create type classification
-        def get_type_classification(row):
-            """Determine account type for Bulgarian data."""
-            bucket = row.get('bucket', '')
-            abcotd = str(row.get('ABCOTD', '')).lower()
-            
-            if bucket in ['Revenue']:
-                return 'Revenue'
-            elif bucket in ['OPEX']:
-                if 'payroll' in abcotd:
-                    return 'Payroll'
-                elif 'depreciation' in abcotd or 'amortization' in abcotd:
-                    return 'Depreciation'
-                else:
-                    return 'Operating Expense'
-            elif 'receivables' in abcotd:
-                return 'AR'
-            elif 'payables' in abcotd:
-                return 'AP'
-            elif 'cash' in abcotd:
-                return 'Cash'
-            elif 'inventory' in abcotd:
-                return 'Inventory'
-            else:
-                return 'Other'
-        
-        self.mapping_df['type'] = self.mapping_df.apply(get_type_classification, axis=1)
+        self.mapping_df['type'] = self.type_classifier.classify(self.mapping_df)
         
         # Create notes from Bulgarian descriptions
         self.mapping_df['notes'] = (
@@ -280,17 +207,19 @@ class BulgarianMappingLoader:
         return self.mapping_df[standard_columns].copy()
 
 
-def load_bulgarian_mapping(mapping_file: Path, config: Config) -> pd.DataFrame:
+def load_bulgarian_mapping(mapping_file: Path, config: Config,
+                           rules: Optional[Dict] = None) -> pd.DataFrame:
     """
     Convenience function to load Bulgarian mapping data.
     
     Args:
         mapping_file: Path to Bulgarian mapping Excel file
         config: Configuration object
+        rules: Bucket/type rule tables (defaults to DEFAULT_CLASSIFICATION_RULES)
         
     Returns:
         Standardized mapping DataFrame
     """
-    loader = BulgarianMappingLoader(mapping_file, config)
+    loader = BulgarianMappingLoader(mapping_file, config, rules=rules)
     loader.load()
     return loader.get_standard_mapping()
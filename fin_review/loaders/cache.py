@@ -0,0 +1,104 @@
+"""Content-addressed Parquet cache for converted loader inputs."""
+
+import hashlib
+import json
+import os
+import pandas as pd
+import structlog
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = structlog.get_logger()
+
+DEFAULT_CACHE_DIR = '.fin_review_cache'
+
+# Bump when the cached frame layout changes so stale entries are ignored
+CACHE_VERSION = 1
+
+
+class ParquetCache:
+    """Stores cleaned loader output as Parquet, keyed by input checksum and settings."""
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize Parquet cache.
+        
+        Args:
+            cache_dir: Directory holding cached Parquet files
+        """
+        self.cache_dir = Path(cache_dir)
+    
+    def make_key(self, source_file: Path, settings: Dict[str, Any]) -> str:
+        """
+        Build a cache key from file contents and loader settings.
+        
+        Args:
+            source_file: Input file the cached frame was derived from
+            settings: Loader settings that influence the cleaned output
+        
+        Returns:
+            Hex digest identifying the cached frame
+        """
+        digest = hashlib.sha256()
+        digest.update(self._file_checksum(Path(source_file)).encode())
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        digest.update(str(CACHE_VERSION).encode())
+        return digest.hexdigest()
+    
+    def load(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Load a cached frame, memory-mapping the Parquet file.
+        
+        Args:
+            key: Cache key from make_key()
+        
+        Returns:
+            Cached DataFrame or None on a miss
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        
+        try:
+            df = pd.read_parquet(path, memory_map=True)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path.name}: {e}")
+            return None
+        
+        logger.info("Loaded cached frame", file=str(path), rows=len(df))
+        return df
+    
+    def save(self, key: str, df: pd.DataFrame):
+        """
+        Store a frame under the given key.
+        
+        Failures are logged and otherwise ignored so caching never breaks a load.
+        
+        Args:
+            key: Cache key from make_key()
+            df: Cleaned DataFrame to cache
+        """
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            logger.info("Cached frame", file=str(path), rows=len(df))
+        except Exception as e:
+            logger.warning(f"Could not cache frame: {e}")
+            tmp_path.unlink(missing_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        """Get the Parquet path for a key."""
+        return self.cache_dir / f"{key}.parquet"
+    
+    @staticmethod
+    def _file_checksum(file_path: Path) -> str:
+        """Calculate SHA256 checksum of file."""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
@@ -0,0 +1,165 @@
+"""Declarative keyword rule tables for Bulgarian bucket and type classification."""
+
+import re
+import numpy as np
+import pandas as pd
+import structlog
+import yaml
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = structlog.get_logger(__name__)
+
+# Rule fields refer to mapping columns by their config_bulgarian.yaml keys
+FIELD_COLUMNS = {
+    'abcotd': 'ABCOTD',
+    'fs_sub_class': 'FS Sub class',
+    'classes': 'Classes',
+    'bucket': 'bucket',
+}
+
+_ASSET_KEYWORDS = [
+    'cash', 'inventory', 'receivables', 'property', 'intangibles',
+    'prepaid', 'deferred tax asset'
+]
+_LIABILITY_KEYWORDS = [
+    'payables', 'deferred revenue', 'lease liabilities', 'deferred tax liability'
+]
+
+
+def _rule(value: str, *conditions) -> Dict[str, Any]:
+    """Build a rule from (field, keywords) condition pairs."""
+    return {
+        'value': value,
+        'when': [{'field': field, 'any': list(keywords)} for field, keywords in conditions],
+    }
+
+
+# Rules are evaluated in order and the first rule whose conditions all hold wins.
+# A condition holds when the field contains any of its keywords (case-insensitive).
+DEFAULT_CLASSIFICATION_RULES: Dict[str, Dict[str, Any]] = {
+    'bucket': {
+        'default': 'Other',
+        'rules': [
+            # ABCOTD first (most specific)
+            _rule('Revenue', ('abcotd', ['revenue', 'other income'])),
+            _rule('OPEX', ('abcotd', [
+                'cost of sales', 'operating expenses', 'payroll', 'other expenses',
+                'income tax', 'interest', 'depreciation', 'amortization'
+            ])),
+            _rule('Current Assets', ('abcotd', _ASSET_KEYWORDS), ('fs_sub_class', ['current'])),
+            _rule('Non-current Assets', ('abcotd', _ASSET_KEYWORDS)),
+            _rule('Current Liabilities', ('abcotd', _LIABILITY_KEYWORDS), ('fs_sub_class', ['current'])),
+            _rule('Non-current Liabilities', ('abcotd', _LIABILITY_KEYWORDS)),
+            _rule('Equity', ('abcotd', ['equity'])),
+            # Fallback to FS Sub class
+            _rule('P&L', ('fs_sub_class', ['profit', 'loss'])),
+            _rule('Current Assets', ('fs_sub_class', ['assets']), ('fs_sub_class', ['current'])),
+            _rule('Non-current Assets', ('fs_sub_class', ['assets'])),
+            _rule('Current Liabilities', ('fs_sub_class', ['liabilities']), ('fs_sub_class', ['current'])),
+            _rule('Non-current Liabilities', ('fs_sub_class', ['liabilities'])),
+            _rule('Equity', ('fs_sub_class', ['equity'])),
+            # Final fallback to Classes
+            _rule('P&L', ('classes', ['profit', 'loss'])),
+            _rule('Assets', ('classes', ['assets'])),
+            _rule('Liabilities', ('classes', ['liabilities'])),
+            _rule('Equity', ('classes', ['equity'])),
+        ],
+    },
+    'type': {
+        'default': 'Other',
+        'rules': [
+            _rule('Revenue', ('bucket', ['revenue'])),
+            _rule('Payroll', ('bucket', ['opex']), ('abcotd', ['payroll'])),
+            _rule('Depreciation', ('bucket', ['opex']), ('abcotd', ['depreciation', 'amortization'])),
+            _rule('Operating Expense', ('bucket', ['opex'])),
+            _rule('AR', ('abcotd', ['receivables'])),
+            _rule('AP', ('abcotd', ['payables'])),
+            _rule('Cash', ('abcotd', ['cash'])),
+            _rule('Inventory', ('abcotd', ['inventory'])),
+        ],
+    },
+}
+
+
+def load_classification_rules(config_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load the classification_rules section from a Bulgarian config file.
+
+    Args:
+        config_path: Path to config_bulgarian.yaml
+
+    Returns:
+        Rule tables, or None if the file has no classification_rules section
+    """
+    with open(config_path, 'r') as f:
+        config_dict = yaml.safe_load(f) or {}
+
+    return config_dict.get('classification_rules')
+
+
+class RuleClassifier:
+    """Rule table compiled into one regex per condition for vectorized evaluation."""
+
+    def __init__(self, table: Dict[str, Any]):
+        """
+        Compile a rule table.
+
+        Args:
+            table: Dict with 'rules' (ordered list) and optional 'default' value
+        """
+        self.default = table.get('default', 'Other')
+        self.values: List[str] = []
+        self.conditions: List[List[tuple]] = []
+
+        for rule in table.get('rules', []):
+            conditions = []
+            for condition in rule.get('when', []):
+                field = condition['field']
+                if field not in FIELD_COLUMNS:
+                    raise ValueError(f"Unknown classification rule field: {field}")
+                keywords = [str(k).lower() for k in condition.get('any', [])]
+                if not keywords:
+                    raise ValueError(f"Classification rule '{rule.get('value')}' has no keywords for {field}")
+                pattern = '|'.join(re.escape(k) for k in keywords)
+                conditions.append((field, pattern))
+
+            self.values.append(rule['value'])
+            self.conditions.append(conditions)
+
+    def classify(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Classify every row in one vectorized pass.
+
+        Args:
+            df: Mapping DataFrame containing the rule fields
+
+        Returns:
+            Series of classification values aligned to df
+        """
+        # Match against distinct field values only and broadcast back via codes
+        factorized: Dict[str, tuple] = {}
+        masks: Dict[tuple, np.ndarray] = {}
+        choices = []
+
+        for conditions in self.conditions:
+            combined = np.ones(len(df), dtype=bool)
+            for field, pattern in conditions:
+                key = (field, pattern)
+                if key not in masks:
+                    if field not in factorized:
+                        column = FIELD_COLUMNS[field]
+                        values = df[column] if column in df.columns else pd.Series('', index=df.index)
+                        codes, uniques = pd.factorize(values.astype(str))
+                        factorized[field] = (codes, pd.Series(uniques).str.lower())
+                    codes, uniques = factorized[field]
+                    matched = uniques.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+                    masks[key] = matched[codes]
+                combined &= masks[key]
+            choices.append(combined)
+
+        if not choices:
+            return pd.Series(self.default, index=df.index, dtype=object)
+
+        result = np.select(choices, self.values, default=self.default)
+        return pd.Series(result, index=df.index, dtype=object)
@@ -1,7 +1,12 @@
 """FAGL03 data loader for GL posting exports."""
 
+import hashlib
+import json
+import numpy as np
 import pandas as pd
 import structlog
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pandas.api.types import union_categoricals
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 from datetime import datetime
@@ -22,17 +27,34 @@ class FAGLLoader:
         'posting_text': 'posting_text',
         'customer_vendor': 'customer_vendor',
         'due_date': 'due_date',
+        'clearing_date': 'clearing_date',
         'open_amount': 'open_amount',
         'company_code': 'company_code',
     }
     
     REQUIRED_COLUMNS = ['posting_date', 'doc_id', 'gl_account', 'amount']
     
+    # Declared dtypes for streaming CSV loads (keyed by standard column name)
+    CATEGORICAL_COLUMNS = ['gl_account', 'currency', 'company_code']
+    TEXT_COLUMNS = ['doc_id', 'posting_text', 'customer_vendor']
+    NUMERIC_COLUMNS = ['amount', 'open_amount']
+    DATE_COLUMNS = ['posting_date', 'due_date', 'clearing_date']
+    
+    # Per-file statistics, kept under cache_dir, used to skip files that cannot match filters
+    STATS_SUBDIR = 'fagl_stats'
+    MAX_STATS_ENTITIES = 256
+    
     def __init__(
         self,
         fagl_dir: Optional[str] = None,
         fagl_file: Optional[str] = None,
-        column_mapping: Optional[Dict[str, str]] = None
+        column_mapping: Optional[Dict[str, str]] = None,
+        chunk_size: Optional[int] = None,
+        max_workers: int = 1,
+        start_date: Optional[Union[str, datetime]] = None,
+        end_date: Optional[Union[str, datetime]] = None,
+        entity: Optional[str] = None,
+        cache_dir: Optional[str] = None
     ):
         """
         Initialize FAGL loader.
@@ -41,6 +63,12 @@ class FAGLLoader:
             fagl_dir: Directory containing FAGL03 files
             fagl_file: Single FAGL03 file
             column_mapping: Custom column name mapping
+            chunk_size: Rows per batch for streaming CSV loads (None reads whole files)
+            max_workers: Worker processes for directory loads (1 loads files serially)
+            start_date: Only load postings on or after this date
+            end_date: Only load postings on or before this date
+            entity: Only load postings for this company code
+            cache_dir: Directory for per-file statistics (None disables file skipping)
         """
         if not fagl_dir and not fagl_file:
             raise ValueError("Either fagl_dir or fagl_file must be provided")
@@ -48,6 +76,12 @@ class FAGLLoader:
         self.fagl_dir = Path(fagl_dir) if fagl_dir else None
         self.fagl_file = Path(fagl_file) if fagl_file else None
         self.column_mapping = column_mapping or self.DEFAULT_COLUMNS
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.start_date = pd.to_datetime(start_date) if start_date else None
+        self.end_date = pd.to_datetime(end_date) if end_date else None
+        self.entity = entity
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         self.fagl_df: Optional[pd.DataFrame] = None
         
         self._validate_paths()
@@ -71,13 +105,13 @@ class FAGLLoader:
         
         if self.fagl_file:
             self.fagl_df = self._load_single_file(self.fagl_file)
+            self._standardize()
+        elif self.max_workers > 1:
+            # Files are standardized inside the worker processes
+            self.fagl_df = self._load_directory_parallel(self.fagl_dir)
         else:
             self.fagl_df = self._load_directory(self.fagl_dir)
-        
-        self._map_columns()
-        self._validate_structure()
-        self._parse_dates()
-        self._clean_data()
+            self._standardize()
         
         logger.info(
             "FAGL03 data loaded successfully",
@@ -89,24 +123,298 @@ class FAGLLoader:
         
         return self.fagl_df
     
+    def _standardize(self):
+        """Map columns, validate structure, parse dates and clean loaded data."""
+        self._map_columns()
+        self._validate_structure()
+        self._parse_dates()
+        self._clean_data()
+    
     def _load_single_file(self, file_path: Path) -> pd.DataFrame:
-        """Load single FAGL03 file."""
+        """Load single FAGL03 file, keeping only rows that match the filters."""
         logger.debug("Loading single FAGL file", file=str(file_path))
         
+        stats = self._new_stats()
         if file_path.suffix == '.csv':
-            df = pd.read_csv(file_path)
+            if self.chunk_size:
+                df = self._stream_csv(file_path, stats)
+            else:
+                df = self._filter_rows(pd.read_csv(file_path), stats, source_names=True)
         elif file_path.suffix in ['.xlsx', '.xls']:
-            df = pd.read_excel(file_path)
+            df = self._filter_rows(pd.read_excel(file_path), stats, source_names=True)
         else:
             raise ValueError(f"Unsupported file format: {file_path.suffix}")
         
+        self._write_stats(file_path, stats)
+        
         return df
     
-    def _load_directory(self, dir_path: Path) -> pd.DataFrame:
-        """Load all FAGL03 files from directory."""
-        logger.debug("Loading FAGL files from directory", dir=str(dir_path))
+    @property
+    def has_filters(self) -> bool:
+        """Whether any date or entity filter is pushed down into the reader."""
+        return bool(self.start_date is not None or self.end_date is not None or self.entity)
+    
+    def _filter_rows(
+        self,
+        df: pd.DataFrame,
+        stats: Dict,
+        source_names: bool = False
+    ) -> pd.DataFrame:
+        """
+        Record file statistics for a frame, then drop rows outside the filters.
+        
+        Args:
+            df: Raw file or streamed chunk
+            stats: Running statistics for the file being read
+            source_names: Whether df still uses the export's column names
         
-        # Find all CSV and Excel files
+        Returns:
+            Rows matching start_date, end_date and entity
+        """
+        date_col = self.column_mapping.get('posting_date', 'posting_date') if source_names else 'posting_date'
+        entity_col = self.column_mapping.get('company_code', 'company_code') if source_names else 'company_code'
+        
+        dates = None
+        if date_col in df.columns:
+            dates = df[date_col]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                # Keep the parsed column so _parse_dates does not parse it again
+                dates = df[date_col] = pd.to_datetime(dates, errors='coerce')
+            self._update_stats(stats, dates=dates)
+        else:
+            stats['complete'] = False
+        
+        entities = None
+        if entity_col in df.columns:
+            entities = df[entity_col].astype(str).str.strip()
+            self._update_stats(stats, entities=entities)
+        else:
+            stats['entities'] = None
+        
+        if not self.has_filters:
+            return df
+        
+        mask = pd.Series(True, index=df.index)
+        if dates is not None:
+            if self.start_date is not None:
+                mask &= dates >= self.start_date
+            if self.end_date is not None:
+                mask &= dates <= self.end_date
+        if self.entity and entities is not None:
+            mask &= entities == self.entity
+        
+        return df if mask.all() else df.take(np.flatnonzero(mask.to_numpy()))
+    
+    def _new_stats(self) -> Dict:
+        """Create empty running statistics for one file."""
+        return {'posting_date_min': None, 'posting_date_max': None, 'entities': set(), 'complete': True}
+    
+    def _update_stats(
+        self,
+        stats: Dict,
+        dates: Optional[pd.Series] = None,
+        entities: Optional[pd.Series] = None
+    ):
+        """Fold a frame's posting date range and company codes into the file statistics."""
+        if dates is not None and dates.notna().any():
+            low, high = dates.min(), dates.max()
+            if stats['posting_date_min'] is None or low < stats['posting_date_min']:
+                stats['posting_date_min'] = low
+            if stats['posting_date_max'] is None or high > stats['posting_date_max']:
+                stats['posting_date_max'] = high
+        
+        if entities is not None and stats['entities'] is not None:
+            stats['entities'].update(entities.unique())
+            if len(stats['entities']) > self.MAX_STATS_ENTITIES:
+                stats['entities'] = None
+    
+    def _stats_columns(self) -> List[str]:
+        """Source columns the statistics were collected from."""
+        return [
+            self.column_mapping.get('posting_date', 'posting_date'),
+            self.column_mapping.get('company_code', 'company_code'),
+        ]
+    
+    def _stats_path(self, file_path: Path) -> Optional[Path]:
+        """Get the statistics path for a file version, keyed by path, size and mtime."""
+        if self.cache_dir is None:
+            return None
+        
+        file_stat = file_path.stat()
+        digest = hashlib.sha256(
+            f"{file_path.resolve()}|{file_stat.st_size}|{file_stat.st_mtime_ns}".encode()
+        ).hexdigest()
+        return self.cache_dir / self.STATS_SUBDIR / f"{digest}.json"
+    
+    def _write_stats(self, file_path: Path, stats: Dict):
+        """
+        Store file statistics under the cache directory.
+        
+        Nothing is written without a cache directory, and failures are
+        logged and otherwise ignored so an unwritable cache never breaks
+        a load.
+        """
+        stats_path = self._stats_path(file_path)
+        if stats_path is None or not stats['complete']:
+            return
+        
+        file_stat = file_path.stat()
+        record = {
+            'size': file_stat.st_size,
+            'mtime_ns': file_stat.st_mtime_ns,
+            'columns': self._stats_columns(),
+            'posting_date_min': stats['posting_date_min'].isoformat() if stats['posting_date_min'] is not None else None,
+            'posting_date_max': stats['posting_date_max'].isoformat() if stats['posting_date_max'] is not None else None,
+            'entities': sorted(stats['entities']) if stats['entities'] is not None else None,
+        }
+        
+        try:
+            stats_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(stats_path, 'w') as f:
+                json.dump(record, f)
+        except OSError as e:
+            logger.warning(f"Could not write statistics for {file_path.name}: {e}")
+    
+    def _read_stats(self, file_path: Path) -> Optional[Dict]:
+        """Read a file's cached statistics, or None if missing or stale."""
+        stats_path = self._stats_path(file_path)
+        if stats_path is None or not stats_path.exists():
+            return None
+        
+        try:
+            with open(stats_path, 'r') as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        file_stat = file_path.stat()
+        if (stats.get('size') != file_stat.st_size
+                or stats.get('mtime_ns') != file_stat.st_mtime_ns
+                or stats.get('columns') != self._stats_columns()):
+            return None
+        
+        return stats
+    
+    def _can_skip(self, file_path: Path) -> bool:
+        """Check from the cached statistics whether a file has no matching rows."""
+        if not self.has_filters:
+            return False
+        
+        stats = self._read_stats(file_path)
+        if stats is None:
+            return False
+        
+        if stats['posting_date_min'] is None:
+            # No valid posting dates at all, so nothing survives cleaning
+            return True
+        if self.start_date is not None and pd.Timestamp(stats['posting_date_max']) < self.start_date:
+            return True
+        if self.end_date is not None and pd.Timestamp(stats['posting_date_min']) > self.end_date:
+            return True
+        if self.entity and stats['entities'] is not None and self.entity not in stats['entities']:
+            return True
+        
+        return False
+    
+    def _stream_csv(self, file_path: Path, stats: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Stream a CSV export in chunks with declared dtypes.
+        
+        Only the columns named in column_mapping are read. Each chunk is
+        renamed to standard names, filtered and cleaned before the next one
+        is parsed, so parsing overhead is bounded by chunk_size and unmapped
+        columns are never held. The kept rows are still collected and joined
+        at the end: the result grows with the matching rows, in compact
+        dtypes, and is smaller than a full read rather than independent of
+        file size.
+        """
+        if stats is None:
+            stats = self._new_stats()
+        
+        header = pd.read_csv(file_path, nrows=0).columns
+        source_to_standard = {
+            source: standard
+            for standard, source in self.column_mapping.items()
+            if source in header
+        }
+        
+        dtypes = {}
+        date_columns = []
+        for source, standard in source_to_standard.items():
+            if standard in self.NUMERIC_COLUMNS:
+                dtypes[source] = 'float64'
+            elif standard in self.DATE_COLUMNS:
+                date_columns.append(source)
+            else:
+                dtypes[source] = str
+        
+        logger.debug(
+            "Streaming FAGL file",
+            file=str(file_path),
+            chunk_size=self.chunk_size,
+            columns=list(source_to_standard)
+        )
+        
+        chunks = []
+        reader = pd.read_csv(
+            file_path,
+            usecols=list(source_to_standard),
+            dtype=dtypes,
+            parse_dates=date_columns,
+            chunksize=self.chunk_size
+        )
+        for chunk in reader:
+            chunk = self._filter_rows(chunk.rename(columns=source_to_standard), stats)
+            if len(chunk) or not chunks:
+                chunks.append(self._prepare_chunk(chunk))
+        
+        if not chunks:
+            return pd.DataFrame(columns=list(source_to_standard.values()))
+        
+        return self._concat_chunks(chunks)
+    
+    def _prepare_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Clean a streamed chunk and compact its low-cardinality columns."""
+        for col in self.DATE_COLUMNS:
+            if col in chunk.columns and not pd.api.types.is_datetime64_any_dtype(chunk[col]):
+                chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+        
+        for col in self.CATEGORICAL_COLUMNS:
+            if col in chunk.columns:
+                values = chunk[col].str.strip()
+                if col == 'currency':
+                    values = values.str.upper()
+                chunk[col] = values.astype('category')
+        
+        for col in ['doc_id', 'customer_vendor']:
+            if col in chunk.columns:
+                chunk[col] = chunk[col].str.strip()
+        
+        return chunk
+    
+    def _concat_chunks(self, chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Concatenate frames, unifying categories so columns stay categorical.
+        
+        Frames left empty by the filters are dropped (one is kept so the
+        columns survive); pandas would otherwise let their all-NA columns
+        decide the result dtypes.
+        """
+        chunks = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+        
+        for col in self.CATEGORICAL_COLUMNS:
+            series = [chunk[col] for chunk in chunks if col in chunk.columns]
+            if len(series) == len(chunks) and all(
+                isinstance(s.dtype, pd.CategoricalDtype) for s in series
+            ):
+                categories = union_categoricals(series).categories
+                for chunk in chunks:
+                    chunk[col] = chunk[col].cat.set_categories(categories)
+        
+        return pd.concat(chunks, ignore_index=True, copy=False)
+    
+    def _find_files(self, dir_path: Path) -> List[Path]:
+        """Find all CSV and Excel files in directory."""
         csv_files = list(dir_path.glob("*.csv"))
         excel_files = list(dir_path.glob("*.xlsx")) + list(dir_path.glob("*.xls"))
         all_files = csv_files + excel_files
@@ -116,6 +424,22 @@ class FAGLLoader:
         
         logger.info(f"Found {len(all_files)} FAGL03 files")
         
+        matching = [file_path for file_path in all_files if not self._can_skip(file_path)]
+        if len(matching) < len(all_files):
+            logger.info(
+                "Skipped FAGL03 files outside the requested filters",
+                skipped=len(all_files) - len(matching)
+            )
+        
+        # Keep one file so an empty result still has the export's columns
+        return matching or all_files[:1]
+    
+    def _load_directory(self, dir_path: Path) -> pd.DataFrame:
+        """Load all FAGL03 files from directory."""
+        logger.debug("Loading FAGL files from directory", dir=str(dir_path))
+        
+        all_files = self._find_files(dir_path)
+        
         # Load and concatenate all files
         dfs = []
         for file_path in all_files:
@@ -131,7 +455,54 @@ class FAGLLoader:
         if not dfs:
             raise ValueError("No files could be loaded successfully")
         
-        return pd.concat(dfs, ignore_index=True)
+        return self._concat_chunks(dfs)
+    
+    def _load_directory_parallel(self, dir_path: Path) -> pd.DataFrame:
+        """
+        Load and standardize all FAGL03 files in a process pool.
+        
+        Each worker parses, maps, date-parses and cleans one file. A file
+        that fails is logged and skipped without holding up the others;
+        the surviving frames are combined with a single concat.
+        """
+        all_files = self._find_files(dir_path)
+        workers = min(self.max_workers, len(all_files))
+        
+        logger.debug(
+            "Loading FAGL files in parallel",
+            dir=str(dir_path),
+            workers=workers
+        )
+        
+        results: Dict[int, pd.DataFrame] = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    _load_standardized_file,
+                    file_path,
+                    self.column_mapping,
+                    self.chunk_size,
+                    self.start_date,
+                    self.end_date,
+                    self.entity,
+                    self.cache_dir
+                ): (i, file_path)
+                for i, file_path in enumerate(all_files)
+            }
+            for future in as_completed(futures):
+                i, file_path = futures[future]
+                try:
+                    results[i] = future.result()
+                    logger.debug(f"Loaded {len(results[i])} rows from {file_path.name}")
+                except Exception as e:
+                    logger.error(f"Error loading {file_path.name}: {e}")
+        
+        if not results:
+            raise ValueError("No files could be loaded successfully")
+        
+        # Keep file order stable, then restore global posting_date order
+        df = self._concat_chunks([results[i] for i in sorted(results)])
+        return df.sort_values('posting_date', kind='stable').reset_index(drop=True)
     
     def _map_columns(self):
         """Map custom column names to standard names."""
@@ -163,9 +534,7 @@ class FAGLLoader:
     
     def _parse_dates(self):
         """Parse date columns."""
-        date_columns = ['posting_date', 'due_date']
-        
-        for col in date_columns:
+        for col in self.DATE_COLUMNS:
             if col in self.fagl_df.columns:
                 try:
                     self.fagl_df[col] = pd.to_datetime(self.fagl_df[col], errors='coerce')
@@ -184,7 +553,7 @@ class FAGLLoader:
     def _clean_data(self):
         """Clean and normalize FAGL03 data."""
         # Convert gl_account to string and strip whitespace
-        self.fagl_df['gl_account'] = self.fagl_df['gl_account'].astype(str).str.strip()
+        self.fagl_df['gl_account'] = self._clean_text(self.fagl_df['gl_account'])
         
         # Convert doc_id to string
         self.fagl_df['doc_id'] = self.fagl_df['doc_id'].astype(str)
@@ -207,7 +576,7 @@ class FAGLLoader:
         
         # Handle currency
         if 'currency' in self.fagl_df.columns:
-            self.fagl_df['currency'] = self.fagl_df['currency'].astype(str).str.strip().str.upper()
+            self.fagl_df['currency'] = self._clean_text(self.fagl_df['currency'], upper=True)
         else:
             self.fagl_df['currency'] = 'EUR'  # Default currency
             logger.info("currency column not found, defaulting to EUR")
@@ -218,7 +587,7 @@ class FAGLLoader:
         
         # Handle company_code
         if 'company_code' in self.fagl_df.columns:
-            self.fagl_df['company_code'] = self.fagl_df['company_code'].astype(str).str.strip()
+            self.fagl_df['company_code'] = self._clean_text(self.fagl_df['company_code'])
         
         # Remove rows with missing required data
         before_count = len(self.fagl_df)
@@ -234,6 +603,20 @@ class FAGLLoader:
         # Sort by posting_date
         self.fagl_df = self.fagl_df.sort_values('posting_date').reset_index(drop=True)
     
+    @staticmethod
+    def _clean_text(series: pd.Series, upper: bool = False) -> pd.Series:
+        """Strip (and optionally upper-case) a text column, keeping categoricals compact."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Clean the categories only; the per-row codes are left untouched
+            categories = series.cat.categories.astype(str).str.strip()
+            if upper:
+                categories = categories.str.upper()
+            if categories.is_unique:
+                return series.cat.rename_categories(categories)
+        
+        cleaned = series.astype(str).str.strip()
+        return cleaned.str.upper() if upper else cleaned
+    
     def filter_by_date_range(
         self,
         start_date: Optional[Union[str, datetime]] = None,
@@ -252,17 +635,19 @@ class FAGLLoader:
         if self.fagl_df is None:
             raise ValueError("FAGL data not loaded. Call load() first.")
         
-        df = self.fagl_df.copy()
+        # Build one mask so only the surviving rows are copied
+        mask = pd.Series(True, index=self.fagl_df.index)
         
         if start_date:
             start_date = pd.to_datetime(start_date)
-            df = df[df['posting_date'] >= start_date]
-            logger.info(f"Filtered to dates >= {start_date}", rows=len(df))
+            mask &= self.fagl_df['posting_date'] >= start_date
         
         if end_date:
             end_date = pd.to_datetime(end_date)
-            df = df[df['posting_date'] <= end_date]
-            logger.info(f"Filtered to dates <= {end_date}", rows=len(df))
+            mask &= self.fagl_df['posting_date'] <= end_date
+        
+        df = self.fagl_df.take(np.flatnonzero(mask.to_numpy()))
+        logger.info(f"Filtered to dates {start_date} - {end_date}", rows=len(df))
         
         return df
     
@@ -281,9 +666,9 @@ class FAGLLoader:
         
         if 'company_code' not in self.fagl_df.columns:
             logger.warning("company_code column not found, cannot filter by entity")
-            return self.fagl_df.copy()
+            return self.fagl_df
         
-        df = self.fagl_df[self.fagl_df['company_code'] == entity].copy()
+        df = self.fagl_df.take(np.flatnonzero((self.fagl_df['company_code'] == entity).to_numpy()))
         logger.info(f"Filtered to entity {entity}", rows=len(df))
         
         return df
@@ -324,13 +709,41 @@ class FAGLLoader:
         return summary
 
 
+def _load_standardized_file(
+    file_path: Path,
+    column_mapping: Dict[str, str],
+    chunk_size: Optional[int],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    entity: Optional[str] = None,
+    cache_dir: Optional[Path] = None
+) -> pd.DataFrame:
+    """Load and standardize a single FAGL03 file (process-pool worker)."""
+    loader = FAGLLoader(
+        fagl_file=str(file_path),
+        column_mapping=column_mapping,
+        chunk_size=chunk_size,
+        start_date=start_date,
+        end_date=end_date,
+        entity=entity,
+        cache_dir=cache_dir
+    )
+    loader.fagl_df = loader._load_single_file(file_path)
+    loader.fagl_df['source_file'] = file_path.name
+    loader._standardize()
+    return loader.fagl_df
+
+
 def load_fagl_data(
     fagl_dir: Optional[str] = None,
     fagl_file: Optional[str] = None,
     column_mapping: Optional[Dict[str, str]] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    entity: Optional[str] = None
+    entity: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    max_workers: int = 1,
+    cache_dir: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Convenience function to load and filter FAGL03 data.
@@ -339,21 +752,28 @@ def load_fagl_data(
         fagl_dir: Directory containing FAGL03 files
         fagl_file: Single FAGL03 file
         column_mapping: Custom column name mapping
-        start_date: Start date filter
-        end_date: End date filter
-        entity: Entity filter
+        start_date: Start date filter (pushed down into the reader)
+        end_date: End date filter (pushed down into the reader)
+        entity: Entity filter (pushed down into the reader)
+        chunk_size: Rows per batch for streaming CSV loads (None reads whole files)
+        max_workers: Worker processes for directory loads (1 loads files serially)
+        cache_dir: Directory for per-file statistics (None disables file skipping)
     
     Returns:
         DataFrame with FAGL03 data
     """
-    loader = FAGLLoader(fagl_dir=fagl_dir, fagl_file=fagl_file, column_mapping=column_mapping)
-    df = loader.load()
-    
-    if start_date or end_date:
-        df = loader.filter_by_date_range(start_date, end_date)
-    
-    if entity:
-        df = loader.filter_by_entity(entity)
+    loader = FAGLLoader(
+        fagl_dir=fagl_dir,
+        fagl_file=fagl_file,
+        column_mapping=column_mapping,
+        chunk_size=chunk_size,
+        max_workers=max_workers,
+        start_date=start_date,
+        end_date=end_date,
+        entity=entity,
+        cache_dir=cache_dir
+    )
     
-    return df
+    # Rows outside the filters are dropped while reading
+    return loader.load()
 
@@ -5,6 +5,8 @@ import structlog
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from .cache import ParquetCache
+
 logger = structlog.get_logger()
 
 
@@ -15,14 +17,16 @@ class MappingLoader:
     OPTIONAL_COLUMNS = ['entity', 'notes']
     VALID_TYPES = ['Revenue', 'OPEX', 'Payroll', 'Interest', 'Receivable', 'Payable', 'Other']
     
-    def __init__(self, mapping_file: str):
+    def __init__(self, mapping_file: str, cache_dir: Optional[str] = None):
         """
         Initialize mapping loader.
         
         Args:
             mapping_file: Path to mapping Excel file
+            cache_dir: Directory for the Parquet cache of the cleaned mapping (None disables it)
         """
         self.mapping_file = Path(mapping_file)
+        self.cache_dir = cache_dir
         self.mapping_df: Optional[pd.DataFrame] = None
         self._validate_file_exists()
     
@@ -43,6 +47,17 @@ class MappingLoader:
         """
         logger.info("Loading mapping file", file=str(self.mapping_file))
         
+        cache = ParquetCache(self.cache_dir) if self.cache_dir else None
+        if cache:
+            cache_key = cache.make_key(
+                self.mapping_file,
+                {'loader': 'MappingLoader', 'valid_types': self.VALID_TYPES}
+            )
+            cached = cache.load(cache_key)
+            if cached is not None:
+                self.mapping_df = cached
+                return self.mapping_df
+        
         # Handle CSV files
         if self.mapping_file.suffix == '.csv':
             self.mapping_df = pd.read_csv(self.mapping_file)
@@ -60,6 +75,9 @@ class MappingLoader:
         self._clean_data()
         self._validate_types()
         
+        if cache:
+            cache.save(cache_key, self.mapping_df)
+        
         logger.info(
             "Mapping loaded successfully",
             rows=len(self.mapping_df),
@@ -143,16 +161,11 @@ class MappingLoader:
         if self.mapping_df is None:
             raise ValueError("Mapping not loaded. Call load() first.")
         
-        mapping_dict = {}
-        for _, row in self.mapping_df.iterrows():
-            mapping_dict[row['gl_account']] = {
-                'bucket': row['bucket'],
-                'type': row['type'],
-                'entity': row.get('entity'),
-                'notes': row.get('notes')
-            }
+        lookup = self.mapping_df.drop_duplicates('gl_account', keep='last').set_index('gl_account')
+        lookup = lookup.reindex(columns=['bucket', 'type', 'entity', 'notes'])
         
-        return mapping_dict
+        # Missing optional columns come back as NaN from reindex; report them as None
+        return lookup.astype(object).where(lookup.notna(), None).to_dict('index')
     
     def get_buckets_by_type(self, type_filter: str) -> List[str]:
         """
@@ -184,7 +197,7 @@ class MappingLoader:
             'total_accounts': len(self.mapping_df),
             'unique_buckets': self.mapping_df['bucket'].nunique(),
             'accounts_by_type': self.mapping_df['type'].value_counts().to_dict(),
-            'buckets_by_type': self.mapping_df.groupby('type')['bucket'].nunique().to_dict(),
+            'buckets_by_type': self.mapping_df.groupby('type', observed=True)['bucket'].nunique().to_dict(),
         }
         
         if 'entity' in self.mapping_df.columns and self.mapping_df['entity'].notna().any():
@@ -193,16 +206,17 @@ class MappingLoader:
         return summary
 
 
-def load_mapping(mapping_file: str) -> pd.DataFrame:
+def load_mapping(mapping_file: str, cache_dir: Optional[str] = None) -> pd.DataFrame:
     """
     Convenience function to load mapping file.
     
     Args:
         mapping_file: Path to mapping Excel file
+        cache_dir: Directory for the Parquet cache (None disables it)
     
     Returns:
         DataFrame with mapping data
     """
-    loader = MappingLoader(mapping_file)
+    loader = MappingLoader(mapping_file, cache_dir=cache_dir)
     return loader.load()
 
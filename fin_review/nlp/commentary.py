@@ -7,6 +7,8 @@ from typing import Dict, Optional, List, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from fin_review.analytics.parties import party_profiles
+
 logger = structlog.get_logger()
 
 
@@ -173,7 +175,7 @@ class CommentaryGenerator:
                 # Find what drove the growth
                 revenue_data = self.df[self.df['type'] == 'Revenue']
                 if len(revenue_data) > 0:
-                    top_bucket = revenue_data.groupby('bucket')['amount'].sum().abs().nlargest(1)
+                    top_bucket = revenue_data.groupby('bucket', observed=True)['amount'].sum().abs().nlargest(1)
                     if len(top_bucket) > 0:
                         driver = top_bucket.index[0]
                         driver_amount = top_bucket.iloc[0]
@@ -359,29 +361,29 @@ class CommentaryGenerator:
     def _generate_concentration_risks(self):
         """Generate risks from supplier/customer concentration."""
         # Top vendors concentration
-        opex_data = self.df[self.df['type'] == 'OPEX']
-        if len(opex_data) > 0 and 'customer_vendor' in opex_data.columns:
-            vendor_concentration = opex_data.groupby('customer_vendor')['amount'].sum().abs()
-            total_opex = opex_data['amount'].sum()
+        vendors = party_profiles(self.kpis, self.df, self.config).get('OPEX')
+        if vendors and vendors['party_count'] > 0:
+            top_5_pct = vendors['top_5_pct']
             
-            if len(vendor_concentration) > 0:
-                top_5_pct = (vendor_concentration.nlargest(5).sum() / abs(total_opex)) * 100
+            if top_5_pct > 60:  # Top 5 vendors > 60% of OPEX
+                content = (
+                    f"Top 5 suppliers represent {top_5_pct:.0f}% of operating expenses, "
+                    f"indicating high supplier concentration risk. Consider diversifying "
+                    f"the supplier base to reduce dependency."
+                )
                 
-                if top_5_pct > 60:  # Top 5 vendors > 60% of OPEX
-                    content = (
-                        f"Top 5 suppliers represent {top_5_pct:.0f}% of operating expenses, "
-                        f"indicating high supplier concentration risk. Consider diversifying "
-                        f"the supplier base to reduce dependency."
-                    )
-                    
-                    self.risks.append(Commentary(
-                        category='risk',
-                        title="High Supplier Concentration",
-                        content=content,
-                        confidence='medium',
-                        supporting_metrics={'top_5_concentration_pct': top_5_pct},
-                        priority=6
-                    ))
+                self.risks.append(Commentary(
+                    category='risk',
+                    title="High Supplier Concentration",
+                    content=content,
+                    confidence='medium',
+                    supporting_metrics={
+                        'top_5_concentration_pct': top_5_pct,
+                        'hhi': vendors['hhi'],
+                        'pareto_party_count': vendors['pareto_party_count']
+                    },
+                    priority=6
+                ))
     
     def _generate_recommendations(self):
         """Generate actionable recommendations."""
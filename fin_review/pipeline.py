@@ -0,0 +1,361 @@
+"""Analytics stages of the pipeline, for one ledger or many entities in parallel."""
+
+import os
+import pandas as pd
+import numpy as np
+import structlog
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, replace
+
+from fin_review.analytics import (
+    LedgerCube, calculate_kpis, analyze_trends, calculate_aging, detect_anomalies, generate_forecasts
+)
+from fin_review.analytics.kpis import KPICalculator, KPIResult
+from fin_review.analytics.trends import TrendResult
+from fin_review.analytics.aging import AgingResult
+from fin_review.analytics.anomalies import AnomalyResult
+from fin_review.analytics.forecasting import ForecastResult
+from fin_review.analytics.transaction_anomalies import score_transactions
+from fin_review.nlp import generate_commentary
+from fin_review.nlp.commentary import CommentaryResult
+
+logger = structlog.get_logger()
+
+GROUP = 'Group'
+
+
+@dataclass
+class AnalyticsResult:
+    """Results of the analytics stages for one ledger."""
+    kpi_result: KPIResult
+    trend_result: TrendResult
+    aging_result: AgingResult
+    anomaly_result: AnomalyResult
+    forecast_result: Optional[ForecastResult]
+    commentary_result: CommentaryResult
+    cube: LedgerCube
+    
+    def headline(self) -> Dict[str, Any]:
+        """Key metrics for side-by-side comparison."""
+        summary = self.kpi_result.summary_kpis
+        return {
+            'transactions': self.cube.row_count,
+            'total_revenue': summary.get('total_revenue', 0),
+            'total_opex': summary.get('total_opex', 0),
+            'total_payroll': summary.get('total_payroll', 0),
+            'net_profit': summary.get('net_profit', 0),
+            'net_margin_pct': summary.get('net_margin_pct', 0),
+            'ar_overdue_pct': self.aging_result.ar_summary.get('overdue_pct', 0),
+            'ap_overdue_pct': self.aging_result.ap_summary.get('overdue_pct', 0),
+            'anomalies': len(self.anomaly_result.anomalies),
+            'high_severity_anomalies': self.anomaly_result.summary.get('high_severity_count', 0),
+        }
+
+
+@dataclass
+class GroupResult:
+    """Per-entity results and their consolidation."""
+    entities: Dict[str, AnalyticsResult]
+    group: AnalyticsResult
+    comparison: pd.DataFrame
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'entities': list(self.entities),
+            'comparison': self.comparison.reset_index().to_dict('records'),
+            'group_kpis': self.group.kpi_result.summary_kpis,
+        }
+
+
+def run_analytics(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    cube: Optional[LedgerCube] = None
+) -> AnalyticsResult:
+    """
+    Run the KPI, trend, aging, anomaly, forecast and commentary stages.
+    
+    Args:
+        df: Normalized FAGL DataFrame
+        config: Configuration dictionary
+        cube: Shared ledger aggregate (built from df if not given)
+    
+    Returns:
+        AnalyticsResult object
+    """
+    config = config or {}
+    
+    # Aggregate the ledger once; KPI, trend, anomaly and forecast steps share it
+    if cube is None:
+        cube = LedgerCube(df)
+    
+    kpi_result = calculate_kpis(df, config, cube)
+    logger.info("KPIs calculated")
+    
+    trend_result = analyze_trends(df, config, cube)
+    logger.info("Trends analyzed")
+    
+    aging_result = calculate_aging(df, config)
+    logger.info(
+        "Aging calculated",
+        ar_overdue_pct=aging_result.ar_summary.get('overdue_pct', 0),
+        ap_overdue_pct=aging_result.ap_summary.get('overdue_pct', 0)
+    )
+    
+    anomaly_result = detect_anomalies(df, config, cube)
+    if config.get('enable_transaction_anomalies', False):
+        line_result = score_transactions(df, config)
+        anomaly_result = AnomalyResult.merge(anomaly_result, line_result)
+    logger.info(
+        "Anomalies detected",
+        total=len(anomaly_result.anomalies),
+        high_severity=anomaly_result.summary.get('high_severity_count', 0)
+    )
+    
+    forecast_result = None
+    if config.get('enable_forecasting', True):
+        forecast_result = generate_forecasts(df, config, cube)
+        logger.info(f"Forecasts generated using {forecast_result.method_used}")
+    
+    commentary_result = generate_commentary(
+        df,
+        kpi_result.to_dict(),
+        trend_result.to_dict(),
+        aging_result.to_dict(),
+        anomaly_result.to_dict(),
+        config
+    )
+    logger.info(
+        "Commentary generated",
+        insights=len(commentary_result.insights),
+        risks=len(commentary_result.risks),
+        recommendations=len(commentary_result.recommendations)
+    )
+    
+    return AnalyticsResult(
+        kpi_result=kpi_result,
+        trend_result=trend_result,
+        aging_result=aging_result,
+        anomaly_result=anomaly_result,
+        forecast_result=forecast_result,
+        commentary_result=commentary_result,
+        cube=cube
+    )
+
+
+def label_anomalies(result: AnomalyResult, label: str) -> AnomalyResult:
+    """
+    Prefix every anomaly's explanation with a label such as its company code.
+    
+    Args:
+        result: Anomaly results of one entity
+        label: Text to prefix (used alone where an anomaly has no explanation)
+    
+    Returns:
+        AnomalyResult with labelled copies of the anomalies
+    """
+    return AnomalyResult(
+        anomalies=[
+            replace(anomaly, explanation=f"{label}: {anomaly.explanation}" if anomaly.explanation else label)
+            for anomaly in result.anomalies
+        ],
+        summary=result.summary
+    )
+
+
+# Partitioned ledger of a worker process, set once by _init_worker
+_worker_state: Optional[Dict] = None
+
+
+def _init_worker(ledger: pd.DataFrame, bounds: Dict[str, tuple], config: Dict):
+    """Keep the partitioned ledger in the worker (inherited, not copied, under fork)."""
+    global _worker_state
+    _worker_state = {'ledger': ledger, 'bounds': bounds, 'config': config}
+
+
+def _run_entity(entity: str) -> AnalyticsResult:
+    """Run the analytics stages on one entity's slice of the worker's ledger."""
+    start, end = _worker_state['bounds'][entity]
+    config = {**_worker_state['config'], 'entity': entity}
+    return run_analytics(_worker_state['ledger'].iloc[start:end], config)
+
+
+class MultiEntityRunner:
+    """
+    Runs the analytics stages for many company codes and consolidates them.
+    
+    The ledger is sorted by company code once, so every entity is a
+    contiguous slice. Worker processes receive the sorted ledger once, at
+    start-up, and each task only names its entity; results come back as
+    analytics results. The group is consolidated from those results and
+    the merged entity cubes (see _consolidate).
+    """
+    
+    ENTITY_COLUMN = 'company_code'
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: Optional[Dict] = None,
+        entities: Optional[List[str]] = None
+    ):
+        """
+        Initialize multi-entity runner.
+        
+        Args:
+            df: Normalized FAGL DataFrame for all entities
+            config: Configuration dictionary
+            entities: Company codes to run (defaults to config 'entities', then all)
+        """
+        if self.ENTITY_COLUMN not in df.columns:
+            raise ValueError(f"Multi-entity mode needs a {self.ENTITY_COLUMN} column")
+        
+        self.df = df
+        self.config = config or {}
+        self.entities = entities or self.config.get('entities')
+        self.max_workers = (
+            self.config.get('max_workers', 1) if self.config.get('parallel_processing', False) else 1
+        )
+    
+    def partition(self):
+        """
+        Sort the ledger by company code and locate each entity's rows.
+        
+        Returns:
+            Tuple of (sorted ledger, {entity: (start, end)})
+        """
+        codes, names = pd.factorize(self.df[self.ENTITY_COLUMN].astype(str), sort=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        
+        present = {name: (int(bounds[i]), int(bounds[i + 1])) for i, name in enumerate(names)}
+        
+        if self.entities:
+            wanted = set(map(str, self.entities))
+            missing = sorted(wanted - set(present))
+            if missing:
+                logger.warning("Entities without postings skipped", entities=missing)
+            present = {name: span for name, span in present.items() if name in wanted}
+        
+        return self.df.take(order), present
+    
+    def run(self) -> GroupResult:
+        """
+        Run every entity and consolidate the group.
+        
+        Returns:
+            GroupResult with per-entity results, group results and a comparison table
+        """
+        ledger, bounds = self.partition()
+        if not bounds:
+            raise ValueError("No entities to run")
+        
+        names = list(bounds)
+        workers = min(self.max_workers, len(names), os.cpu_count() or 1)
+        
+        # Entities run in parallel already; keep stage-level pools serial
+        entity_config = {**self.config, 'parallel_processing': False}
+        
+        logger.info("Running entities", entities=len(names), workers=workers)
+        
+        if workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(ledger, bounds, entity_config)
+            ) as executor:
+                results = list(executor.map(_run_entity, names))
+        else:
+            _init_worker(ledger, bounds, entity_config)
+            results = [_run_entity(name) for name in names]
+        
+        entities = dict(zip(names, results))
+        group = self._consolidate(ledger, bounds, entities)
+        
+        comparison = pd.DataFrame(
+            [result.headline() for result in entities.values()] + [group.headline()],
+            index=pd.Index(names + [GROUP], name=self.ENTITY_COLUMN)
+        )
+        
+        logger.info("Entities consolidated", entities=len(names), transactions=group.cube.row_count)
+        
+        return GroupResult(entities=entities, group=group, comparison=comparison)
+    
+    def _consolidate(
+        self,
+        ledger: pd.DataFrame,
+        bounds: Dict[str, tuple],
+        entities: Dict[str, AnalyticsResult]
+    ) -> AnalyticsResult:
+        """
+        Group-level results from the entity results and the merged entity cubes.
+        
+        KPIs, trends and forecasts are computed from the merged cube; aging
+        tables are summed and anomaly lists merged across entities. Only
+        working capital (daily balances) and commentary read the group's
+        transactions.
+        """
+        # Rows of the selected entities only, still one contiguous slice each
+        spans = sorted(bounds.values())
+        if spans[-1][1] - spans[0][0] == sum(end - start for start, end in spans):
+            group_df = ledger.iloc[spans[0][0]:spans[-1][1]]
+        else:
+            group_df = ledger.iloc[np.concatenate([np.arange(start, end) for start, end in spans])]
+        
+        results = list(entities.values())
+        cube = LedgerCube.combine([result.cube for result in results])
+        
+        kpi_result = KPICalculator(group_df, self.config, cube).consolidate(
+            [result.kpi_result for result in results]
+        )
+        trend_result = analyze_trends(group_df, self.config, cube)
+        aging_result = AgingResult.combine([result.aging_result for result in results], self.config)
+        
+        anomaly_result = AnomalyResult.merge(*[
+            label_anomalies(result.anomaly_result, name) for name, result in entities.items()
+        ])
+        
+        forecast_result = None
+        if self.config.get('enable_forecasting', True):
+            forecast_result = generate_forecasts(group_df, self.config, cube)
+        
+        commentary_result = generate_commentary(
+            group_df,
+            kpi_result.to_dict(),
+            trend_result.to_dict(),
+            aging_result.to_dict(),
+            anomaly_result.to_dict(),
+            self.config
+        )
+        
+        return AnalyticsResult(
+            kpi_result=kpi_result,
+            trend_result=trend_result,
+            aging_result=aging_result,
+            anomaly_result=anomaly_result,
+            forecast_result=forecast_result,
+            commentary_result=commentary_result,
+            cube=cube
+        )
+
+
+def run_multi_entity(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    entities: Optional[List[str]] = None
+) -> GroupResult:
+    """
+    Convenience function to run and consolidate many entities.
+    
+    Args:
+        df: Normalized FAGL DataFrame for all entities
+        config: Configuration dictionary
+        entities: Company codes to run (defaults to all)
+    
+    Returns:
+        GroupResult object
+    """
+    runner = MultiEntityRunner(df, config, entities)
+    return runner.run()
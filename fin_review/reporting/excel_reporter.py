@@ -7,6 +7,8 @@ from typing import Dict, Optional
 import xlsxwriter
 from datetime import datetime
 
+from fin_review.analytics.parties import party_profiles
+
 logger = structlog.get_logger()
 
 
@@ -84,11 +86,14 @@ class ExcelReporter:
         if 'ap_aging' in requested_sheets:
             self._create_ap_aging_sheet(aging, header_format, currency_format, percent_format)
         
+        if 'top_vendors' in requested_sheets or 'top_customers' in requested_sheets:
+            parties = party_profiles(kpis, mapped_data, self.config)
+        
         if 'top_vendors' in requested_sheets:
-            self._create_top_vendors_sheet(mapped_data, header_format, currency_format)
+            self._create_top_parties_sheet(parties.get('OPEX'), 'Top Vendors', 'Vendor', currency_format)
         
         if 'top_customers' in requested_sheets:
-            self._create_top_customers_sheet(mapped_data, header_format, currency_format)
+            self._create_top_parties_sheet(parties.get('Revenue'), 'Top Customers', 'Customer', currency_format)
         
         if 'anomalies' in requested_sheets:
             self._create_anomalies_sheet(anomalies, header_format, currency_format, percent_format)
@@ -307,55 +312,38 @@ class ExcelReporter:
         worksheet.write(row + 1, 0, 'Overdue %:')
         worksheet.write(row + 1, 1, ap_summary.get('overdue_pct', 0) / 100, percent_format)
     
-    def _create_top_vendors_sheet(self, mapped_data: pd.DataFrame, header_format, currency_format):
-        """Create top vendors sheet."""
-        if 'customer_vendor' not in mapped_data.columns:
-            return
-        
-        opex_data = mapped_data[mapped_data['type'] == 'OPEX']
-        
-        if len(opex_data) == 0:
-            return
-        
-        top_vendors = opex_data.groupby('customer_vendor').agg({
-            'amount': 'sum',
-            'doc_id': 'count'
-        }).reset_index()
-        
-        top_vendors.columns = ['Vendor', 'Total Amount', 'Transaction Count']
-        top_vendors = top_vendors.sort_values('Total Amount', key=abs, ascending=False).head(20)
-        
-        top_vendors.to_excel(self.writer, sheet_name='Top Vendors', index=False)
-        
-        worksheet = self.writer.sheets['Top Vendors']
-        worksheet.set_column('A:A', 30)
-        worksheet.set_column('B:B', 20, currency_format)
-        worksheet.set_column('C:C', 18)
-    
-    def _create_top_customers_sheet(self, mapped_data: pd.DataFrame, header_format, currency_format):
-        """Create top customers sheet."""
-        if 'customer_vendor' not in mapped_data.columns:
-            return
-        
-        revenue_data = mapped_data[mapped_data['type'] == 'Revenue']
-        
-        if len(revenue_data) == 0:
+    def _create_top_parties_sheet(
+        self,
+        profile: Optional[Dict],
+        sheet_name: str,
+        party_label: str,
+        currency_format
+    ):
+        """Create a top vendors or customers sheet from a party concentration profile."""
+        if not profile or not profile.get('top_parties'):
             return
         
-        top_customers = revenue_data.groupby('customer_vendor').agg({
-            'amount': 'sum',
-            'doc_id': 'count'
-        }).reset_index()
-        
-        top_customers.columns = ['Customer', 'Total Amount', 'Transaction Count']
-        top_customers = top_customers.sort_values('Total Amount', key=abs, ascending=False).head(20)
+        top_parties = pd.DataFrame(profile['top_parties']).head(20)
+        top_parties = top_parties[['party', 'total_amount', 'transaction_count', 'pct_of_total', 'abc_class']]
+        top_parties.columns = [party_label, 'Total Amount', 'Transaction Count', '% of Total', 'ABC Class']
         
-        top_customers.to_excel(self.writer, sheet_name='Top Customers', index=False)
+        top_parties.to_excel(self.writer, sheet_name=sheet_name, index=False)
         
-        worksheet = self.writer.sheets['Top Customers']
+        worksheet = self.writer.sheets[sheet_name]
         worksheet.set_column('A:A', 30)
         worksheet.set_column('B:B', 20, currency_format)
-        worksheet.set_column('C:C', 18)
+        worksheet.set_column('C:E', 18)
+        
+        # Concentration summary next to the table
+        worksheet.write(0, 6, 'Parties')
+        worksheet.write(0, 7, profile['party_count'])
+        worksheet.write(1, 6, 'Top 5 share %')
+        worksheet.write(1, 7, round(profile['top_5_pct'], 1))
+        worksheet.write(2, 6, 'Parties in Pareto (A)')
+        worksheet.write(2, 7, profile['pareto_party_count'])
+        worksheet.write(3, 6, 'HHI')
+        worksheet.write(3, 7, round(profile['hhi'], 0))
+        worksheet.set_column('G:G', 22)
     
     def _create_anomalies_sheet(self, anomalies: Dict, header_format, currency_format, percent_format):
         """Create anomalies sheet."""
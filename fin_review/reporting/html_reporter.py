@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
 
+from fin_review.analytics.parties import party_profiles
+
 logger = structlog.get_logger()
 
 
@@ -44,7 +46,7 @@ class HTMLReporter:
         # Create charts
         monthly_chart = self._create_monthly_trends_chart(kpis)
         aging_chart = self._create_aging_chart(aging)
-        top_vendors_chart = self._create_top_vendors_chart(mapped_data)
+        top_vendors_chart = self._create_top_vendors_chart(kpis, mapped_data)
         
         # Build HTML
         html = f"""
@@ -318,16 +320,21 @@ class HTMLReporter:
         
         return fig.to_html(include_plotlyjs=False, div_id='ar_aging')
     
-    def _create_top_vendors_chart(self, mapped_data):
+    def _create_top_vendors_chart(self, kpis, mapped_data):
         """Create top vendors bar chart."""
-        if 'customer_vendor' not in mapped_data.columns:
+        parties = party_profiles(kpis, mapped_data, self.config)
+        if not parties:
             return "<p>No vendor data available</p>"
         
-        opex_data = mapped_data[mapped_data['type'] == 'OPEX']
-        if len(opex_data) == 0:
+        vendors = parties.get('OPEX')
+        if not vendors or not vendors['top_parties']:
             return "<p>No OPEX data available</p>"
         
-        top_vendors = opex_data.groupby('customer_vendor')['amount'].sum().abs().nlargest(10)
+        top = vendors['top_parties'][:10]
+        top_vendors = pd.Series(
+            [abs(p['total_amount']) for p in top],
+            index=[p['party'] for p in top]
+        )
         
         fig = go.Figure()
         
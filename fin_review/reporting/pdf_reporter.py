@@ -16,6 +16,8 @@ from datetime import datetime
 import pandas as pd
 import io
 
+from fin_review.analytics.parties import party_profiles
+
 logger = structlog.get_logger()
 
 
@@ -83,7 +85,7 @@ class PDFReporter:
         self._add_key_metrics(kpis)
         self._add_monthly_trends_chart(kpis)
         self._add_aging_analysis(aging)
-        self._add_top_vendors_chart(mapped_data)
+        self._add_top_vendors_chart(kpis, mapped_data)
         self._add_anomalies_table(anomalies)
         self._add_recommendations(commentary)
         
@@ -277,20 +279,24 @@ class PDFReporter:
         self.story.append(p)
         self.story.append(Spacer(1, 0.3*inch))
     
-    def _add_top_vendors_chart(self, mapped_data: pd.DataFrame):
+    def _add_top_vendors_chart(self, kpis: Dict, mapped_data: pd.DataFrame):
         """Add top vendors bar chart."""
-        if 'customer_vendor' not in mapped_data.columns:
+        vendors = party_profiles(kpis, mapped_data, self.config).get('OPEX')
+        if vendors is None:
             return
         
         heading = Paragraph("Top 10 Vendors by Spend", self.heading_style)
         self.story.append(heading)
         
         # Get top vendors
-        opex_data = mapped_data[mapped_data['type'] == 'OPEX']
-        if len(opex_data) == 0:
+        top = vendors['top_parties'][:10]
+        if len(top) == 0:
             return
         
-        top_vendors = opex_data.groupby('customer_vendor')['amount'].sum().abs().nlargest(10)
+        top_vendors = pd.Series(
+            [abs(p['total_amount']) for p in top],
+            index=[p['party'] for p in top]
+        )
         
         # Create chart
         fig, ax = plt.subplots(figsize=(7, 4))
@@ -1,5 +1,6 @@
 """Data normalization module for FAGL data."""
 
+import numpy as np
 import pandas as pd
 import structlog
 from typing import Dict, Optional
@@ -10,6 +11,40 @@ logger = structlog.get_logger()
 class DataNormalizer:
     """Normalizes and enriches FAGL data with mapping information."""
     
+    # Mapping columns attached to every row, and their ledger column names
+    MAPPING_ATTRIBUTES = {
+        'bucket': 'bucket',
+        'type': 'type',
+        'entity': 'entity_mapped',
+    }
+    
+    # Values for rows whose gl_account is not in the mapping
+    MAPPING_DEFAULTS = {
+        'bucket': 'Unmapped',
+        'type': 'Other',
+    }
+    
+    # Text columns stored as categoricals in compact mode
+    COMPACT_CATEGORICAL_COLUMNS = [
+        'gl_account', 'bucket', 'type', 'entity_mapped',
+        'currency', 'company_code', 'customer_vendor', 'doc_id'
+    ]
+    
+    # Above this distinct/rows ratio a column is stored as Arrow strings instead
+    COMPACT_MAX_CATEGORY_RATIO = 0.5
+    
+    # Calendar columns and the smallest integer type that holds them
+    COMPACT_INTEGER_COLUMNS = {
+        'year': 'int16',
+        'quarter': 'int8',
+        'month': 'int8',
+        'day_of_week': 'int8',
+        'week_of_year': 'int8',
+    }
+    
+    # Amount columns, only narrowed to float32 when compact_float32 is set
+    COMPACT_FLOAT_COLUMNS = ['amount', 'open_amount']
+    
     def __init__(
         self,
         fagl_df: pd.DataFrame,
@@ -28,6 +63,8 @@ class DataNormalizer:
         self.mapping_df = mapping_df
         self.config = config or {}
         self.normalized_df: Optional[pd.DataFrame] = None
+        self.memory_report: Optional[pd.DataFrame] = None
+        self.unmapped_accounts: Optional[pd.Index] = None
     
     def normalize(self) -> pd.DataFrame:
         """
@@ -44,6 +81,9 @@ class DataNormalizer:
         self._enrich_ar_ap_flags()
         self._calculate_overdue()
         
+        if self.config.get('compact_dtypes', False):
+            self._compact_dtypes()
+        
         self.normalized_df = self.fagl_df
         
         logger.info(
@@ -88,40 +128,59 @@ class DataNormalizer:
         logger.debug("Added temporal features")
     
     def _merge_mapping(self):
-        """Merge mapping information into FAGL data."""
-        # Create mapping lookup
-        mapping_dict = {}
-        for _, row in self.mapping_df.iterrows():
-            mapping_dict[row['gl_account']] = {
-                'bucket': row['bucket'],
-                'type': row['type'],
-                'entity_mapped': row.get('entity'),
-                'notes': row.get('notes')
-            }
-        
-        # Map to FAGL data
-        self.fagl_df['bucket'] = self.fagl_df['gl_account'].map(
-            lambda x: mapping_dict.get(x, {}).get('bucket', 'Unmapped')
-        )
-        self.fagl_df['type'] = self.fagl_df['gl_account'].map(
-            lambda x: mapping_dict.get(x, {}).get('type', 'Other')
-        )
-        self.fagl_df['entity_mapped'] = self.fagl_df['gl_account'].map(
-            lambda x: mapping_dict.get(x, {}).get('entity_mapped')
-        )
+        """
+        Attach mapping attributes to every row with one positional join.
+        
+        Each ledger account is resolved to its row in the de-duplicated
+        mapping once (per category when gl_account is categorical), then
+        every attribute is taken from those positions. Unmapped accounts
+        fall out of the same lookup.
+        """
+        lookup = self.mapping_df.drop_duplicates('gl_account', keep='last').set_index('gl_account')
+        
+        attributes = dict(self.MAPPING_ATTRIBUTES)
+        for col in self.config.get('mapping_extra_columns') or []:
+            if col in lookup.columns and col not in attributes:
+                attributes[col] = col if col not in self.fagl_df.columns else f'mapping_{col}'
+        
+        # Resolve each distinct account once, then broadcast through the codes
+        accounts = self.fagl_df['gl_account']
+        if isinstance(accounts.dtype, pd.CategoricalDtype):
+            codes = accounts.cat.codes.to_numpy()
+            distinct = accounts.cat.categories
+        else:
+            codes, distinct = pd.factorize(accounts)
         
-        # Mark unmapped rows
-        self.fagl_df['is_mapped'] = self.fagl_df['bucket'] != 'Unmapped'
+        distinct_positions = lookup.index.get_indexer(distinct)
+        positions = np.where(codes >= 0, distinct_positions[codes], -1)
+        mapped = positions >= 0
+        safe_positions = np.where(mapped, positions, 0)
         
-        unmapped_count = (~self.fagl_df['is_mapped']).sum()
+        for source_col, target_col in attributes.items():
+            if source_col in lookup.columns and len(lookup):
+                values = lookup[source_col].to_numpy(dtype=object)[safe_positions]
+                values[~mapped] = self.MAPPING_DEFAULTS.get(target_col)
+            else:
+                values = np.full(len(self.fagl_df), self.MAPPING_DEFAULTS.get(target_col), dtype=object)
+            self.fagl_df[target_col] = values
+        
+        self.fagl_df['is_mapped'] = mapped
+        
+        observed = np.bincount(codes[codes >= 0], minlength=len(distinct)) > 0
+        self.unmapped_accounts = pd.Index(
+            distinct[(distinct_positions < 0) & observed], name='gl_account'
+        )
+        unmapped_count = int((~mapped).sum())
         if unmapped_count > 0:
             logger.warning(
                 "Unmapped rows after merge",
                 count=unmapped_count,
-                pct=(unmapped_count / len(self.fagl_df)) * 100
+                pct=(unmapped_count / len(self.fagl_df)) * 100,
+                accounts=len(self.unmapped_accounts),
+                sample=[str(a) for a in self.unmapped_accounts[:10]]
             )
         
-        logger.info("Merged mapping data", mapped_rows=self.fagl_df['is_mapped'].sum())
+        logger.info("Merged mapping data", mapped_rows=int(mapped.sum()))
     
     def _enrich_ar_ap_flags(self):
         """Add AR/AP flags based on type."""
@@ -175,6 +234,83 @@ class DataNormalizer:
                 threshold_days=overdue_threshold
             )
     
+    def _compact_dtypes(self):
+        """
+        Store the ledger in compact dtypes and record the per-column saving.
+        
+        Text columns become categoricals (or Arrow strings when mostly
+        distinct, e.g. doc_id on single-line documents), calendar columns and days_overdue
+        are downcast to the narrowest integer type, and amounts are narrowed
+        to float32 only when compact_float32 is set, since float32 keeps
+        about seven significant digits.
+        """
+        df = self.fagl_df
+        
+        targets = {}
+        for col in self.COMPACT_CATEGORICAL_COLUMNS:
+            if col in df.columns and df[col].dtype == object:
+                distinct_ratio = df[col].nunique(dropna=False) / max(len(df), 1)
+                if distinct_ratio <= self.COMPACT_MAX_CATEGORY_RATIO:
+                    targets[col] = 'category'
+                else:
+                    targets[col] = 'string[pyarrow]'
+        
+        for col, dtype in self.COMPACT_INTEGER_COLUMNS.items():
+            if col in df.columns:
+                targets[col] = dtype if not df[col].isna().any() else dtype.capitalize()
+        
+        if 'days_overdue' in df.columns:
+            if df['days_overdue'].isna().any():
+                # float32 represents whole days exactly up to 2**24
+                targets['days_overdue'] = 'float32'
+            else:
+                targets['days_overdue'] = 'int32'
+        
+        if self.config.get('compact_float32', False):
+            for col in self.COMPACT_FLOAT_COLUMNS:
+                if col in df.columns:
+                    targets[col] = 'float32'
+        
+        rows = []
+        for col, dtype in targets.items():
+            before_dtype = str(df[col].dtype)
+            before_bytes = int(df[col].memory_usage(index=False, deep=True))
+            df[col] = df[col].astype(dtype)
+            after_bytes = int(df[col].memory_usage(index=False, deep=True))
+            rows.append({
+                'column': col,
+                'dtype_before': before_dtype,
+                'dtype_after': str(df[col].dtype),
+                'bytes_before': before_bytes,
+                'bytes_after': after_bytes,
+                'saved_bytes': before_bytes - after_bytes,
+            })
+        
+        report = pd.DataFrame(rows, columns=[
+            'column', 'dtype_before', 'dtype_after', 'bytes_before', 'bytes_after', 'saved_bytes'
+        ])
+        report['saved_pct'] = (report['saved_bytes'] / report['bytes_before'].where(report['bytes_before'] > 0)) * 100
+        self.memory_report = report.sort_values('saved_bytes', ascending=False).reset_index(drop=True)
+        
+        logger.info(
+            "Compacted ledger dtypes",
+            columns=len(self.memory_report),
+            bytes_before=int(self.memory_report['bytes_before'].sum()),
+            bytes_after=int(self.memory_report['bytes_after'].sum())
+        )
+    
+    def get_memory_report(self) -> pd.DataFrame:
+        """
+        Get per-column memory saving from compact mode.
+        
+        Returns:
+            DataFrame with dtype and byte counts before/after per column
+        """
+        if self.memory_report is None:
+            raise ValueError("No memory report. Normalize with compact_dtypes enabled first.")
+        
+        return self.memory_report
+    
     def get_unmapped_summary(self) -> pd.DataFrame:
         """
         Get summary of unmapped GL accounts.
@@ -190,7 +326,7 @@ class DataNormalizer:
         if len(unmapped) == 0:
             return pd.DataFrame(columns=['gl_account', 'transaction_count', 'total_amount'])
         
-        summary = unmapped.groupby('gl_account').agg({
+        summary = unmapped.groupby('gl_account', observed=True).agg({
             'doc_id': 'count',
             'amount': 'sum'
         }).reset_index()
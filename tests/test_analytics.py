@@ -76,3 +76,736 @@ def test_kpi_top_items(normalized_df, config):
         assert 'bucket' in top_buckets.columns
         assert 'total_amount' in top_buckets.columns
 
+
+
+def test_ledger_cube_rollups(normalized_df, config):
+    """Test shared cube rollups match direct groupbys and feed the analyzers."""
+    from fin_review.analytics import LedgerCube, analyze_trends
+    
+    cube = LedgerCube(normalized_df)
+    
+    direct = normalized_df.groupby(['year_month', 'type'])['amount'].sum()
+    pd.testing.assert_series_equal(cube.rollup(['year_month', 'type']), direct)
+    assert cube.rollup(['type'], 'count').sum() == len(normalized_df)
+    assert cube.rollup(['bucket'], 'abs_amount').sum() == pytest.approx(normalized_df['amount'].abs().sum())
+    
+    revenue = normalized_df[normalized_df['type'] == 'Revenue'].groupby('year_month')['amount'].sum()
+    pd.testing.assert_series_equal(cube.monthly('Revenue'), revenue, check_names=False)
+    assert len(cube.monthly('Interest')) == 0
+    
+    with pytest.raises(ValueError, match="Dimensions not in cube"):
+        cube.rollup(['posting_text'])
+    
+    shared = calculate_kpis(normalized_df, config, cube)
+    standalone = calculate_kpis(normalized_df, config)
+    pd.testing.assert_frame_equal(shared.monthly_kpis, standalone.monthly_kpis)
+    assert analyze_trends(normalized_df, config, cube).trend_direction is not None
+
+
+def test_anomaly_bucket_scores_vectorized():
+    """Test vectorized per-bucket Z-score/MAD scoring matches per-bucket statistics."""
+    import numpy as np
+    from fin_review.analytics.anomalies import AnomalyDetector
+    
+    months = pd.period_range('2023-01', periods=12, freq='M')
+    amounts = {
+        'Sales': [100.0] * 11 + [1000.0],
+        'Rent': [50.0, 52.0, 48.0, 51.0, 49.0, 50.0, 53.0, 47.0, 50.0, 51.0, 49.0, 50.0],
+        'Flat': [10.0] * 12,
+    }
+    df = pd.DataFrame([
+        {'year_month': m, 'bucket': bucket, 'type': 'Revenue' if bucket == 'Sales' else 'Operating Expense', 'amount': a}
+        for bucket, values in amounts.items()
+        for m, a in zip(months, values)
+    ])
+    
+    detector = AnomalyDetector(df, {'anomaly_threshold_zscore': 3.0, 'anomaly_threshold_mad': 3.5})
+    scores = detector._score_buckets()
+    
+    rent = scores[scores['bucket'] == 'Rent']
+    assert rent['mean'].iloc[0] == pytest.approx(np.mean(amounts['Rent']))
+    assert rent['std'].iloc[0] == pytest.approx(np.std(amounts['Rent'], ddof=1))
+    assert rent['mad'].iloc[0] == pytest.approx(np.median(np.abs(np.array(amounts['Rent']) - 50.0)))
+    
+    zscore = detector._detect_zscore_anomalies()
+    assert [(a.date, a.bucket, a.expected_amount) for a in zscore] == [('2023-12', 'Sales', 175.0)]
+    assert zscore[0].severity == 'low'
+    
+    # The constant bucket never scores; the Sales spike has zero MAD and is skipped too
+    assert all(a.bucket == 'Rent' for a in detector._detect_mad_anomalies())
+    assert detector._severity_levels(np.array([5.5, 4.5, 3.0]), 'mad').tolist() == ['high', 'medium', 'low']
+
+
+def test_anomaly_explanations_indexed_drilldown(normalized_df, config):
+    """Test batched explanations match a direct filter of each anomaly's cell."""
+    from fin_review.analytics.anomalies import AnomalyDetector, Anomaly
+    
+    detector = AnomalyDetector(normalized_df, config)
+    cells = normalized_df.groupby(['year_month', 'bucket'], observed=True)['amount'].sum()
+    
+    anomalies = [
+        Anomaly(
+            date=ym.strftime('%Y-%m'), bucket=bucket, type='Other', amount=float(amount),
+            expected_amount=0.0, deviation=float(amount), deviation_pct=100.0,
+            severity='low', method='zscore'
+        )
+        for (ym, bucket), amount in cells.head(5).items()
+    ]
+    anomalies.append(Anomaly(
+        date='1999-01', bucket='Missing', type='Other', amount=1.0, expected_amount=0.0,
+        deviation=1.0, deviation_pct=100.0, severity='low', method='zscore'
+    ))
+    
+    detector._explain_anomalies(anomalies)
+    
+    for anomaly in anomalies[:-1]:
+        cell = normalized_df[
+            (normalized_df['year_month'] == pd.Period(anomaly.date, freq='M')) &
+            (normalized_df['bucket'] == anomaly.bucket)
+        ]
+        expected = cell.groupby('customer_vendor', observed=True)['amount'].sum().abs().nlargest(3)
+        assert [c['party'] for c in anomaly.top_contributors] == list(expected.index)
+        assert [c['amount'] for c in anomaly.top_contributors] == pytest.approx(list(expected.values))
+        assert anomaly.explanation.startswith("100.0%")
+        assert f"Top contributor: {expected.index[0]}" in anomaly.explanation
+    
+    assert anomalies[-1].explanation is None
+    assert anomalies[-1].top_contributors is None
+
+
+def test_isolation_forest_modes():
+    """Test per-bucket Isolation Forest is unchanged by the pool and pooled mode flags spikes."""
+    import numpy as np
+    from fin_review.analytics.anomalies import AnomalyDetector
+    
+    rng = np.random.default_rng(0)
+    months = pd.period_range('2022-01', periods=24, freq='M')
+    rows = []
+    for i, bucket in enumerate(['Sales', 'Rent', 'Payroll']):
+        amounts = rng.normal(1000 * (i + 1), 50, len(months))
+        amounts[10 + i] *= 8
+        rows += [
+            {'year_month': m, 'bucket': bucket, 'type': 'Other', 'amount': a}
+            for m, a in zip(months, amounts)
+        ]
+    df = pd.DataFrame(rows)
+    
+    serial = AnomalyDetector(df)._detect_isolation_forest_anomalies()
+    parallel = AnomalyDetector(
+        df, {'parallel_processing': True, 'max_workers': 2}
+    )._detect_isolation_forest_anomalies()
+    assert len(serial) > 0
+    assert [vars(a) for a in parallel] == [vars(a) for a in serial]
+    
+    pooled = AnomalyDetector(df, {'isolation_forest_mode': 'pooled'})._detect_isolation_forest_anomalies()
+    flagged = {(a.date, a.bucket) for a in pooled}
+    assert {('2022-11', 'Sales'), ('2022-12', 'Rent'), ('2023-01', 'Payroll')} <= flagged
+    
+    with pytest.raises(ValueError, match="isolation_forest_mode"):
+        AnomalyDetector(df, {'isolation_forest_mode': 'global'})
+
+
+def test_transaction_anomaly_scoring(normalized_df, config):
+    """Test line-level scoring flags a mis-keyed posting and renders like bucket anomalies."""
+    from fin_review.analytics import TransactionAnomalyScorer, score_transactions
+    from fin_review.analytics.anomalies import AnomalyResult
+    
+    df = normalized_df.copy()
+    df.loc[df.index[0], 'amount'] = df['amount'].abs().max() * 1000
+    
+    result = score_transactions(df, {**config, 'transaction_anomaly_top_n': 5})
+    
+    assert isinstance(result, AnomalyResult)
+    assert 0 < len(result.anomalies) <= 5
+    assert result.summary['lines_scored'] == len(df)
+    
+    top = result.anomalies[0]
+    assert top.method == 'transaction'
+    assert top.amount == pytest.approx(df['amount'].iloc[0])
+    assert top.date == df['posting_date'].iloc[0].strftime('%Y-%m-%d')
+    assert "vs GL median" in top.explanation
+    
+    # Scoring in small chunks with a running top-N reports the same lines
+    scorer = TransactionAnomalyScorer(df, {**config, 'transaction_anomaly_top_n': 5})
+    scorer.SCORE_CHUNK_ROWS = 7
+    chunked = scorer.score()
+    assert [a.explanation for a in chunked.anomalies] == [a.explanation for a in result.anomalies]
+    assert chunked.summary == result.summary
+    
+    merged = AnomalyResult.merge(detect_anomalies(df, config), result)
+    assert merged.summary['total_count'] == len(merged.anomalies)
+    assert merged.to_dict()['anomalies'][-1]['method'] == 'transaction'
+
+
+def test_transaction_features_copy_only_requested_rows():
+    """Test feature rows are built without converting whole compacted columns."""
+    import tracemalloc
+    import numpy as np
+    from fin_review.analytics import TransactionAnomalyScorer
+    
+    n = 200_000
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'amount': rng.normal(0, 1000, n).astype(np.float32),
+        'gl_account': rng.choice(['400000', '600100'], n),
+        'customer_vendor': rng.choice(['C1', 'V1', 'V2'], n),
+        'doc_id': np.arange(n) // 2,
+        'posting_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(n) % 365, unit='D'),
+    })
+    df['day_of_week'] = df['posting_date'].dt.dayofweek.astype(np.int8)
+    
+    scorer = TransactionAnomalyScorer(df)
+    scorer.prepare()
+    
+    tracemalloc.start()
+    try:
+        X = scorer.build_features(slice(1000, 1100))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    assert X.shape == (100, len(TransactionAnomalyScorer.FEATURES))
+    # A float64 copy of one whole column alone would take n * 8 bytes
+    assert peak < n
+    
+    without_weekday = TransactionAnomalyScorer(df.drop(columns='day_of_week'))
+    assert np.array_equal(without_weekday.build_features(slice(1000, 1100))[:, 2], X[:, 2])
+
+
+def test_model_cache_keys_and_roundtrip(tmp_path):
+    """Test forecast model cache keys follow series content and entries round-trip."""
+    from fin_review.analytics.forecasting import ARIMA_SEARCH
+    from fin_review.analytics.model_cache import ModelCache
+    
+    cache = ModelCache(str(tmp_path))
+    history = [100.0, 110.0, 105.0, 120.0]
+    
+    key = cache.make_key(history, '2023-01', ARIMA_SEARCH)
+    assert key == cache.make_key(list(history), '2023-01', ARIMA_SEARCH)
+    assert key != cache.make_key(history + [130.0], '2023-01', ARIMA_SEARCH)
+    assert key != cache.make_key(history, '2023-02', ARIMA_SEARCH)
+    assert key != cache.make_key(history, '2023-01', {**ARIMA_SEARCH, 'max_p': 5})
+    
+    assert cache.load(key) is None
+    entry = {'order': [1, 1, 0], 'seasonal_order': [0, 1, 0, 12], 'params': [0.4, 12.5], 'forecasts': {}}
+    cache.save(key, entry)
+    assert cache.load(key) == entry
+
+
+def test_arima_cache_reuse_and_warm_start(tmp_path, monkeypatch):
+    """Test cached ARIMA models skip the search and warm-start one month later (fake pmdarima)."""
+    import sys
+    import types
+    import numpy as np
+    from fin_review.analytics.forecasting import Forecaster
+    
+    calls = []
+    
+    class FakeARIMA:
+        def __init__(self, order=(1, 1, 0), seasonal_order=(0, 1, 0, 12), start_params=None, **kwargs):
+            self.order = tuple(order)
+            self.seasonal_order = tuple(seasonal_order)
+            self.start_params = start_params
+        
+        def fit(self, values):
+            self.n = len(values)
+            return self
+        
+        def params(self):
+            return np.array([0.4, 12.5])
+        
+        def predict(self, n_periods, return_conf_int, alpha):
+            forecast = np.full(n_periods, float(self.n))
+            return forecast, np.column_stack([forecast - 1, forecast + 1])
+    
+    def ARIMA(**kwargs):
+        calls.append(('ARIMA', kwargs))
+        return FakeARIMA(**kwargs)
+    
+    def auto_arima(values, **kwargs):
+        calls.append(('auto_arima', len(values)))
+        return FakeARIMA().fit(values)
+    
+    monkeypatch.setitem(sys.modules, 'pmdarima', types.SimpleNamespace(ARIMA=ARIMA, auto_arima=auto_arima))
+    
+    def ledger(months):
+        dates = pd.date_range('2022-01-01', periods=months, freq='MS')
+        return pd.DataFrame({
+            'posting_date': dates,
+            'year_month': dates.to_period('M'),
+            'type': 'Revenue',
+            'bucket': 'Sales',
+            'amount': 1000.0 + np.arange(months) * 10,
+        })
+    
+    config = {'cache_dir': str(tmp_path), 'forecast_periods': 3}
+    
+    first = Forecaster(ledger(24), config)._forecast_arima()
+    assert calls == [('auto_arima', 24)]
+    
+    # Unchanged history: served from the cache without any fit
+    calls.clear()
+    again = Forecaster(ledger(24), config)._forecast_arima()
+    assert calls == []
+    pd.testing.assert_frame_equal(again.forecasts, first.forecasts)
+    
+    # One new month: the cached order is refitted from the cached parameters
+    calls.clear()
+    extended = Forecaster(ledger(25), config)._forecast_arima()
+    assert [name for name, _ in calls] == ['ARIMA']
+    kwargs = calls[0][1]
+    assert kwargs['order'] == (1, 1, 0)
+    assert kwargs['seasonal_order'] == (0, 1, 0, 12)
+    assert kwargs['start_params'].tolist() == [0.4, 12.5]
+    assert extended.forecasts['forecast'].tolist() == [25.0] * 3
+
+
+def test_bucket_forecasts_reconciled():
+    """Test batched bucket forecasts sum to their type and total under both reconciliations."""
+    import numpy as np
+    from fin_review.analytics import generate_forecasts
+    from fin_review.analytics.batch_forecasting import seasonal_naive, theta
+    
+    months = pd.period_range('2022-01', periods=24, freq='M')
+    df = pd.DataFrame([
+        {'year_month': m, 'type': t, 'bucket': b, 'amount': base + 10 * i + (50 if i % 12 == 11 else 0)}
+        for t, b, base in [('Revenue', 'Sales', 1000.0), ('Revenue', 'Services', 400.0), ('OPEX', 'Rent', 300.0)]
+        for i, m in enumerate(months)
+    ])
+    
+    for method in ['bottom_up', 'mint']:
+        result = generate_forecasts(df, {
+            'forecast_level': 'bucket', 'forecast_reconciliation': method, 'forecast_periods': 3
+        })
+        f = result.forecasts
+        
+        assert set(f['level']) == {'total', 'type', 'bucket'}
+        assert len(f) == 3 * (1 + 2 + 3)
+        buckets = f[f['level'] == 'bucket'].groupby(['date', 'type'])['forecast'].sum()
+        types = f[f['level'] == 'type'].set_index(['date', 'type'])['forecast']
+        assert np.allclose(buckets, types.loc[buckets.index])
+        total = f[f['level'] == 'total'].set_index('date')['forecast']
+        assert np.allclose(total, f[f['level'] == 'type'].groupby('date')['forecast'].sum())
+        assert set(result.summary) == {'Revenue', 'OPEX'}
+    
+    Y = np.array([[1.0, 2.0, 3.0, 4.0]])
+    assert seasonal_naive(Y, 3, season_length=2).tolist() == [[3.0, 4.0, 3.0]]
+    assert theta(Y, 2)[0] == pytest.approx([4.474, 4.974], abs=1e-3)
+
+
+def test_trend_statistics_match_linregress(normalized_df, config):
+    """Test closed-form trend statistics match per-series linregress at any granularity."""
+    from scipy import stats
+    from fin_review.analytics import TrendAnalyzer
+    
+    analyzer = TrendAnalyzer(normalized_df, config)
+    
+    for dimension in ['type', 'bucket', 'gl_account']:
+        trend_stats = analyzer.trend_statistics(dimension)
+        assert set(trend_stats.index) == set(normalized_df[dimension].dropna().unique())
+        
+        for member, row in trend_stats.iterrows():
+            series = normalized_df[normalized_df[dimension] == member].groupby('year_month')['amount'].sum()
+            assert row['n_months'] == len(series)
+            if len(series) >= 3:
+                expected = stats.linregress(range(len(series)), series.values)
+                assert row['slope'] == pytest.approx(expected.slope)
+                assert row['p_value'] == pytest.approx(expected.pvalue, nan_ok=True)
+            if series.mean() != 0:
+                assert row['cv'] == pytest.approx(series.std() / abs(series.mean()) * 100, nan_ok=True)
+    
+    with pytest.raises(ValueError, match="Dimensions not in cube"):
+        analyzer.trend_statistics('posting_text')
+
+
+def test_change_point_detection():
+    """Test PELT finds level shifts per bucket and reports segment means."""
+    import numpy as np
+    from fin_review.analytics import detect_change_points
+    from fin_review.analytics.change_points import pelt
+    
+    rng = np.random.default_rng(0)
+    months = pd.period_range('2022-01', periods=24, freq='M')
+    levels = {
+        'Rent': [100.0] * 24,
+        'Hosting': [200.0] * 10 + [400.0] * 14,
+        'Travel': [50.0] * 8 + [150.0] * 8 + [60.0] * 8,
+    }
+    df = pd.DataFrame([
+        {'year_month': m, 'bucket': bucket, 'type': 'OPEX', 'amount': level + rng.normal(0, 5)}
+        for bucket, values in levels.items()
+        for m, level in zip(months, values)
+    ])
+    
+    result = detect_change_points(df)
+    cp = result.change_points
+    
+    assert 'Rent' not in set(cp['bucket'])
+    assert cp[cp['bucket'] == 'Hosting']['date'].tolist() == ['2022-11']
+    assert sorted(cp[cp['bucket'] == 'Travel']['date']) == ['2022-09', '2023-05']
+    assert cp.iloc[0]['shift'] == pytest.approx(200, abs=10)
+    
+    hosting = result.segments[result.segments['bucket'] == 'Hosting']
+    assert hosting['months'].tolist() == [10, 14]
+    assert hosting['mean'].tolist() == pytest.approx([200, 400], abs=5)
+    
+    assert pelt(np.array([1.0, 1.0, 1.0, 5.0, 5.0, 5.0]), penalty=1.0, min_size=3) == [3]
+    assert pelt(np.array([1.0, 1.0, 5.0, 5.0]), penalty=1.0, min_size=3) == []
+
+
+def test_batch_seasonality_detection():
+    """Test periodogram seasonality matches month-of-year decomposition."""
+    import numpy as np
+    from fin_review.analytics import detect_seasonality
+    
+    rng = np.random.default_rng(3)
+    months = pd.period_range('2021-03', periods=40, freq='M')
+    month_of_year = months.month.to_numpy()
+    series = {
+        # December peak, summer trough, on a rising trend
+        'Revenue': 1000 + 5 * np.arange(40) + 300 * (month_of_year == 12) - 200 * np.isin(month_of_year, [6, 7]),
+        'OPEX': 500 + rng.normal(0, 20, 40),
+    }
+    df = pd.DataFrame([
+        {'year_month': m, 'type': type_, 'bucket': type_, 'amount': value}
+        for type_, values in series.items()
+        for m, value in zip(months, values)
+    ])
+    
+    result = detect_seasonality(df)
+    
+    revenue = result.loc['Revenue']
+    assert revenue['detected']
+    assert revenue['n_months'] == 36
+    assert revenue['peak_months'][0] == 12
+    assert set(revenue['trough_months'][:2]) == {6, 7}
+    assert not result.loc['OPEX']['detected']
+    
+    # Strength equals the variance share of month-of-year means after detrending
+    y = series['OPEX'][-36:]
+    t = np.arange(36)
+    resid = y - np.polyval(np.polyfit(t, y, 1), t)
+    seasonal = pd.Series(resid).groupby(month_of_year[-36:]).transform('mean')
+    assert result.loc['OPEX']['strength'] == pytest.approx((seasonal ** 2).sum() / (resid ** 2).sum())
+    
+    # 13-23 months: lag-12 autocorrelation alone decides
+    short = detect_seasonality(df[df['year_month'] < pd.Period('2022-09', 'M')])
+    assert short['n_months'].eq(18).all()
+    assert short[['strength', 'p_value']].isna().all().all()
+    assert short.loc['Revenue', 'detected'] and short.loc['Revenue', 'acf_12'] > 0.5
+    assert not short.loc['OPEX', 'detected']
+    
+    assert detect_seasonality(df[df['year_month'] < pd.Period('2022-03', 'M')]).empty
+
+
+def test_aging_buckets_vectorized_as_of_date():
+    """Test searchsorted bucket assignment and explicit as-of snapshots."""
+    import numpy as np
+    from fin_review.analytics import AgingAnalyzer
+    
+    df = pd.DataFrame({
+        'posting_date': pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01']),
+        'due_date': pd.to_datetime(['2024-01-31', '2024-03-02', '2024-03-31', '2024-05-01']),
+        'open_amount': [100.0, 200.0, 300.0, 400.0],
+        'doc_id': ['D1', 'D2', 'D3', 'D4'],
+        'is_receivable': True,
+        'is_payable': False,
+    })
+    config = {'aging_buckets': [
+        [0, 0, "Current"],
+        [1, 30, "0-30 days"],
+        [31, 60, "31-60 days"],
+        [61, 90, "61-90 days"],
+        [91, 999999, ">90 days"],
+    ]}
+    
+    analyzer = AgingAnalyzer(df, config, as_of_date='2024-03-31')
+    codes = analyzer.bucket_codes(np.array([-5, 0, 1, 30, 31, 90, 91, np.nan]))
+    assert codes.tolist() == [5, 0, 1, 1, 2, 3, 4, 5]
+    
+    # D4 is posted after the snapshot; D3 is due on it; D2 is 29 days late; D1 60
+    aging, summary = analyzer._analyze_ar()
+    assert aging['aging_bucket'].tolist() == ["Current", "0-30 days", "31-60 days"]
+    assert aging['outstanding_amount'].tolist() == [300.0, 200.0, 100.0]
+    assert summary['total_outstanding'] == 600.0
+    assert summary['overdue_amount'] == 300.0
+    
+    buckets = analyzer._assign_aging_buckets(df)
+    assert isinstance(buckets.dtype, pd.CategoricalDtype)
+    assert buckets.tolist() == ["31-60 days", "0-30 days", "Current", "Unknown"]
+
+
+def test_aging_history_month_end_snapshots():
+    """Test month-end aging history against a per-snapshot recount."""
+    from fin_review.analytics import AgingAnalyzer
+    
+    df = pd.DataFrame({
+        'posting_date': pd.to_datetime(['2024-01-05', '2024-01-20', '2024-02-10', '2024-03-15']),
+        'due_date': pd.to_datetime(['2024-01-31', '2024-02-19', '2024-03-11', None]),
+        'clearing_date': pd.to_datetime([None, '2024-03-10', None, None]),
+        'open_amount': [100.0, 0.0, 300.0, 400.0],
+        'amount': [100.0, 250.0, 300.0, 400.0],
+        'doc_id': ['D1', 'D2', 'D3', 'D4'],
+        'is_receivable': True,
+        'is_payable': False,
+    })
+    config = {'aging_buckets': [
+        [0, 0, "Current"],
+        [1, 30, "0-30 days"],
+        [31, 60, "31-60 days"],
+        [61, 999999, ">60 days"],
+    ]}
+    
+    analyzer = AgingAnalyzer(df, config, as_of_date='2024-03-20')
+    history = analyzer.aging_history(months=3)
+    ar = history[history['ledger'] == 'AR'].pivot(
+        index='snapshot_date', columns='aging_bucket', values='outstanding_amount'
+    )
+    
+    assert ar.index.strftime('%Y-%m-%d').tolist() == ['2024-01-31', '2024-02-29', '2024-03-20']
+    # Jan 31: D1 due that day, D2 not yet due (outside every bucket)
+    assert ar.loc['2024-01-31', 'Current'] == 100.0
+    assert ar.loc['2024-01-31', 'Unknown'] == 250.0
+    # Feb 29: D1 29 days late, D2 10 days late, D3 not yet due
+    assert ar.loc['2024-02-29', '0-30 days'] == 100.0 + 250.0
+    assert ar.loc['2024-02-29', 'Unknown'] == 300.0
+    # Mar 20: D2 cleared, D1 49 days late, D3 9 days late, D4 has no due date
+    assert ar.loc['2024-03-20', '31-60 days'] == 100.0
+    assert ar.loc['2024-03-20', '0-30 days'] == 300.0
+    assert ar.loc['2024-03-20', 'Unknown'] == 400.0
+    assert history['item_count'].sum() == 2 + 3 + 3
+
+
+def test_aging_as_of_date_includes_items_cleared_later():
+    """Test that as-of aging counts items cleared after the snapshot, like aging_history."""
+    from fin_review.analytics import AgingAnalyzer
+    
+    df = pd.DataFrame({
+        'posting_date': pd.to_datetime(['2024-01-05', '2024-02-20', '2024-03-01']),
+        'due_date': pd.to_datetime(['2024-02-04', '2024-03-21', '2024-03-31']),
+        'clearing_date': pd.to_datetime(['2024-04-20', '2024-03-25', None]),
+        'open_amount': [0.0, 0.0, 200.0],
+        'amount': [100.0, 50.0, 200.0],
+        'doc_id': ['D1', 'D2', 'D3'],
+        'type': 'Receivable',
+        'customer_vendor': ['C1', 'C2', 'C1'],
+        'is_receivable': True,
+        'is_payable': False,
+    })
+    config = {'aging_buckets': [
+        [0, 0, "Current"],
+        [1, 30, "0-30 days"],
+        [31, 60, "31-60 days"],
+        [61, 999999, ">60 days"],
+    ]}
+    
+    # D1 is cleared only after the snapshot, D2 before it
+    analyzer = AgingAnalyzer(df, config, as_of_date='2024-03-31')
+    aging, summary = analyzer._analyze_ar()
+    assert summary['total_outstanding'] == 300.0
+    assert aging.set_index('aging_bucket')['outstanding_amount'].to_dict() == {
+        "Current": 200.0, "31-60 days": 100.0
+    }
+    
+    history = analyzer.aging_history(months=3)
+    last = history[(history['snapshot_date'] == history['snapshot_date'].max()) & (history['item_count'] > 0)]
+    assert last['aging_bucket'].tolist() == aging['aging_bucket'].tolist()
+    assert last['outstanding_amount'].tolist() == aging['outstanding_amount'].tolist()
+    assert last['item_count'].tolist() == aging['item_count'].tolist()
+    
+    overdue = analyzer._get_overdue_items()
+    assert overdue['doc_id'].tolist() == ['D1']
+    assert overdue['open_amount'].tolist() == [100.0]
+    assert overdue['days_overdue'].tolist() == [56]
+
+
+def test_working_capital_rolling_series():
+    """Test month-end DSO/DPO/CCC against direct window sums."""
+    import numpy as np
+    from fin_review.analytics import calculate_working_capital
+    
+    rng = np.random.default_rng(5)
+    n = 400
+    df = pd.DataFrame({
+        'posting_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 500, n), 'D'),
+        'type': rng.choice(['Revenue', 'OPEX', 'Receivable', 'Payable', 'Payroll'], n),
+        'amount': rng.uniform(10, 1000, n),
+    })
+    # Credits on revenue and payables (positive_debit convention)
+    df.loc[df['type'].isin(['Revenue', 'Payable']), 'amount'] *= -1
+    
+    result = calculate_working_capital(df, {'working_capital_windows': [90, 30]})
+    monthly = result.monthly
+    
+    last_day = df['posting_date'].max()
+    assert monthly['date'].iloc[-1] == last_day
+    assert monthly['date'].iloc[0] == pd.Timestamp('2023-01-31')
+    assert monthly['inventory_balance'].isna().all()
+    
+    for _, row in monthly.iloc[[3, 10, -1]].iterrows():
+        date = row['date']
+        posted = df[df['posting_date'] <= date]
+        ar = abs(posted.loc[posted['type'] == 'Receivable', 'amount'].sum())
+        ap = abs(posted.loc[posted['type'] == 'Payable', 'amount'].sum())
+        window = posted[posted['posting_date'] > date - pd.Timedelta(days=90)]
+        revenue = abs(window.loc[window['type'] == 'Revenue', 'amount'].sum())
+        opex = abs(window.loc[window['type'] == 'OPEX', 'amount'].sum())
+        
+        assert row['ar_balance'] == pytest.approx(ar)
+        assert row['dso_90d'] == pytest.approx(ar / (revenue / 90))
+        assert row['dpo_90d'] == pytest.approx(ap / (opex / 90))
+        assert row['ccc_90d'] == pytest.approx(row['dso_90d'] - row['dpo_90d'])
+    
+    assert result.latest['dso_30d'] == pytest.approx(monthly['dso_30d'].iloc[-1])
+
+
+def test_party_concentration_profiles():
+    """Test Top-N, Pareto/ABC split and HHI against a plain groupby."""
+    import numpy as np
+    from fin_review.analytics import analyze_parties
+    from fin_review.analytics.kpis import KPICalculator
+    
+    amounts = {'V1': 500.0, 'V2': -300.0, 'V3': 100.0, 'V4': 60.0, 'V5': 30.0, 'V6': 10.0}
+    df = pd.DataFrame({
+        'year_month': pd.Period('2024-01', 'M'),
+        'type': 'OPEX',
+        'bucket': 'OPEX - Services',
+        'customer_vendor': list(amounts) + ['V1'],
+        'amount': list(amounts.values()) + [0.0],
+    })
+    
+    result = analyze_parties(df, {'pareto_threshold': 0.80})
+    opex = result.concentrations['OPEX']
+    
+    total = sum(abs(v) for v in amounts.values())
+    assert opex.total_amount == total
+    assert opex.party_count == 6
+    assert opex.hhi == pytest.approx(sum((abs(v) / total) ** 2 for v in amounts.values()) * 10000)
+    assert opex.top_5_pct == pytest.approx(990 / total * 100)
+    
+    # 500 + 300 = 80% of spend; 95% is reached with V3 and V4
+    assert opex.pareto_party_count == 2
+    assert opex.abc_counts == {'A': 2, 'B': 2, 'C': 2}
+    assert opex.parties['party'].tolist() == ['V1', 'V2', 'V3', 'V4', 'V5', 'V6']
+    assert opex.parties['abc_class'].tolist() == ['A', 'A', 'B', 'B', 'C', 'C']
+    assert opex.parties['transaction_count'].tolist() == [2, 1, 1, 1, 1, 1]
+    assert opex.parties['cumulative_pct'].iloc[-1] == pytest.approx(100)
+    
+    top = KPICalculator(df).get_top_items(type_filter='OPEX', group_by='customer_vendor', n=3)
+    assert top['customer_vendor'].tolist() == ['V1', 'V2', 'V3']
+    assert top['total_amount'].tolist() == [500.0, -300.0, 100.0]
+    assert KPICalculator(df).get_top_items(type_filter='Revenue', group_by='customer_vendor').empty
+
+
+def test_ratio_trends_by_month_and_entity():
+    """Test ratio trends against hand-built statements and the snapshot ratios."""
+    import numpy as np
+    from fin_review.analytics.ratio_analyzer import FinancialRatioAnalyzer, calculate_ratio_trends
+    
+    df = pd.DataFrame({
+        'posting_date': pd.to_datetime([
+            '2024-01-05', '2024-01-10', '2024-01-20', '2024-01-25',
+            '2024-03-05', '2024-03-15', '2024-01-10', '2024-01-20',
+        ]),
+        'company_code': ['BG10'] * 6 + ['BG20'] * 2,
+        'ABCOTD': [
+            'Cash and cash equivalents', 'Payables - trade accounts', 'Revenue', 'Operating expenses',
+            'Cash and cash equivalents', 'Revenue', 'Cash and cash equivalents', 'Equity',
+        ],
+        'amount': [1000.0, -400.0, -600.0, 200.0, 500.0, -300.0, 50.0, -50.0],
+    })
+    
+    result = calculate_ratio_trends(df)
+    ratios = result.ratios
+    
+    # Every month of the range for every entity, gaps included
+    assert len(ratios) == 6
+    assert ratios.index.get_level_values('year_month').astype(str).unique().tolist() == ['2024-01', '2024-02', '2024-03']
+    
+    # Balances carry forward; flows are the month's movements
+    jan = ratios.loc[(pd.Period('2024-01', 'M'), 'BG10')]
+    mar = ratios.loc[(pd.Period('2024-03', 'M'), 'BG10')]
+    assert jan['current_ratio'] == pytest.approx(1000 / 400)
+    assert jan['working_capital'] == pytest.approx(600)
+    assert jan['net_profit_margin'] == pytest.approx((600 - 200) / 600)
+    assert mar['current_ratio'] == pytest.approx(1500 / 400)
+    assert mar['net_profit_margin'] == pytest.approx(1.0)
+    assert np.isnan(ratios.loc[(pd.Period('2024-02', 'M'), 'BG10'), 'net_profit_margin'])
+    
+    # No liabilities: liquidity ratios are not applicable
+    assert np.isnan(ratios.loc[(pd.Period('2024-01', 'M'), 'BG20'), 'current_ratio'])
+    assert result.status.loc[(pd.Period('2024-01', 'M'), 'BG20'), 'current_ratio'] is None
+    assert result.status.loc[(pd.Period('2024-03', 'M'), 'BG10'), 'current_ratio'] == 'excellent'
+    
+    # A single entity's single period reproduces the snapshot analysis
+    jan_bg10 = df[(df['company_code'] == 'BG10') & (df['posting_date'] < '2024-02-01')]
+    snapshot, _ = FinancialRatioAnalyzer().analyze(jan_bg10)
+    for ratio in snapshot:
+        if ratio.applicable:
+            assert jan[ratio.ratio_name] == pytest.approx(ratio.value)
+
+
+def test_going_concern_stress_test():
+    """Test Monte Carlo stress scores against the deterministic assessment."""
+    import numpy as np
+    from fin_review.analytics.ratio_analyzer import (
+        FinancialRatioAnalyzer, STRESS_DRIVERS, stress_test_going_concern
+    )
+    
+    df = pd.DataFrame({
+        'posting_date': pd.date_range('2024-01-01', periods=7, freq='MS'),
+        'ABCOTD': [
+            'Cash and cash equivalents', 'Receivables - trade accounts', 'Payables - trade accounts',
+            'Equity', 'Revenue', 'Operating expenses', 'Interest on lease obligations',
+        ],
+        'amount': [800.0, 400.0, -500.0, -700.0, -2000.0, 1500.0, 50.0],
+    })
+    
+    _, assessment = FinancialRatioAnalyzer().analyze(df)
+    
+    # Without shocks every scenario is the deterministic assessment
+    calm = {name: {'mean': 0.0, 'std': 0.0} for name in STRESS_DRIVERS}
+    result = stress_test_going_concern(df, n_scenarios=50, drivers=calm, seed=0)
+    assert result.base_status == assessment.overall_status
+    assert result.base_scores['liquidity'] == pytest.approx(assessment.liquidity_score)
+    assert result.base_scores['solvency'] == pytest.approx(assessment.solvency_score)
+    assert result.base_scores['cash_flow'] == pytest.approx(assessment.cash_flow_score)
+    assert np.allclose(result.scores['overall'], result.base_scores['overall'])
+    assert result.status_probabilities[assessment.overall_status] == 1.0
+    
+    # Severe scenarios pull the score distribution below the base
+    severe = {'revenue_decline': {'mean': 0.5, 'std': 0.2}, 'collection_delay_days': {'mean': 60.0}}
+    stressed = stress_test_going_concern(df, n_scenarios=20000, drivers=severe, seed=0)
+    assert len(stressed.scores) == 20000
+    assert stressed.scores['overall'].median() < stressed.base_scores['overall']
+    assert stressed.breach_probabilities['below_concerning'] > 0
+    assert sum(stressed.status_probabilities.values()) == pytest.approx(1.0)
+    assert stressed.ratio_critical_probabilities['net_profit_margin'] > 0.5
+    assert stressed.to_dict()['score_percentiles']['overall']['p50'] == pytest.approx(stressed.scores['overall'].median())
+    
+    with pytest.raises(ValueError, match="Available"):
+        stress_test_going_concern(df, drivers={'fx_shock': {'mean': 0.1}})
+
+
+def test_going_concern_scores_share_status_constants(monkeypatch):
+    """Test the assessment and the stress test read the same status points and bands."""
+    from fin_review.analytics import ratio_analyzer
+    
+    df = pd.DataFrame({
+        'posting_date': pd.date_range('2024-01-01', periods=4, freq='MS'),
+        'ABCOTD': ['Cash and cash equivalents', 'Payables - trade accounts', 'Equity', 'Revenue'],
+        'amount': [800.0, -500.0, -300.0, -2000.0],
+    })
+    calm = {name: {'mean': 0.0, 'std': 0.0} for name in ratio_analyzer.STRESS_DRIVERS}
+    
+    monkeypatch.setitem(ratio_analyzer.STATUS_POINTS, 'excellent', 100)
+    monkeypatch.setitem(ratio_analyzer.STATUS_BANDS, 'strong', 99)
+    
+    _, assessment = ratio_analyzer.FinancialRatioAnalyzer().analyze(df)
+    result = ratio_analyzer.stress_test_going_concern(df, n_scenarios=5, drivers=calm, seed=0)
+    
+    # Liquidity: two 'good' (75), one 'warning' (50) and three 'excellent' (now 100) ratios
+    assert assessment.liquidity_score == pytest.approx((2 * 75 + 50 + 3 * 100) / 6)
+    assert assessment.liquidity_score == pytest.approx(result.base_scores['liquidity'])
+    # An overall score of about 85 is no longer 'strong' once its floor is 99
+    assert assessment.overall_status == result.base_status == 'adequate'
@@ -1,6 +1,7 @@
 """Tests for data loaders."""
 
 import pytest
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from fin_review.loaders import MappingLoader, FAGLLoader
@@ -68,3 +69,245 @@ def test_fagl_loader_filter_by_date(sample_fagl_df, tmp_path):
     assert filtered['posting_date'].min() >= start_date
     assert filtered['posting_date'].max() <= end_date
 
+
+
+def test_fagl_loader_streaming_chunks(sample_fagl_df, tmp_path):
+    """Test chunked CSV loading with declared dtypes."""
+    fagl_file = tmp_path / "fagl.csv"
+    sample_fagl_df.to_csv(fagl_file, index=False)
+    
+    streamed = FAGLLoader(fagl_file=str(fagl_file), chunk_size=7).load()
+    full = FAGLLoader(fagl_file=str(fagl_file)).load()
+    
+    assert len(streamed) == len(full)
+    assert isinstance(streamed['gl_account'].dtype, pd.CategoricalDtype)
+    assert isinstance(streamed['currency'].dtype, pd.CategoricalDtype)
+    assert streamed['amount'].dtype == 'float64'
+    assert pd.api.types.is_datetime64_any_dtype(streamed['posting_date'])
+    assert streamed['amount'].sum() == pytest.approx(full['amount'].sum())
+    assert set(streamed['gl_account'].astype(str)) == set(full['gl_account'])
+
+
+def test_fagl_loader_streaming_reads_mapped_columns_only(sample_fagl_df, tmp_path):
+    """Test that streaming mode only reads columns named in column_mapping."""
+    fagl_file = tmp_path / "fagl.csv"
+    sample_fagl_df.rename(columns={'amount': 'Betrag'}).to_csv(fagl_file, index=False)
+    
+    column_mapping = {
+        'posting_date': 'posting_date',
+        'doc_id': 'doc_id',
+        'gl_account': 'gl_account',
+        'amount': 'Betrag',
+    }
+    loader = FAGLLoader(fagl_file=str(fagl_file), column_mapping=column_mapping, chunk_size=25)
+    df = loader.load()
+    
+    assert 'amount' in df.columns
+    assert 'posting_text' not in df.columns
+
+
+def test_fagl_loader_parallel_directory(sample_fagl_df, tmp_path):
+    """Test parallel directory loading skips malformed files."""
+    fagl_dir = tmp_path / "exports"
+    fagl_dir.mkdir()
+    sample_fagl_df.iloc[:50].to_csv(fagl_dir / "2024_01.csv", index=False)
+    sample_fagl_df.iloc[50:].to_csv(fagl_dir / "2024_02.csv", index=False)
+    pd.DataFrame({'unexpected': [1, 2]}).to_csv(fagl_dir / "broken.csv", index=False)
+    
+    parallel = FAGLLoader(fagl_dir=str(fagl_dir), max_workers=2).load()
+    
+    assert len(parallel) == len(sample_fagl_df)
+    assert set(parallel['source_file']) == {'2024_01.csv', '2024_02.csv'}
+    assert parallel['posting_date'].is_monotonic_increasing
+    assert parallel['amount'].sum() == pytest.approx(sample_fagl_df['amount'].sum())
+
+
+def test_mapping_loader_parquet_cache(sample_mapping_df, tmp_path):
+    """Test that cleaned mappings are cached and invalidated on content change."""
+    mapping_file = tmp_path / "mapping.csv"
+    cache_dir = tmp_path / "cache"
+    sample_mapping_df.to_csv(mapping_file, index=False)
+    
+    first = MappingLoader(str(mapping_file), cache_dir=str(cache_dir)).load()
+    assert len(list(cache_dir.glob("*.parquet"))) == 1
+    
+    cached = MappingLoader(str(mapping_file), cache_dir=str(cache_dir)).load()
+    pd.testing.assert_frame_equal(cached, first.reset_index(drop=True))
+    
+    sample_mapping_df.iloc[:3].to_csv(mapping_file, index=False)
+    changed = MappingLoader(str(mapping_file), cache_dir=str(cache_dir)).load()
+    assert len(changed) == 3
+    assert len(list(cache_dir.glob("*.parquet"))) == 2
+
+
+def test_bulgarian_loader_nets_debit_credit(tmp_path):
+    """Test vectorized debit/credit netting and pre-netted exports."""
+    from fin_review.loaders.bulgarian_fagl_loader import BulgarianFAGLLoader
+    
+    movements = pd.DataFrame({
+        'Posting Date': pd.date_range('2024-01-01', periods=4, freq='D'),
+        'Document Number': [1, 2, 3, 4],
+        'Reference Number': ['R1', None, 'R3', 'R4'],
+        'G/L Account': [601000, 702000, 401000, 503000],
+        'Account Name': ['Expense', 'Revenue', 'Supplier', 'Cash'],
+        'Debit': [100.0, 0.0, None, 0.0],
+        'Credit': [0.0, 250.0, 40.0, 0.0],
+        'Line Item Text': ['a', 'b', 'c', 'd'],
+    })
+    split_file = tmp_path / "movements.xlsx"
+    movements.to_excel(split_file, index=False)
+    
+    df = BulgarianFAGLLoader(split_file).load()
+    
+    assert df['amount'].tolist() == [100.0, -250.0, -40.0, 0.0]
+    assert df['open_amount'].tolist() == df['amount'].tolist()
+    assert (df['currency'] == 'BGN').all()
+    
+    netted = movements.drop(columns=['Debit', 'Credit']).assign(Amount=[100.0, -250.0, -40.0, 0.0])
+    netted_file = tmp_path / "movements_netted.xlsx"
+    netted.to_excel(netted_file, index=False)
+    
+    assert BulgarianFAGLLoader(netted_file).load()['amount'].tolist() == df['amount'].tolist()
+
+
+def test_bulgarian_mapping_rule_classification(tmp_path):
+    """Test rule-table bucket/type derivation and config overrides."""
+    from fin_review.loaders.bulgarian_mapping_loader import BulgarianMappingLoader
+    from fin_review.loaders.classification_rules import load_classification_rules
+    
+    mapping = pd.DataFrame({
+        'ID': [7010001, 6040001, 5010001, 4010001, 4110001, 1010001],
+        'Account name': ['Sales', 'Salaries', 'Bank', 'Suppliers', 'Customers', 'Capital'],
+        'FS Sub class': ['Profit (loss)', 'Profit (loss)', 'Current Assets',
+                         'Current liabilities', 'Current Assets', 'Equity'],
+        'FS Line': ['Revenue', 'Payroll', 'Cash', 'Payables', 'Receivables', 'Equity'],
+        'ABCOTD': ['Revenue', 'Payroll', 'Cash and cash equivalents',
+                   'Payables - trade accounts', 'Receivables - trade accounts', 'Misc'],
+        'Content area': [''] * 6,
+        'Classes': ['Profit (loss)', 'Profit (loss)', 'Assets', 'Liabilities', 'Assets', 'Equity'],
+    })
+    mapping_file = tmp_path / "mapping.xlsx"
+    mapping.to_excel(mapping_file, index=False)
+    
+    df = BulgarianMappingLoader(mapping_file, None).load()
+    
+    assert df['bucket'].tolist() == [
+        'Revenue', 'OPEX', 'Current Assets', 'Current Liabilities', 'Current Assets', 'Equity'
+    ]
+    assert df['type'].tolist() == ['Revenue', 'Payroll', 'Cash', 'AP', 'AR', 'Other']
+    
+    # Rules shipped in config_bulgarian.yaml reproduce the defaults
+    config_rules = load_classification_rules(Path(__file__).parent.parent / 'config_bulgarian.yaml')
+    assert BulgarianMappingLoader(mapping_file, None, rules=config_rules).load()['type'].tolist() == df['type'].tolist()
+    
+    custom = {'type': {'default': 'Unclassified', 'rules': [
+        {'value': 'Bank', 'when': [{'field': 'abcotd', 'any': ['CASH']}]}
+    ]}}
+    custom_df = BulgarianMappingLoader(mapping_file, None, rules=custom).load()
+    
+    assert custom_df['type'].tolist() == ['Unclassified'] * 2 + ['Bank'] + ['Unclassified'] * 3
+    assert custom_df['bucket'].tolist() == df['bucket'].tolist()
+    
+    with pytest.raises(ValueError, match="Unknown classification rule field"):
+        BulgarianMappingLoader(mapping_file, None, rules={'type': {'rules': [
+            {'value': 'X', 'when': [{'field': 'nope', 'any': ['x']}]}
+        ]}})
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_fagl_loader_filter_pushdown(sample_fagl_df, tmp_path):
+    """Test date/entity filters applied while reading and file skipping via cached statistics."""
+    from fin_review.loaders import load_fagl_data
+    
+    fagl_dir = tmp_path / "fagl"
+    fagl_dir.mkdir()
+    cache_dir = tmp_path / "cache"
+    sample_fagl_df.iloc[:50].to_csv(fagl_dir / "jan_feb.csv", index=False)
+    later = sample_fagl_df.iloc[50:].assign(company_code=['BG', 'RO'] * 25)
+    later.to_csv(fagl_dir / "feb_apr.csv", index=False)
+    
+    # Without a cache directory nothing is written anywhere
+    assert len(load_fagl_data(fagl_dir=str(fagl_dir))) == 100
+    assert not cache_dir.exists()
+    
+    # With one, the first load records per-file statistics there, not next to the inputs
+    full = load_fagl_data(fagl_dir=str(fagl_dir), cache_dir=str(cache_dir))
+    assert len(full) == 100
+    assert len(list(cache_dir.rglob("*.json"))) == 2
+    assert sorted(p.name for p in fagl_dir.iterdir()) == ['feb_apr.csv', 'jan_feb.csv']
+    
+    df = load_fagl_data(
+        fagl_dir=str(fagl_dir), start_date='2024-03-01', entity='RO', cache_dir=str(cache_dir)
+    )
+    expected = later[(later['posting_date'] >= '2024-03-01') & (later['company_code'] == 'RO')]
+    
+    assert len(df) == len(expected)
+    assert set(df['source_file']) == {'feb_apr.csv'}
+    assert (df['company_code'] == 'RO').all()
+    
+    streamed = load_fagl_data(
+        fagl_dir=str(fagl_dir), start_date='2024-03-01', entity='RO', chunk_size=7
+    )
+    assert streamed['doc_id'].tolist() == df['doc_id'].tolist()
+    
+    loader = FAGLLoader(fagl_dir=str(fagl_dir), start_date='2024-03-01', cache_dir=str(cache_dir))
+    assert [f.name for f in loader._find_files(fagl_dir)] == ['feb_apr.csv']
+    assert len(FAGLLoader(fagl_dir=str(fagl_dir), start_date='2024-03-01')._find_files(fagl_dir)) == 2
+    
+    # A rewritten file no longer matches its recorded statistics
+    sample_fagl_df.iloc[:60].to_csv(fagl_dir / "jan_feb.csv", index=False)
+    assert len(loader._find_files(fagl_dir)) == 2
+
+
+def test_fagl_loader_streaming_memory(tmp_path):
+    """Test a streamed load peaks below a full read of the same export."""
+    import tracemalloc
+    
+    n = 20000
+    rng = np.random.default_rng(0)
+    export = pd.DataFrame({
+        'posting_date': pd.date_range('2024-01-01', periods=n, freq='h').strftime('%Y-%m-%d'),
+        'doc_id': [f'DOC-{i:06d}' for i in range(n)],
+        'gl_account': rng.choice(['400000', '600100', '610000'], n),
+        'amount': rng.normal(0, 1000, n),
+        'currency': 'EUR',
+        'company_code': 'BG',
+        # Unmapped export columns are never read by the streaming loader
+        'reference': [f'REF-{i}' for i in range(n)],
+        'user_name': rng.choice(['ALICE', 'BOB'], n),
+        'header_text': [f'Header text {i}' for i in range(n)],
+    })
+    fagl_file = tmp_path / "fagl.csv"
+    export.to_csv(fagl_file, index=False)
+    
+    def peak(load):
+        tracemalloc.start()
+        try:
+            result = load()
+            return result, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    full, full_peak = peak(lambda: pd.read_csv(fagl_file))
+    streamed, streamed_peak = peak(
+        lambda: FAGLLoader(fagl_file=str(fagl_file), chunk_size=1000)._load_single_file(fagl_file)
+    )
+    
+    assert len(streamed) == len(full) == n
+    assert isinstance(streamed['gl_account'].dtype, pd.CategoricalDtype)
+    assert streamed_peak < 0.6 * full_peak
+
+
+def test_mapping_loader_mapping_dict(sample_mapping_df, tmp_path):
+    """Test mapping dictionary lookup built from the loaded mapping."""
+    mapping_file = tmp_path / "mapping.csv"
+    sample_mapping_df.to_csv(mapping_file, index=False)
+    
+    loader = MappingLoader(str(mapping_file))
+    loader.load()
+    mapping_dict = loader.get_mapping_dict()
+    
+    assert mapping_dict['400000'] == {
+        'bucket': 'Revenue - Product A', 'type': 'Revenue', 'entity': 'BG', 'notes': None
+    }
+    assert len(mapping_dict) == len(sample_mapping_df)
@@ -0,0 +1,113 @@
+"""Tests for the analytics pipeline stages."""
+
+import pytest
+import pandas as pd
+from fin_review.pipeline import GROUP, label_anomalies, run_analytics, run_multi_entity
+
+
+def test_multi_entity_consolidation(normalized_df, config):
+    """Test per-entity runs and their consolidation against direct runs."""
+    df = normalized_df.copy()
+    df['company_code'] = ['BG10', 'BG20', 'RO10', 'BG20'] * (len(df) // 4)
+    config = {**config, 'enable_forecasting': False}
+    
+    result = run_multi_entity(df, config)
+    
+    assert list(result.entities) == ['BG10', 'BG20', 'RO10']
+    assert result.comparison.index.tolist() == ['BG10', 'BG20', 'RO10', GROUP]
+    assert result.comparison.loc[GROUP, 'transactions'] == len(df)
+    
+    # Each entity matches a run on its own rows; the group matches the whole ledger
+    alone = run_analytics(df[df['company_code'] == 'BG20'], config)
+    assert result.entities['BG20'].kpi_result.summary_kpis['net_profit'] == pytest.approx(
+        alone.kpi_result.summary_kpis['net_profit']
+    )
+    whole = run_analytics(df, config)
+    pd.testing.assert_frame_equal(result.group.cube.data, whole.cube.data)
+    assert result.group.kpi_result.summary_kpis['total_revenue'] == pytest.approx(
+        whole.kpi_result.summary_kpis['total_revenue']
+    )
+    assert result.comparison['total_revenue'].iloc[:-1].sum() == pytest.approx(
+        result.comparison.loc[GROUP, 'total_revenue']
+    )
+    
+    # Group KPIs and aging are consolidated from the entity results, not rerun
+    group = result.group
+    for key in ['total_transactions', 'avg_transaction_size', 'start_date', 'end_date', 'net_profit']:
+        assert group.kpi_result.summary_kpis[key] == pytest.approx(whole.kpi_result.summary_kpis[key])
+    pd.testing.assert_frame_equal(
+        group.aging_result.ar_aging, whole.aging_result.ar_aging, check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        group.aging_result.top_overdue_customers.reset_index(drop=True),
+        whole.aging_result.top_overdue_customers.reset_index(drop=True),
+        check_dtype=False
+    )
+    assert len(group.anomaly_result.anomalies) == sum(
+        len(entity.anomaly_result.anomalies) for entity in result.entities.values()
+    )
+    
+    # Selected entities only; unknown codes are skipped
+    subset = run_multi_entity(df, config, entities=['RO10', 'XX99'])
+    assert list(subset.entities) == ['RO10']
+    assert subset.comparison.loc[GROUP, 'transactions'] == (df['company_code'] == 'RO10').sum()
+
+
+def test_multi_entity_process_pool(normalized_df, config, monkeypatch):
+    """Test entities run in worker processes match the serial run."""
+    import fin_review.pipeline
+    
+    df = normalized_df.copy()
+    df['company_code'] = ['BG10', 'BG20', 'RO10', 'BG20'] * (len(df) // 4)
+    config = {**config, 'enable_forecasting': False}
+    
+    serial = run_multi_entity(df, config)
+    
+    # Force the pool even on a single-CPU machine
+    monkeypatch.setattr(fin_review.pipeline.os, 'cpu_count', lambda: 4)
+    pooled = run_multi_entity(df, {**config, 'parallel_processing': True, 'max_workers': 2})
+    
+    pd.testing.assert_frame_equal(pooled.comparison, serial.comparison)
+    for name, entity in serial.entities.items():
+        pd.testing.assert_frame_equal(pooled.entities[name].cube.data, entity.cube.data)
+        pd.testing.assert_frame_equal(pooled.entities[name].kpi_result.monthly_kpis, entity.kpi_result.monthly_kpis)
+        assert pooled.entities[name].kpi_result.summary_kpis == entity.kpi_result.summary_kpis
+        pd.testing.assert_frame_equal(pooled.entities[name].aging_result.ar_aging, entity.aging_result.ar_aging)
+    pd.testing.assert_frame_equal(pooled.group.cube.data, serial.group.cube.data)
+    assert pooled.group.kpi_result.summary_kpis == serial.group.kpi_result.summary_kpis
+
+
+def test_multi_entity_numeric_codes_from_yaml(normalized_df, config, tmp_path):
+    """Test company codes listed as YAML numbers select the ledger's string codes."""
+    from fin_review.config import Config
+    
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("mapping_file: mapping.csv\nfagl_file: fagl.csv\nmulti_entity: true\nentities: [1000, 2000]\n")
+    cfg = Config.from_yaml(str(config_file))
+    assert cfg.entities == ['1000', '2000']
+    
+    df = normalized_df.copy()
+    df['company_code'] = ['1000', '2000', '3000', '2000'] * (len(df) // 4)
+    selected = df[df['company_code'].astype(str).isin(cfg.entities)]
+    
+    result = run_multi_entity(selected, {**config, 'enable_forecasting': False, 'entities': cfg.entities})
+    assert list(result.entities) == ['1000', '2000']
+    assert result.comparison.loc[GROUP, 'transactions'] == len(selected) == 75
+
+
+def test_label_anomalies_without_explanation():
+    """Test entity labels on anomalies with and without an explanation."""
+    from fin_review.analytics.anomalies import Anomaly, AnomalyResult
+    
+    def anomaly(explanation):
+        return Anomaly(
+            date='2024-01', bucket='Sales', type='Revenue', amount=10.0, expected_amount=5.0,
+            deviation=5.0, deviation_pct=100.0, severity='high', method='zscore', explanation=explanation
+        )
+    
+    result = AnomalyResult.merge(AnomalyResult(anomalies=[anomaly("Spike"), anomaly(None)], summary={}))
+    labelled = label_anomalies(result, '1000')
+    
+    assert [a.explanation for a in labelled.anomalies] == ["1000: Spike", "1000"]
+    assert [a.explanation for a in result.anomalies] == ["Spike", None]
+    assert labelled.summary == result.summary
@@ -85,3 +85,50 @@ def test_normalizer_unmapped_summary(sample_fagl_df, sample_mapping_df, config):
         assert 'transaction_count' in unmapped_summary.columns
         assert 'total_amount' in unmapped_summary.columns
 
+
+
+def test_normalizer_compact_dtypes(sample_fagl_df, sample_mapping_df, config):
+    """Test compact dtype mode keeps values and reports memory saving."""
+    plain = normalize_data(sample_fagl_df, sample_mapping_df, config)
+    
+    normalizer = DataNormalizer(sample_fagl_df, sample_mapping_df, {**config, 'compact_dtypes': True})
+    compact = normalizer.normalize()
+    
+    assert isinstance(compact['bucket'].dtype, pd.CategoricalDtype)
+    assert isinstance(compact['customer_vendor'].dtype, pd.CategoricalDtype)
+    assert compact['month'].dtype == 'int8'
+    assert compact['year'].dtype == 'int16'
+    assert compact['amount'].dtype == 'float64'
+    pd.testing.assert_frame_equal(compact, plain, check_dtype=False, check_categorical=False)
+    
+    report = normalizer.get_memory_report()
+    assert set(report['column']) >= {'bucket', 'gl_account', 'month', 'days_overdue'}
+    assert (report['saved_bytes'] > 0).all()
+    
+    narrow = normalize_data(
+        sample_fagl_df, sample_mapping_df,
+        {**config, 'compact_dtypes': True, 'compact_float32': True}
+    )
+    assert narrow['amount'].dtype == 'float32'
+
+
+def test_normalizer_mapping_join(sample_fagl_df, sample_mapping_df, config):
+    """Test single-pass mapping join on object and categorical accounts."""
+    fagl = sample_fagl_df.copy()
+    fagl.loc[:4, 'gl_account'] = '999999'  # Unmapped
+    mapping = sample_mapping_df.assign(notes=[f'note {i}' for i in range(len(sample_mapping_df))])
+    lookup = mapping.set_index('gl_account')
+    
+    normalizer = DataNormalizer(fagl, mapping, {**config, 'mapping_extra_columns': ['notes']})
+    result = normalizer.normalize()
+    
+    mapped = result[result['is_mapped']]
+    assert (mapped['bucket'] == mapped['gl_account'].map(lookup['bucket'])).all()
+    assert (mapped['notes'] == mapped['gl_account'].map(lookup['notes'])).all()
+    assert (result.loc[:4, 'bucket'] == 'Unmapped').all()
+    assert (result.loc[:4, 'type'] == 'Other').all()
+    assert list(normalizer.unmapped_accounts) == ['999999']
+    
+    categorical = normalize_data(fagl.astype({'gl_account': 'category'}), mapping, config)
+    assert categorical['bucket'].tolist() == result['bucket'].tolist()
+    assert categorical['entity_mapped'].tolist() == result['entity_mapped'].tolist()